@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Shared configuration for the utool benchmark suite.
+
+By default benchmarks run at 1e3 and 1e5 items. Pass ``--full`` to the runner
+to also run the 1e7 item sizes (needs a few GB of memory and several
+minutes).
+"""
+import utool as ut
+
+FULL = ut.get_argflag('--full')
+
+#: Item counts used by most benchmarks
+SIZES = [10 ** 3, 10 ** 5] + ([10 ** 7] if FULL else [])
+
+#: Input flavors, numpy inputs are skipped if numpy is unavailable
+KINDS = ['list'] + (['numpy'] if ut.util_type.HAVE_NUMPY else [])
+
+
+def make_items(size, kind='list'):
+    """ returns ``size`` integers as a list or a numpy array """
+    if kind == 'numpy':
+        import numpy as np
+        return np.arange(size)
+    return list(range(size))
+
+
+def make_indices(size, kind='list', seed=0):
+    """ returns ``size // 2`` random indices into an array of ``size`` """
+    import random
+    rng = random.Random(seed)
+    idxs = [rng.randrange(size) for _ in range(size // 2)]
+    if kind == 'numpy':
+        import numpy as np
+        return np.array(idxs)
+    return idxs
+
+
+def make_flags(size, kind='list', seed=0):
+    """ returns ``size`` random booleans """
+    import random
+    rng = random.Random(seed)
+    flags = [rng.random() < 0.5 for _ in range(size)]
+    if kind == 'numpy':
+        import numpy as np
+        return np.array(flags)
+    return flags
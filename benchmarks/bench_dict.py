@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+""" Benchmarks for the hot paths in utool.util_dict """
+import utool as ut
+from _common import SIZES, KINDS, make_items
+
+
+@ut.benchmark(params={'size': SIZES, 'ngroups': [10, 1000]})
+def bench_group_items(size, ngroups):
+    items = list(range(size))
+    labels = [i % ngroups for i in range(size)]
+    return lambda: ut.group_items(items, labels)
+
+
+@ut.benchmark(params={'size': SIZES, 'kind': KINDS})
+def bench_dict_take(size, kind):
+    dict_ = {i: str(i) for i in range(size)}
+    keys = make_items(size, kind)[::2]
+    if kind == 'numpy':
+        # numpy scalars hash like python ints but are slower to look up
+        keys = list(keys)
+    return lambda: ut.dict_take(dict_, keys)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks grep over a synthetic source tree, comparing the per-file
+decoding grepfile loop with the mmap engine used by ut.grep (igrep), and
+the cost of many literal patterns in one large file.
+"""
+import utool as ut
+from _common import FULL
+
+NUM_FILES = 20000 if FULL else 2000
+
+
+def _make_tree(num_files, lines_per_file=200):
+    dpath = ut.ensure_app_resource_dir('utool', 'bench_grep_%d' % num_files)
+    stamp = ut.unixjoin(dpath, 'done.stamp')
+    if not ut.checkpath(stamp):
+        import random
+        rng = random.Random(0)
+        words = ['def', 'class', 'return', 'import', 'foo', 'bar', 'baz',
+                 'self', 'value', 'result', '(', ')', ':', '=']
+        for fx in range(num_files):
+            sub = ut.ensuredir((dpath, 'pkg%02d' % (fx % 50)))
+            lines = [' '.join(rng.choice(words) for _ in range(8))
+                     for _ in range(lines_per_file)]
+            if fx % 97 == 0:
+                lines[rng.randrange(lines_per_file)] = 'needle_%d = 1' % fx
+            ut.write_to(ut.unixjoin(sub, 'mod%05d.py' % fx), '\n'.join(lines),
+                        verbose=False)
+        ut.write_to(stamp, 'done', verbose=False)
+    fpaths = sorted(ut.matching_fpaths([dpath], ['*.py']))
+    return fpaths
+
+
+@ut.benchmark(params={'impl': ['grepfile', 'igrep_serial', 'igrep_parallel']},
+              num=5)
+def bench_grep(impl):
+    fpaths = _make_tree(NUM_FILES)
+    patterns = [r'needle_\d+', r'def foo']
+    if impl == 'grepfile':
+        def _run():
+            return [ut.grepfile(fpath, patterns) for fpath in fpaths]
+    elif impl == 'igrep_serial':
+        def _run():
+            return list(ut.igrep(patterns, fpaths, nprocs=1))
+    else:
+        def _run():
+            return list(ut.igrep(patterns, fpaths))
+    return _run
+
+
+@ut.benchmark(params={'npatterns': [2, 16, 64]}, num=5)
+def bench_grep_literals(npatterns):
+    # one large file, so the cost is dominated by the passes over its data
+    fpaths = _make_tree(NUM_FILES)
+    fpath = ut.unixjoin(ut.get_app_resource_dir('utool'), 'bench_grep_big.py')
+    if not ut.checkpath(fpath):
+        text = ''.join(ut.read_from(fpath_, verbose=False)
+                       for fpath_ in fpaths[:500])
+        ut.write_to(fpath, text, verbose=False)
+    patterns = ['needle_%d = ' % (97 * px) for px in range(npatterns)]
+    return lambda: ut.grepfile_bytes(fpath, patterns)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+""" Benchmarks for the hot paths in utool.util_list """
+import utool as ut
+from _common import SIZES, KINDS, make_items, make_indices, make_flags
+
+
+@ut.benchmark(params={'size': SIZES, 'sublen': [1, 100]})
+def bench_flatten(size, sublen):
+    list_ = [list(range(sublen)) for _ in range(size // sublen)]
+    return lambda: ut.flatten(list_)
+
+
+@ut.benchmark(params={'size': SIZES, 'kind': KINDS})
+def bench_invertible_flatten2(size, kind):
+    sublen = 10
+    unflat = [make_items(sublen, kind) for _ in range(size // sublen)]
+    return lambda: ut.invertible_flatten2(unflat)
+
+
+@ut.benchmark(params={'size': SIZES, 'kind': KINDS})
+def bench_unflatten2(size, kind):
+    flat = make_items(size, kind)
+    cumlen = make_items(size // 10 + 1, kind)[1:]
+    cumlen = cumlen * 10 if kind == 'numpy' else [c * 10 for c in cumlen]
+    return lambda: ut.unflatten2(flat, cumlen)
+
+
+@ut.benchmark(params={'size': SIZES, 'kind': KINDS})
+def bench_take(size, kind):
+    items = make_items(size, kind)
+    idxs = make_indices(size, kind)
+    return lambda: ut.take(items, idxs)
+
+
+@ut.benchmark(params={'size': SIZES, 'kind': KINDS})
+def bench_compress(size, kind):
+    items = make_items(size, kind)
+    flags = make_flags(size, kind)
+    return lambda: ut.compress(items, flags)
+
+
+@ut.benchmark(params={'size': SIZES, 'nunique': [10, 'size']})
+def bench_unique_ordered(size, nunique):
+    nunique = size if nunique == 'size' else nunique
+    items = [i % nunique for i in range(size)]
+    return lambda: ut.unique_ordered(items)
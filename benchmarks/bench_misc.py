@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for hashing, string formatting, progress, argument parsing and
+import time.
+"""
+import sys
+import subprocess
+import utool as ut
+from _common import SIZES, KINDS, make_items
+
+
+@ut.benchmark(params={'size': SIZES, 'kind': KINDS})
+def bench_hash_data(size, kind):
+    data = make_items(size, kind)
+    return lambda: ut.hash_data(data)
+
+
+@ut.benchmark(params={'size': [s for s in SIZES if s <= 10 ** 5]})
+def bench_repr2(size):
+    # repr2 is used on configs and small containers, larger sizes are not
+    # realistic and take minutes per call
+    data = {'key_%d' % i: [i, float(i), str(i)] for i in range(size // 3)}
+    return lambda: ut.repr2(data, nl=1)
+
+
+@ut.benchmark(params={'size': SIZES, 'lowoverhead': [False, True]})
+def bench_progiter(size, lowoverhead):
+    import io
+    stream = io.StringIO()
+    items = range(size)
+
+    def _loop():
+        for _ in ut.ProgIter(items, stream=stream, lowoverhead=lowoverhead):
+            pass
+    return _loop
+
+
+@ut.benchmark(params={'nargs': [10, 100]})
+def bench_get_argval(nargs):
+    argv = ['prog'] + ['--arg%d=%d' % (i, i) for i in range(nargs)]
+    key = '--arg%d' % (nargs - 1)
+    return lambda: ut.get_argval(key, type_=int, default=0, argv=argv)
+
+
+@ut.benchmark(num=5, warmup=1)
+def bench_import_utool():
+    cmd = [sys.executable, '-c', 'import utool']
+    return lambda: subprocess.check_call(cmd)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Runs the utool benchmark suite and manages per-version baselines.
+
+Baselines live in ``benchmarks/baselines/utool-<version>-<hostname>.json``.
+Timings are only comparable on the same machine, so each host keeps its own
+baseline per released version.
+
+CommandLine:
+    # Run everything and print a summary
+    python benchmarks/run_benchmarks.py
+
+    # Only run some benchmarks (fnmatch patterns)
+    python benchmarks/run_benchmarks.py --names bench_flatten bench_take
+
+    # Include the 1e7 item sizes
+    python benchmarks/run_benchmarks.py --full
+
+    # Record the baseline for the installed utool version
+    python benchmarks/run_benchmarks.py --save-baseline
+
+    # Compare against the most recent baseline of this host, exits nonzero
+    # on a significant regression
+    python benchmarks/run_benchmarks.py --compare
+
+    # Compare against a specific result file
+    python benchmarks/run_benchmarks.py --compare=baselines/utool-2.2.0-myhost.json
+"""
+import sys
+import glob
+import platform
+from os.path import dirname, join, abspath, basename
+import utool as ut
+
+BENCH_DPATH = dirname(abspath(__file__))
+BASELINE_DPATH = join(BENCH_DPATH, 'baselines')
+
+
+def import_benchmark_modules():
+    """ imports every ``bench_*.py`` so its benchmarks are registered """
+    if BENCH_DPATH not in sys.path:
+        sys.path.insert(0, BENCH_DPATH)
+    import importlib
+    fpaths = sorted(glob.glob(join(BENCH_DPATH, 'bench_*.py')))
+    modnames = [basename(fpath)[:-3] for fpath in fpaths]
+    modules = [importlib.import_module(modname) for modname in modnames]
+    return modules
+
+
+def baseline_fpath(version=None, hostname=None):
+    version = ut.__version__ if version is None else version
+    hostname = platform.node() if hostname is None else hostname
+    return join(BASELINE_DPATH, 'utool-%s-%s.json' % (version, hostname))
+
+
+def latest_baseline(hostname=None):
+    """ returns the baseline of this host with the highest version """
+    hostname = platform.node() if hostname is None else hostname
+    suffix = '-%s.json' % (hostname,)
+    fpaths = [fpath for fpath in glob.glob(join(BASELINE_DPATH, 'utool-*.json'))
+              if fpath.endswith(suffix)]
+    if len(fpaths) == 0:
+        return None
+
+    def _version(fpath):
+        vstr = basename(fpath)[len('utool-'):-len(suffix)]
+        return tuple(int(p) if p.isdigit() else -1 for p in vstr.split('.'))
+    return max(fpaths, key=_version)
+
+
+def main():
+    names = ut.get_argval('--names', type_=list, default=None)
+    out_fpath = ut.get_argval('--out', type_=str, default=None)
+    compare = ut.get_argval('--compare', type_=str, default=None)
+    if compare is None and ut.get_argflag('--compare'):
+        compare = 'latest'
+    min_time = ut.get_argval('--min-time', type_=float, default=None)
+
+    import_benchmark_modules()
+
+    if compare == 'latest':
+        compare = latest_baseline()
+        if compare is None:
+            print('No baseline found for this host in %s' % (BASELINE_DPATH,))
+            return 1
+
+    if ut.get_argflag('--save-baseline'):
+        out_fpath = baseline_fpath()
+        ut.ensuredir(BASELINE_DPATH)
+
+    results = ut.run_benchmarks(names=names, fpath=out_fpath,
+                                min_time=min_time)
+    if out_fpath is not None:
+        print('Wrote results to %s' % (out_fpath,))
+
+    if compare is not None:
+        print('Comparing against %s' % (compare,))
+        rows = ut.compare_benchmarks(compare, results)
+        if ut.has_regressions(rows):
+            print('Significant regressions detected')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
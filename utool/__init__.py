@@ -49,6 +49,7 @@ IMPORT_TUPLES = [
                         'VERBOSE']),
     ('util_assert',    None),
     ('util_autogen',   None),
+    ('util_benchmark', None),
     ('util_cache',     ['global_cache_read', 'global_cache_write']),
     ('util_cplat',     ['cmd', 'view_directory']),
     ('util_class',     None),
@@ -133,6 +134,7 @@ if DOELSE:
     from utool import util_arg
     from utool import util_assert
     from utool import util_autogen
+    from utool import util_benchmark
     from utool import util_cache
     from utool import util_cplat
     from utool import util_class
@@ -537,7 +539,8 @@ if DOELSE:
                                   traverse_path, weighted_diamter,)
     from utool.util_hash import (ALPHABET, ALPHABET_16, ALPHABET_27,
                                  ALPHABET_41, BIGBASE, DictProxyType, HASH_LEN,
-                                 HASH_LEN2, SEP_BYTE, SEP_STR, augment_uuid, b,
+                                 HASH_LEN2, HashStream, SEP_BYTE, SEP_STR,
+                                 augment_uuid, b,
                                  combine_hashes, combine_uuids,
                                  convert_bytes_to_bigbase,
                                  convert_hexstr_to_bigbase, digest_data,
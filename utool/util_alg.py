@@ -2276,7 +2276,26 @@ def ungroup(grouped_items, groupxs, maxval=None, fill=None):
         >>> result = ('ungrouped_items = %s' % (ut.repr2(ungrouped_items),))
         >>> print(result)
         ungrouped_items = [1.1, 2.1, 1.2, 3.2, 3.1, 2.2]
-    """
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> # A RaggedArray is ungrouped into an ndarray of the same dtype
+        >>> from utool.util_alg import *  # NOQA
+        >>> from utool.util_dev import RaggedArray
+        >>> ragged = RaggedArray.from_unflat([[1, 2], [3]])
+        >>> ungrouped = ungroup(ragged, [[0, 2], [1]])
+        >>> print(ungrouped.tolist())
+        [1, 3, 2]
+        >>> assert ungrouped.dtype == ragged.values.dtype
+        >>> print(ungroup(ragged, [[0, 3], [1]]).tolist())
+        [1, 3, None, 2]
+    """
+    from utool.util_dev import RaggedArray
+    if isinstance(grouped_items, RaggedArray):
+        # returns an ndarray
+        if not isinstance(groupxs, RaggedArray):
+            groupxs = RaggedArray.from_unflat(groupxs)
+        return grouped_items.ungroup(groupxs, maxval=maxval, fill=fill)
     if maxval is None:
         # Determine the number of items if unknown
         maxpergroup = [max(xs) if len(xs) else 0 for xs in groupxs]
@@ -0,0 +1,611 @@
+# -*- coding: utf-8 -*-
+"""
+Project-wide benchmark registry and statistical runner built on Timerit.
+
+Benchmarks are registered with the :func:`benchmark` decorator. A benchmark
+function is a *setup* function: it receives one point of its parameter grid
+as keyword arguments and returns a zero-argument callable that is the thing
+to time. This keeps data construction out of the measurement.
+
+:func:`run_benchmarks` executes registered benchmarks with warmup, automatic
+loop calibration, IQR outlier rejection and Student-t confidence intervals.
+Results are plain JSON-able dicts that record machine information so two
+runs can be compared later with :func:`compare_benchmarks`, which uses
+Welch's t-test to flag statistically significant regressions.
+
+CommandLine:
+    python -m utool.util_benchmark run_benchmarks
+    python -m utool.util_benchmark compare_benchmarks
+
+Example:
+    >>> # ENABLE_DOCTEST
+    >>> import utool as ut
+    >>> registry = ut.odict()
+    >>> @ut.benchmark(params={'size': [10, 100]}, registry=registry)
+    >>> def bench_sum(size):
+    >>>     data = list(range(size))
+    >>>     return lambda: sum(data)
+    >>> results = ut.run_benchmarks(registry=registry, min_time=0.01,
+    >>>                             verbose=0)
+    >>> print(list(results['results'].keys()))
+    ['bench_sum[size=10]', 'bench_sum[size=100]']
+"""
+from __future__ import absolute_import, division, print_function
+import math
+import time
+import fnmatch
+import platform
+import datetime
+from collections import OrderedDict
+from utool import util_inject
+print, rrr, profile = util_inject.inject2(__name__)
+
+
+#: Global registry of benchmarks, maps name to a :class:`Benchmark`
+BENCHMARK_REGISTRY = OrderedDict()
+
+RESULT_FORMAT_VERSION = 1
+
+
+class Benchmark(object):
+    """
+    A registered benchmark: a setup function and its parameter grid.
+
+    Args:
+        func (callable): setup function that accepts the grid parameters as
+            keyword arguments and returns a zero-argument callable to time.
+        name (str): unique benchmark name
+        params (dict): maps parameter names to lists of values
+        num (int): fixed number of measurements (default is calibrated)
+        warmup (int): number of untimed calls before measuring
+        min_time (float): target total measurement time used to calibrate
+            ``num`` when it is not given.
+    """
+    def __init__(self, func, name=None, params=None, num=None, warmup=None,
+                 min_time=None):
+        self.func = func
+        self.name = func.__name__ if name is None else name
+        self.params = OrderedDict() if params is None else OrderedDict(params)
+        self.num = num
+        self.warmup = warmup
+        self.min_time = min_time
+
+    def __repr__(self):
+        return '<Benchmark %s params=%r>' % (self.name, list(self.params))
+
+    def iter_params(self):
+        """ yields each point of the parameter grid as a dict """
+        from utool import util_dict
+        if len(self.params) == 0:
+            yield OrderedDict()
+        else:
+            for kw in util_dict.all_dict_combinations(self.params):
+                yield OrderedDict((k, kw[k]) for k in self.params)
+
+    def key(self, kw):
+        """ unique result key for one point in the parameter grid """
+        if len(kw) == 0:
+            return self.name
+        argstr = ','.join('%s=%s' % (k, v) for k, v in kw.items())
+        return '%s[%s]' % (self.name, argstr)
+
+
+def benchmark(func=None, name=None, params=None, num=None, warmup=None,
+              min_time=None, registry=None):
+    """
+    Decorator that registers a benchmark setup function.
+
+    Can be used bare (``@ut.benchmark``) or with arguments.
+
+    Args:
+        func (callable): setup function returning the callable to time
+        name (str): defaults to the function name
+        params (dict): parameter grid, each combination is a separate result
+        num (int): fixed number of measurements
+        warmup (int): untimed calls before measuring
+        min_time (float): calibration target in seconds
+        registry (dict): defaults to :data:`BENCHMARK_REGISTRY`
+
+    Returns:
+        callable: the undecorated setup function
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_benchmark import *  # NOQA
+        >>> registry = OrderedDict()
+        >>> @benchmark(registry=registry)
+        >>> def bench_noop():
+        >>>     return lambda: None
+        >>> print(registry['bench_noop'])
+        <Benchmark bench_noop params=[]>
+    """
+    def _register(func):
+        bench = Benchmark(func, name=name, params=params, num=num,
+                          warmup=warmup, min_time=min_time)
+        reg = BENCHMARK_REGISTRY if registry is None else registry
+        reg[bench.name] = bench
+        return func
+    if func is not None:
+        return _register(func)
+    return _register
+
+
+def machine_info():
+    """
+    Returns information about the host that affects benchmark timings.
+
+    Returns:
+        dict: info
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_benchmark import *  # NOQA
+        >>> info = machine_info()
+        >>> assert 'python_version' in info and 'utool_version' in info
+    """
+    import os
+    import utool
+    info = OrderedDict([
+        ('hostname', platform.node()),
+        ('platform', platform.platform()),
+        ('machine', platform.machine()),
+        ('processor', platform.processor()),
+        ('cpu_count', os.cpu_count()),
+        ('python_implementation', platform.python_implementation()),
+        ('python_version', platform.python_version()),
+        ('utool_version', utool.__version__),
+    ])
+    try:
+        import numpy as np
+        info['numpy_version'] = np.__version__
+    except ImportError:
+        info['numpy_version'] = None
+    return info
+
+
+# --- Statistics ---
+
+def _quantile(sorted_vals, q):
+    """ linearly interpolated quantile of an already sorted list """
+    if len(sorted_vals) == 1:
+        return sorted_vals[0]
+    pos = (len(sorted_vals) - 1) * q
+    lo = int(math.floor(pos))
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    frac = pos - lo
+    return sorted_vals[lo] * (1 - frac) + sorted_vals[hi] * frac
+
+
+def reject_outliers(times, k=1.5):
+    """
+    Removes measurements outside of ``[Q1 - k * IQR, Q3 + k * IQR]``.
+
+    Args:
+        times (list): measurements
+        k (float): IQR multiplier
+
+    Returns:
+        tuple: (kept, num_rejected)
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_benchmark import *  # NOQA
+        >>> kept, n = reject_outliers([1.0, 1.1, 0.9, 1.0, 1.05, 9.0])
+        >>> print('n = %r, max = %r' % (n, max(kept)))
+        n = 1, max = 1.1
+    """
+    if len(times) < 4:
+        return list(times), 0
+    sorted_vals = sorted(times)
+    q1 = _quantile(sorted_vals, 0.25)
+    q3 = _quantile(sorted_vals, 0.75)
+    iqr = q3 - q1
+    lo, hi = q1 - k * iqr, q3 + k * iqr
+    kept = [t for t in times if lo <= t <= hi]
+    return kept, len(times) - len(kept)
+
+
+def _betacf(a, b, x, maxiter=200, eps=3e-14):
+    """ continued fraction for the incomplete beta function (Lentz) """
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = tiny if abs(d) < tiny else d
+    d = 1.0 / d
+    h = d
+    for m in range(1, maxiter + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = tiny if abs(d) < tiny else d
+        c = 1.0 + aa / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = tiny if abs(d) < tiny else d
+        c = 1.0 + aa / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < eps:
+            break
+    return h
+
+
+def _betainc(a, b, x):
+    """ regularized incomplete beta function I_x(a, b) """
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    lbeta = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+    front = math.exp(lbeta + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    else:
+        return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def t_sf(t, df):
+    """
+    Two-sided p-value of Student's t distribution, ``P(|T| >= |t|)``.
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_benchmark import *  # NOQA
+        >>> print('%.4f' % t_sf(2.228, 10))
+        0.0500
+    """
+    if df <= 0 or math.isnan(t):
+        return float('nan')
+    if math.isinf(t):
+        return 0.0
+    return _betainc(df / 2.0, 0.5, df / (df + t * t))
+
+
+def t_ppf(confidence, df):
+    """
+    Two-sided critical value of Student's t distribution.
+
+    Args:
+        confidence (float): e.g. 0.95
+        df (float): degrees of freedom
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_benchmark import *  # NOQA
+        >>> print('%.3f' % t_ppf(0.95, 10))
+        2.228
+    """
+    alpha = 1.0 - confidence
+    lo, hi = 0.0, 1.0
+    while t_sf(hi, df) > alpha:
+        hi *= 2
+    for _ in range(100):
+        mid = (lo + hi) / 2.0
+        if t_sf(mid, df) > alpha:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2.0
+
+
+def summarize_times(times, confidence=0.95, k=1.5):
+    """
+    Computes summary statistics over per-call times after outlier rejection.
+
+    Returns:
+        OrderedDict: stats
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_benchmark import *  # NOQA
+        >>> stats = summarize_times([1.0, 1.1, 0.9, 1.0, 50.0])
+        >>> print('%.2f %d' % (stats['mean'], stats['n_outliers']))
+        1.00 1
+        >>> assert stats['ci_low'] < stats['mean'] < stats['ci_high']
+    """
+    kept, n_outliers = reject_outliers(times, k=k)
+    n = len(kept)
+    mean = sum(kept) / n
+    if n > 1:
+        var = sum((t - mean) ** 2 for t in kept) / (n - 1)
+        std = math.sqrt(var)
+        halfwidth = t_ppf(confidence, n - 1) * std / math.sqrt(n)
+    else:
+        std = 0.0
+        halfwidth = 0.0
+    sorted_vals = sorted(kept)
+    stats = OrderedDict([
+        ('n', n),
+        ('n_outliers', n_outliers),
+        ('mean', mean),
+        ('std', std),
+        ('median', _quantile(sorted_vals, 0.5)),
+        ('min', sorted_vals[0]),
+        ('max', sorted_vals[-1]),
+        ('confidence', confidence),
+        ('ci_low', mean - halfwidth),
+        ('ci_high', mean + halfwidth),
+    ])
+    return stats
+
+
+def welch_ttest(mean1, std1, n1, mean2, std2, n2):
+    """
+    Welch's unequal variance t-test from summary statistics.
+
+    Returns:
+        tuple: (t, df, pvalue)
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_benchmark import *  # NOQA
+        >>> t, df, p = welch_ttest(1.0, 0.1, 30, 1.2, 0.1, 30)
+        >>> assert p < 1e-6
+        >>> t, df, p = welch_ttest(1.0, 0.1, 30, 1.0, 0.1, 30)
+        >>> assert p == 1.0
+    """
+    v1 = (std1 ** 2) / n1 if n1 > 0 else 0.0
+    v2 = (std2 ** 2) / n2 if n2 > 0 else 0.0
+    se = math.sqrt(v1 + v2)
+    diff = mean2 - mean1
+    if se == 0:
+        if diff == 0:
+            return 0.0, float('nan'), 1.0
+        return math.copysign(float('inf'), diff), float('nan'), 0.0
+    t = diff / se
+    denom = 0.0
+    if n1 > 1:
+        denom += v1 ** 2 / (n1 - 1)
+    if n2 > 1:
+        denom += v2 ** 2 / (n2 - 1)
+    df = (v1 + v2) ** 2 / denom if denom > 0 else float('inf')
+    df = min(df, 1e6)
+    return t, df, t_sf(t, df)
+
+
+# --- Runner ---
+
+def _measure(thunk, num=None, warmup=1, min_time=0.2, max_num=10000,
+             min_num=10, inner_time=1e-4):
+    """
+    Times ``thunk`` and returns the per-call time of each measurement.
+
+    Very fast callables are executed ``inner`` times per measurement so the
+    timer resolution does not dominate.
+    """
+    from utool import util_time
+    for _ in range(warmup):
+        thunk()
+    # Calibrate the number of calls per measurement
+    inner = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(inner):
+            thunk()
+        elapsed = time.perf_counter() - start
+        if elapsed >= inner_time or inner >= 2 ** 20:
+            break
+        inner *= 10 if elapsed * 10 < inner_time else 2
+    per_measure = max(elapsed, 1e-9)
+    if num is None:
+        num = int(min_time / per_measure)
+        num = max(min_num, min(max_num, num))
+    t = util_time.Timerit(num, verbose=0)
+    if inner == 1:
+        for timer in t:
+            with timer:
+                thunk()
+    else:
+        loop = range(inner)
+        for timer in t:
+            with timer:
+                for _ in loop:
+                    thunk()
+    times = [x / inner for x in t.times]
+    return times, inner
+
+
+def _select(registry, names):
+    if names is None:
+        return list(registry.values())
+    if isinstance(names, str):
+        names = [names]
+    return [bench for key, bench in registry.items()
+            if any(fnmatch.fnmatch(key, pat) for pat in names)]
+
+
+def run_benchmarks(names=None, fpath=None, num=None, warmup=None,
+                   min_time=None, confidence=0.95, registry=None,
+                   verbose=True):
+    """
+    Runs registered benchmarks and collects statistical results.
+
+    Args:
+        names (str or list): fnmatch patterns selecting benchmark names
+            (default all)
+        fpath (str): if specified the results are written here as JSON
+        num (int): overrides the number of measurements
+        warmup (int): overrides the number of warmup calls (default 1)
+        min_time (float): overrides the calibration target (default 0.2s)
+        confidence (float): confidence level of the reported intervals
+        registry (dict): defaults to :data:`BENCHMARK_REGISTRY`
+        verbose (int): verbosity
+
+    Returns:
+        dict: results with keys ``version``, ``created``, ``machine`` and
+            ``results``. Each result maps a key like ``name[a=1,b=2]`` to its
+            parameters and per-call timing statistics in seconds.
+
+    CommandLine:
+        python -m utool.util_benchmark run_benchmarks
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_benchmark import *  # NOQA
+        >>> import utool as ut
+        >>> registry = OrderedDict()
+        >>> @benchmark(params={'n': [5]}, registry=registry)
+        >>> def bench_join(n):
+        >>>     parts = ['a'] * n
+        >>>     return lambda: ''.join(parts)
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_benchmark')
+        >>> fpath = ut.unixjoin(dpath, 'results.json')
+        >>> results = run_benchmarks(registry=registry, fpath=fpath,
+        >>>                          min_time=0.01, verbose=0)
+        >>> loaded = ut.load_json(fpath)
+        >>> stats = loaded['results']['bench_join[n=5]']
+        >>> assert stats['ci_low'] <= stats['mean'] <= stats['ci_high']
+        >>> assert stats['params'] == {'n': 5}
+    """
+    if registry is None:
+        registry = BENCHMARK_REGISTRY
+    bench_list = _select(registry, names)
+    results = OrderedDict()
+    for bench in bench_list:
+        _warmup = warmup if warmup is not None else bench.warmup
+        _warmup = 1 if _warmup is None else _warmup
+        _min_time = min_time if min_time is not None else bench.min_time
+        _min_time = 0.2 if _min_time is None else _min_time
+        _num = num if num is not None else bench.num
+        for kw in bench.iter_params():
+            key = bench.key(kw)
+            thunk = bench.func(**kw)
+            times, inner = _measure(thunk, num=_num, warmup=_warmup,
+                                    min_time=_min_time)
+            stats = summarize_times(times, confidence=confidence)
+            result = OrderedDict([
+                ('name', bench.name),
+                ('params', kw),
+                ('inner', inner),
+            ])
+            result.update(stats)
+            results[key] = result
+            if verbose:
+                print('%-50s mean=%s ±%s (n=%d, outliers=%d)' % (
+                    key, _fmt_seconds(stats['mean']),
+                    _fmt_seconds(stats['ci_high'] - stats['mean']),
+                    stats['n'], stats['n_outliers']))
+    output = OrderedDict([
+        ('version', RESULT_FORMAT_VERSION),
+        ('created', datetime.datetime.now().isoformat()),
+        ('machine', machine_info()),
+        ('results', results),
+    ])
+    if fpath is not None:
+        from utool import util_io
+        util_io.save_json(fpath, output)
+    return output
+
+
+def _fmt_seconds(sec):
+    for unit, mult in [('s', 1), ('ms', 1e3), ('us', 1e6)]:
+        if sec * mult >= 1:
+            return '%.3f%s' % (sec * mult, unit)
+    return '%.1fns' % (sec * 1e9,)
+
+
+def _load_results(results):
+    if isinstance(results, str):
+        from utool import util_io
+        results = util_io.load_json(results)
+    return results
+
+
+def compare_benchmarks(old, new, alpha=0.01, threshold=0.05, verbose=True):
+    """
+    Compares two benchmark result sets and flags significant changes.
+
+    A result is a regression when Welch's t-test rejects equal means at
+    level ``alpha`` *and* the new mean is slower by more than ``threshold``
+    (relative). Improvements are flagged symmetrically.
+
+    Args:
+        old (dict or str): baseline results or a path to their JSON file
+        new (dict or str): new results or a path to their JSON file
+        alpha (float): significance level
+        threshold (float): minimum relative change worth reporting
+        verbose (int): print a comparison table
+
+    Returns:
+        list: one dict per benchmark key present in both inputs with keys
+            ``key``, ``old_mean``, ``new_mean``, ``ratio``, ``pvalue`` and
+            ``status`` (one of 'regression', 'improvement', 'same').
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_benchmark import *  # NOQA
+        >>> def _res(mean, std):
+        >>>     return {'results': {'f': {'mean': mean, 'std': std, 'n': 50}}}
+        >>> rows = compare_benchmarks(_res(1.0, .01), _res(1.5, .01), verbose=0)
+        >>> print(rows[0]['status'])
+        regression
+        >>> rows = compare_benchmarks(_res(1.0, .01), _res(0.5, .01), verbose=0)
+        >>> print(rows[0]['status'])
+        improvement
+        >>> rows = compare_benchmarks(_res(1.0, .5), _res(1.01, .5), verbose=0)
+        >>> print(rows[0]['status'])
+        same
+        >>> print(has_regressions(rows))
+        False
+    """
+    old = _load_results(old)
+    new = _load_results(new)
+    old_results = old['results']
+    new_results = new['results']
+    rows = []
+    for key in old_results:
+        if key not in new_results:
+            continue
+        o = old_results[key]
+        n = new_results[key]
+        t, df, pvalue = welch_ttest(o['mean'], o['std'], o['n'],
+                                    n['mean'], n['std'], n['n'])
+        ratio = n['mean'] / o['mean'] if o['mean'] > 0 else float('inf')
+        status = 'same'
+        if pvalue < alpha:
+            if ratio > 1 + threshold:
+                status = 'regression'
+            elif ratio < 1 - threshold:
+                status = 'improvement'
+        rows.append(OrderedDict([
+            ('key', key),
+            ('old_mean', o['mean']),
+            ('new_mean', n['mean']),
+            ('ratio', ratio),
+            ('pvalue', pvalue),
+            ('status', status),
+        ]))
+    if verbose:
+        for row in rows:
+            flag = {'regression': '!!', 'improvement': '++'}.get(row['status'], '  ')
+            print('%s %-50s %10s -> %10s  x%.3f  p=%.2g  %s' % (
+                flag, row['key'], _fmt_seconds(row['old_mean']),
+                _fmt_seconds(row['new_mean']), row['ratio'], row['pvalue'],
+                row['status']))
+        missing = [key for key in old_results if key not in new_results]
+        if missing:
+            print('Missing from new results: %r' % (missing,))
+    return rows
+
+
+def has_regressions(rows):
+    """ True if any row from :func:`compare_benchmarks` is a regression """
+    return any(row['status'] == 'regression' for row in rows)
+
+
+if __name__ == '__main__':
+    """
+    CommandLine:
+        python -m utool.util_benchmark
+        python -m utool.util_benchmark --allexamples
+    """
+    import multiprocessing
+    multiprocessing.freeze_support()  # for win32
+    import utool as ut  # NOQA
+    ut.doctest_funcs()
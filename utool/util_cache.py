@@ -35,6 +35,8 @@ from utool import util_type
 from utool import util_decor  # NOQA
 from utool import util_dict
 from utool._internal import meta_util_constants
+if util_type.HAVE_NUMPY:
+    import numpy as np
 print, rrr, profile = util_inject.inject2(__name__)
 
 
@@ -536,12 +538,140 @@ def make_utool_json_encoder(allow_pickle=False):
     return UtoolJSONEncoder
 
 
-def to_json(val, allow_pickle=False, pretty=False):
+_UTOOL_JSON_ENCODERS = {}
+
+
+def _get_utool_json_encoder(allow_pickle=False):
+    """ cached version of :func:`make_utool_json_encoder` """
+    try:
+        return _UTOOL_JSON_ENCODERS[allow_pickle]
+    except KeyError:
+        encoder_cls = make_utool_json_encoder(allow_pickle)
+        _UTOOL_JSON_ENCODERS[allow_pickle] = encoder_cls
+        return encoder_cls
+
+
+def _encode_uuid(obj):
+    return {'__UUID__': str(obj)}
+
+
+def _build_fast_json_converters():
+    """
+    Maps exact types to the conversion the utool encoder would apply, so
+    the per-object hook is a dict lookup instead of an isinstance chain.
+    """
+    converters = {
+        uuid.UUID: _encode_uuid,
+        set: list,
+        frozenset: list,
+    }
+    if six.PY3:
+        converters[bytes] = lambda obj: obj.decode('utf-8')
+    if util_type.HAVE_NUMPY:
+        converters[np.ndarray] = np.ndarray.tolist
+        for type_ in set(np.sctypeDict.values()):
+            if issubclass(type_, (np.number, np.bool_)):
+                converters[type_] = type_.tolist
+    return converters
+
+
+_FAST_JSON_CONVERTERS = _build_fast_json_converters()
+
+_JSON_NATIVE_SCALARS = {str, int, float, bool, type(None)}
+
+
+def _make_fast_json_default(default):
+    """ wraps an encoder ``default`` with exact type dispatch """
+    converters = _FAST_JSON_CONVERTERS
+
+    def fast_default(obj):
+        convert = converters.get(type(obj), None)
+        if convert is not None:
+            return convert(obj)
+        return default(obj)
+    return fast_default
+
+
+# Types orjson encodes the same way as the utool encoder. orjson writes
+# float32 and float16 with their own shortest repr (0.1 instead of
+# 0.10000000149011612), so those are widened to float64 first.
+_JSON_PASSTHROUGH_TYPES = set(_JSON_NATIVE_SCALARS)
+if util_type.HAVE_NUMPY:
+    _JSON_PASSTHROUGH_TYPES.update(
+        type_ for type_ in set(np.sctypeDict.values())
+        if issubclass(type_, (np.number, np.bool_)) and
+        not issubclass(type_, (np.float32, np.float16)))
+
+
+def _json_prepare(obj, default):
+    """
+    Converts everything orjson would encode differently from the utool
+    encoder (UUIDs, sets, slices, pickled objects) into native data. Numeric
+    ndarrays and numpy scalars are left for orjson to encode natively.
+    Homogeneous lists are handled in bulk.
+    """
+    type_ = type(obj)
+    if type_ in _JSON_NATIVE_SCALARS:
+        return obj
+    if isinstance(obj, dict):
+        if _JSON_PASSTHROUGH_TYPES.issuperset(map(type, obj.values())):
+            return obj
+        return {key: _json_prepare(val, default) for key, val in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        if type_ not in (list, tuple):
+            # orjson hands sequence subclasses such as namedtuples to
+            # default, which would not encode them as a list
+            obj = list(obj)
+        item_types = set(map(type, obj))
+        if _JSON_PASSTHROUGH_TYPES.issuperset(item_types):
+            return obj
+        if item_types == {uuid.UUID}:
+            return [_encode_uuid(item) for item in obj]
+        return [_json_prepare(item, default) for item in obj]
+    if isinstance(obj, (str, int, float)):
+        # subclasses of native types are encoded natively
+        return obj
+    if util_type.HAVE_NUMPY:
+        if isinstance(obj, np.ndarray):
+            if obj.dtype in (np.float32, np.float16):
+                return obj.astype(np.float64)
+            if (obj.dtype.kind in 'biuf' and obj.flags.c_contiguous and
+                    obj.dtype.isnative):
+                return obj
+            return _json_prepare(obj.tolist(), default)
+        if isinstance(obj, (np.float32, np.float16)):
+            return obj.tolist()
+        if isinstance(obj, (np.number, np.bool_)):
+            return obj
+    return _json_prepare(default(obj), default)
+
+
+def _have_orjson():
+    try:
+        import orjson  # NOQA
+    except ImportError:
+        return False
+    return True
+
+
+def to_json(val, allow_pickle=False, pretty=False, fast=True,
+            use_orjson=False):
     r"""
     Converts a python object to a JSON string using the utool convention
 
     Args:
         val (object):
+        allow_pickle (bool): pickle objects json cannot represent
+        pretty (bool): indent the output
+        fast (bool): dispatch non-JSON types by exact type instead of the
+            encoder's isinstance chain. The output is identical.
+        use_orjson (bool): encode with orjson if it is installed. ndarrays
+            and numpy scalars are encoded natively in bulk. The output is
+            compact and nan / inf become null, but otherwise reads back the
+            same with :func:`from_json`. Values orjson cannot encode (e.g.
+            integers beyond 64 bits) fall back to the json encoder. Best for
+            array heavy payloads, the pre-pass over nested python containers
+            makes it slower on deeply nested plain data.
 
     Returns:
         str: json_str
@@ -603,10 +733,62 @@ def to_json(val, allow_pickle=False, pretty=False):
         >>> import utool as ut
         >>> ut.to_json([uuid.uuid4()])
 
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> # The fast path produces the same document as the encoder path
+        >>> from utool.util_cache import *  # NOQA
+        >>> import utool as ut
+        >>> import numpy as np
+        >>> import uuid
+        >>> val = {
+        >>>     'arr': np.arange(6).reshape(2, 3), 'f32': np.float32(.5),
+        >>>     'ints': list(np.arange(3)), 'uuids': [ut.get_zero_uuid()] * 2,
+        >>>     'mixed': [1, np.int64(2), 'a', None, {3}, slice(1, 2)],
+        >>>     'obj': np.array([uuid.UUID(int=1), 2], dtype=object),
+        >>>     'nested': ({'x': b'bytes'}, frozenset()),
+        >>> }
+        >>> slow = to_json(val, fast=False)
+        >>> assert to_json(val) == slow
+        >>> assert to_json(val, pretty=True) == to_json(val, pretty=True, fast=False)
+        >>> print(ut.repr2(from_json(slow)['uuids']))
+        [UUID('00000000-0000-0000-0000-000000000000'), UUID('00000000-0000-0000-0000-000000000000')]
+        >>> if ut.util_cache._have_orjson():
+        >>>     assert from_json(to_json(val, use_orjson=True)) == from_json(slow)
+        >>>     val2 = {'big': 2 ** 70, 'f32': [np.float32(.1)],
+        >>>             'f16': np.full(2, .1, dtype=np.float16)}
+        >>>     assert to_json(val2, use_orjson=True) == to_json(val2)
+        >>>     import collections
+        >>>     NT = collections.namedtuple('NT', ['a', 'b'])
+        >>>     val3 = [NT(1, 2), {'nt': NT('x', [NT(3, 4)])}]
+        >>>     fast3 = from_json(to_json(val3, use_orjson=True))
+        >>>     assert fast3 == from_json(to_json(val3))
+        >>>     assert fast3 == [[1, 2], {'nt': ['x', [[3, 4]]]}]
     """
-    UtoolJSONEncoder = make_utool_json_encoder(allow_pickle)
+    UtoolJSONEncoder = _get_utool_json_encoder(allow_pickle)
+    if not fast:
+        json_kw = {}
+        json_kw['cls'] = UtoolJSONEncoder
+        if pretty:
+            json_kw['indent'] = 4
+            json_kw['separators'] = (',', ': ')
+        json_str = json.dumps(val, **json_kw)
+        return json_str
+    default = UtoolJSONEncoder().default
+    if use_orjson and _have_orjson():
+        import orjson
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        prepared = _json_prepare(val, default)
+        try:
+            json_bytes = orjson.dumps(prepared, default=default, option=option)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which json can encode
+            pass
+        else:
+            return json_bytes.decode('utf-8')
     json_kw = {}
-    json_kw['cls'] = UtoolJSONEncoder
+    json_kw['default'] = _make_fast_json_default(default)
     if pretty:
         json_kw['indent'] = 4
         json_kw['separators'] = (',', ': ')
@@ -642,7 +824,7 @@ def from_json(json_str, allow_pickle=False):
     if six.PY3:
         if isinstance(json_str, bytes):
             json_str = json_str.decode('utf-8')
-    UtoolJSONEncoder = make_utool_json_encoder(allow_pickle)
+    UtoolJSONEncoder = _get_utool_json_encoder(allow_pickle)
     object_hook = UtoolJSONEncoder._json_object_hook
     val = json.loads(json_str, object_hook=object_hook)
     return val
@@ -254,21 +254,279 @@ def get_disk_space(start_path='.'):
     return total_size
 
 
-def get_dir_diskspaces(dir_):
+#: seconds within which a directory mtime is too recent to be trusted
+_DU_RACY_SECONDS = 2.0
+
+
+def _du_scan_dir(root, reldir, old_record):
+    """
+    Returns the disk usage record of one directory, reusing the old record if
+    the directory mtime has not changed.
+
+    A record is ``(mtime_ns, nbytes, subdirs)`` where nbytes is the size of
+    the files directly in the directory.
+    """
+    import time
+    dpath = join(root, reldir) if reldir else root
+    try:
+        stat = os.stat(dpath)
+    except OSError:
+        return None
+    if old_record is not None and old_record[0] == stat.st_mtime_ns:
+        return old_record
+    nbytes = 0
+    subdirs = []
+    try:
+        with os.scandir(dpath) as iter_:
+            for entry in iter_:
+                try:
+                    if entry.is_dir():
+                        # like os.walk, symlinked directories are not entered
+                        if not entry.is_symlink():
+                            subdirs.append(entry.name)
+                    else:
+                        nbytes += entry.stat().st_size
+                except OSError:
+                    pass
+    except OSError:
+        return None
+    mtime_ns = stat.st_mtime_ns
+    if stat.st_mtime >= time.time() - _DU_RACY_SECONDS:
+        # entries added within the same timestamp tick would go unnoticed
+        mtime_ns = None
+    return (mtime_ns, nbytes, subdirs)
+
+
+class DiskUsageScanner(object):
+    r"""
+    Incremental, parallel directory size aggregator.
+
+    Each scan stats every directory, but only re-lists (and stats the files
+    of) directories whose mtime changed since the saved snapshot. A directory
+    mtime changes when entries are added, removed or renamed, but not when an
+    existing file grows in place, so use ``full=True`` now and then to
+    refresh such files.
+
+    Args:
+        root (str): directory to measure
+        snapshot_fpath (str): where the snapshot is saved. Defaults to the
+            utool app cache directory. Use False to not persist it.
+        nthreads (int): number of threads that list directories
+
+    CommandLine:
+        python -m utool.util_cplat DiskUsageScanner
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_cplat import *  # NOQA
+        >>> from os.path import relpath
+        >>> import utool as ut
+        >>> root = ut.ensure_app_resource_dir('utool', 'test_disk_usage')
+        >>> ut.delete(root, verbose=False)
+        >>> ut.ensuredir(join(root, 'a', 'b'))
+        >>> ut.ensuredir(join(root, 'c'))
+        >>> ut.writeto(join(root, 'a', 'b', 'x.bin'), 'x' * 3000, verbose=False)
+        >>> ut.writeto(join(root, 'a', 'y.bin'), 'y' * 1000, verbose=False)
+        >>> ut.writeto(join(root, 'c', 'z.bin'), 'z' * 500, verbose=False)
+        >>> snapshot_fpath = root + '_snapshot.pkl'
+        >>> scanner = DiskUsageScanner(root, snapshot_fpath=snapshot_fpath)
+        >>> totals = scanner.scan()
+        >>> for nbytes, path in scanner.top_subtrees(3):
+        >>>     print(nbytes, relpath(path, root))
+        4500 .
+        4000 a
+        3000 a/b
+        >>> assert totals[''] == get_disk_space(root)
+        >>> # the snapshot is reloaded by later scans
+        >>> scanner2 = DiskUsageScanner(root, snapshot_fpath=snapshot_fpath)
+        >>> assert scanner2.records == scanner.records
+        >>> ut.delete(root, verbose=False)
+        >>> ut.delete(snapshot_fpath, verbose=False)
+    """
+    version = 1
+
+    def __init__(self, root, snapshot_fpath=None, nthreads=None):
+        self.root = truepath(root)
+        self.nthreads = nthreads
+        self.snapshot_fpath = snapshot_fpath
+        if snapshot_fpath is None:
+            import hashlib
+            cache_dpath = ensure_app_cache_dir('utool', 'disk_usage')
+            hashid = hashlib.sha1(self.root.encode('utf8')).hexdigest()[:16]
+            fname = '%s_%s.pkl' % (basename(self.root), hashid)
+            self.snapshot_fpath = join(cache_dpath, fname)
+        # reldir -> (mtime_ns, nbytes, subdirs)
+        self.records = {}
+        # reldir -> total bytes of the subtree
+        self.totals = {}
+        self._load()
+
+    def _load(self):
+        from utool import util_io
+        if self.snapshot_fpath and exists(self.snapshot_fpath):
+            try:
+                data = util_io.load_data(self.snapshot_fpath, verbose=False)
+            except Exception as ex:
+                print('[util_cplat] discarding unreadable snapshot %r: %r' % (
+                    self.snapshot_fpath, ex))
+                return
+            if data.get('version') == self.version and data.get('root') == self.root:
+                self.records = data['records']
+
+    def save(self):
+        """ writes the snapshot (if snapshot_fpath is not False) """
+        from utool import util_io
+        if self.snapshot_fpath:
+            data = {'version': self.version, 'root': self.root,
+                    'records': self.records}
+            util_io.save_data(self.snapshot_fpath, data, verbose=False)
+
+    def scan(self, full=False, save=True):
+        """
+        Updates the directory records and computes the total size of every
+        subtree.
+
+        Args:
+            full (bool): ignore the snapshot and re-list every directory
+            save (bool): save the snapshot afterwards
+
+        Returns:
+            dict: total bytes of each subtree keyed by path relative to root
+                ('' is the root itself)
+        """
+        from concurrent import futures
+        from utool import util_parallel
+        old_records = {} if full else self.records
+        nthreads = self.nthreads
+        if nthreads is None:
+            nthreads = min(32, util_parallel.get_default_numprocs() + 4)
+        records = {}
+        # Walk one level of the tree at a time, listing its directories in
+        # parallel
+        with futures.ThreadPoolExecutor(nthreads) as executor:
+            level = ['']
+            while level:
+                record_list = executor.map(
+                    lambda reldir: _du_scan_dir(self.root, reldir,
+                                                old_records.get(reldir, None)),
+                    level)
+                next_level = []
+                for reldir, record in zip(level, record_list):
+                    if record is None:
+                        continue
+                    records[reldir] = record
+                    for name in record[2]:
+                        next_level.append(join(reldir, name) if reldir else name)
+                level = next_level
+        self.records = records
+        # Sum subtrees bottom up
+        totals = {}
+        for reldir in sorted(records, key=lambda r: -r.count(os.sep) if r else 1):
+            mtime_ns, nbytes, subdirs = records[reldir]
+            totals[reldir] = nbytes + sum(
+                totals.get(join(reldir, name) if reldir else name, 0)
+                for name in subdirs)
+        self.totals = totals
+        if save:
+            self.save()
+        return totals
+
+    def top_subtrees(self, n=20, maxdepth=None):
+        """
+        Returns the n heaviest subtrees as (nbytes, path) tuples, largest
+        first. maxdepth limits how deep below root the subtrees can be.
+        """
+        if not self.totals:
+            self.scan()
+        items = [
+            (nbytes, join(self.root, reldir) if reldir else self.root)
+            for reldir, nbytes in self.totals.items()
+            if maxdepth is None or
+            (reldir.count(os.sep) + 1 if reldir else 0) <= maxdepth
+        ]
+        items.sort(key=lambda item: (-item[0], item[1]))
+        return items[:n]
+
+
+def get_dir_diskspaces(dir_, incremental=False, nthreads=None):
+    """
+    Returns (nbytes, path) for every file and directory in dir_, smallest
+    first. Directory sizes come from a :class:`DiskUsageScanner`. By default
+    every directory is listed. With incremental=True the saved snapshot of
+    unchanged directories is reused, which is faster on large trees but
+    misses files that grew in place until a full scan.
+
+    CommandLine:
+        python -m utool.util_cplat get_dir_diskspaces
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_cplat import *  # NOQA
+        >>> import utool as ut
+        >>> import time
+        >>> root = ut.ensure_app_resource_dir('utool', 'test_dir_diskspaces')
+        >>> ut.delete(root, verbose=False)
+        >>> fpath = join(ut.ensuredir(join(root, 'sub')), 'f.bin')
+        >>> ut.writeto(fpath, 'x' * 100, verbose=False)
+        >>> # make the directory mtime old enough to be trusted
+        >>> old = time.time() - 60
+        >>> os.utime(join(root, 'sub'), (old, old))
+        >>> print(get_dir_diskspaces(root, incremental=True)[0][0])
+        100
+        >>> # growing a file in place does not change its directory mtime
+        >>> with open(fpath, 'a') as file_:
+        >>>     _ = file_.write('x' * 100000)
+        >>> os.utime(join(root, 'sub'), (old, old))
+        >>> print(get_dir_diskspaces(root, incremental=True)[0][0])
+        100
+        >>> print(get_dir_diskspaces(root)[0][0])
+        100100
+        >>> # a full scan refreshes the snapshot
+        >>> scanner = DiskUsageScanner(root)
+        >>> print(scanner.scan(full=True)['sub'])
+        100100
+        >>> print(get_dir_diskspaces(root, incremental=True)[0][0])
+        100100
+        >>> ut.delete(scanner.snapshot_fpath, verbose=False)
+        >>> ut.delete(root, verbose=False)
+    """
     from utool import util_path
     path_list = util_path.ls(dir_)
-    nBytes_list = [get_disk_space(path) for path in path_list]
+    snapshot_fpath = None if incremental else False
+    scanner = DiskUsageScanner(dir_, snapshot_fpath=snapshot_fpath,
+                               nthreads=nthreads)
+    totals = scanner.scan(full=not incremental, save=incremental)
+    nBytes_list = []
+    for path in path_list:
+        if os.path.isdir(path) and not os.path.islink(path):
+            nBytes_list.append(totals.get(basename(path), 0))
+        else:
+            try:
+                nBytes_list.append(os.path.getsize(path))
+            except OSError:
+                nBytes_list.append(0)
     spacetup_list = sorted(list(zip(nBytes_list, path_list)))
     return spacetup_list
 
 
-def print_dir_diskspace(dir_):
+def print_dir_diskspace(dir_, topn=None, maxdepth=None, incremental=False):
+    """
+    Prints the size of each item in dir_, or with topn the topn heaviest
+    subtrees below it (at most maxdepth levels deep). incremental=True reuses
+    the saved snapshot as in :func:`get_dir_diskspaces`.
+    """
     import utool
-    spacetup_list = sorted(get_dir_diskspaces(dir_))
+    if topn is None:
+        spacetup_list = sorted(get_dir_diskspaces(dir_, incremental=incremental))
+    else:
+        snapshot_fpath = None if incremental else False
+        scanner = DiskUsageScanner(dir_, snapshot_fpath=snapshot_fpath)
+        scanner.scan(full=not incremental, save=incremental)
+        spacetup_list = scanner.top_subtrees(topn, maxdepth=maxdepth)
     nBytes_list = [tup[0] for tup in spacetup_list]
     path_list   = [tup[1] for tup in spacetup_list]
-    space_list = map(utool.byte_str2, nBytes_list)
-    n = max(map(len, space_list))
+    space_list = list(map(utool.byte_str2, nBytes_list))
+    n = max(map(len, space_list)) if space_list else 0
     fmtstr = ('%' + str(n) + 's')
     space_list2 = [fmtstr % space for space in space_list]
     tupstr_list = ['%s %s' % (space2, path) for space2, path in zip(space_list2, path_list)]
@@ -1261,6 +1261,10 @@ def get_jagged_stats(arr_list, **kwargs):
 
     """
     import functools
+    if set(kwargs.keys()).issubset({'use_nan', 'use_sum'}):
+        stats_dict = _get_jagged_stats_concat(arr_list, **kwargs)
+        if stats_dict is not None:
+            return stats_dict
     stats_dict_list = list(map(functools.partial(get_stats, **kwargs), arr_list))
     stats_dict = util_dict.dict_stack(stats_dict_list)
     # Fix order
@@ -1268,6 +1272,97 @@ def get_jagged_stats(arr_list, **kwargs):
     return stats_dict
 
 
+def _get_jagged_stats_concat(arr_list, use_nan=False, use_sum=False):
+    """
+    Computes the same stats as :func:`get_jagged_stats` for flat groups over
+    one concatenated array instead of calling :func:`get_stats` per group.
+
+    min, max, nMin, nMax and num_nan are segment reductions
+    (``np.*.reduceat``). Sums and squared sums are still reduced per group
+    with a Python loop over ``np.split``: reduceat adds in order while
+    np.sum, np.mean and np.std add pairwise, and the results must be
+    bit-identical to get_stats. This makes the function much faster on many
+    small groups, but the loop remains linear in the number of groups.
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_dev import *  # NOQA
+        >>> from utool.util_dev import _get_jagged_stats_concat
+        >>> rng = np.random.RandomState(0)
+        >>> arr_list = [rng.rand(n) * 1e3 for n in [1, 7, 100, 2049]]
+        >>> arr_list[2][::3] = np.nan
+        >>> fast = _get_jagged_stats_concat(arr_list, use_nan=True, use_sum=True)
+        >>> for idx, arr in enumerate(arr_list):
+        >>>     slow = get_stats(arr, use_nan=True, use_sum=True)
+        >>>     for key in slow.keys():
+        >>>         assert np.all(fast[key][idx] == slow[key]), key
+
+    Returns None if the input needs the general per-group path (empty or
+    all-nan groups, groups that are not 1D or differ in dtype, and float
+    dtypes other than float64, which numpy accumulates in lower precision).
+    """
+    if not HAVE_NUMPY or len(arr_list) == 0:
+        return None
+    arrs = [np.asarray(arr) for arr in arr_list]
+    dtype = arrs[0].dtype
+    if dtype.kind not in 'biuf' or (dtype.kind == 'f' and dtype != np.float64):
+        return None
+    if any(arr.ndim != 1 or arr.dtype != dtype for arr in arrs):
+        return None
+    lens = np.array([len(arr) for arr in arrs])
+    if np.any(lens == 0):
+        return None
+    flat = np.concatenate(arrs)
+    offsets = np.r_[0, np.cumsum(lens)[:-1]]
+    if use_nan and flat.dtype.kind == 'f':
+        isnan = np.isnan(flat)
+        num_nan = np.add.reduceat(isnan, offsets)
+        if np.any(num_nan == lens):
+            return None
+        counts = lens - num_nan
+        flat0 = np.where(isnan, 0, flat)
+        min_val = np.minimum.reduceat(np.where(isnan, np.inf, flat), offsets)
+        max_val = np.maximum.reduceat(np.where(isnan, -np.inf, flat), offsets)
+        min_val = min_val.astype(flat.dtype)
+        max_val = max_val.astype(flat.dtype)
+    else:
+        isnan = None
+        num_nan = np.zeros(len(arrs), dtype=np.int64)
+        counts = lens
+        flat0 = flat
+        min_val = np.minimum.reduceat(flat, offsets)
+        max_val = np.maximum.reduceat(flat, offsets)
+    # np.sum, np.mean and np.std add pairwise while np.add.reduceat adds in
+    # order, so sums are taken per group to give bit-identical results
+    bounds = offsets[1:]
+    sums = np.array([np.add.reduce(group, dtype=np.float64)
+                     for group in np.split(flat0, bounds)])
+    mean_ = sums / counts
+    dev = flat0 - np.repeat(mean_, lens)
+    if isnan is not None:
+        dev[isnan] = 0
+    sqsums = np.array([np.add.reduce(group)
+                       for group in np.split(dev * dev, bounds)])
+    std_ = np.sqrt(sqsums / counts)
+    nMin = np.add.reduceat(flat == np.repeat(min_val, lens), offsets)
+    nMax = np.add.reduceat(flat == np.repeat(max_val, lens), offsets)
+    stats_dict = OrderedDict([
+        ('max', list(max_val)),
+        ('min', list(min_val)),
+        ('mean', list(mean_.astype(np.float32))),
+    ])
+    if use_sum:
+        stats_dict['sum'] = [np.add.reduce(group)
+                             for group in np.split(flat0, bounds)]
+    stats_dict['std'] = list(std_.astype(np.float32))
+    stats_dict['nMin'] = list(nMin.astype(np.int32))
+    stats_dict['nMax'] = list(nMax.astype(np.int32))
+    stats_dict['shape'] = [(int(n),) for n in lens]
+    if use_nan:
+        stats_dict['num_nan'] = list(num_nan)
+    return stats_dict
+
+
 def get_stats(list_, axis=None, use_nan=False, use_sum=False, use_median=False,
               size=False):
     """
@@ -1379,6 +1474,206 @@ get_statdict = get_stats
 stats_dict = get_stats
 
 
+class StatsAccumulator(object):
+    """
+    Streaming summary statistics with constant memory.
+
+    Values are added in chunks (or one at a time) and merged with the
+    parallel form of Welford's algorithm, so mean and variance are computed
+    in a single numerically stable pass. Min, max and the number of values
+    equal to them are tracked as well. Optional approximate quantiles are
+    estimated from a fixed size reservoir sample.
+
+    Args:
+        use_nan (bool): ignore nan values (and count them)
+        quantile_samples (int): size of the reservoir used for approximate
+            quantiles, 0 disables quantiles.
+        seed (int): random seed for the reservoir
+
+    SeeAlso:
+        get_stats
+
+    CommandLine:
+        python -m utool.util_dev StatsAccumulator
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_dev import *  # NOQA
+        >>> import numpy as np
+        >>> rng = np.random.RandomState(0)
+        >>> data = rng.rand(10000) * 10
+        >>> data[::1000] = np.nan
+        >>> acc = StatsAccumulator(use_nan=True, quantile_samples=1000)
+        >>> for chunk in np.array_split(data, 7):
+        >>>     acc.update(chunk)
+        >>> stats = acc.get_stats(use_sum=True, quantiles=[.5])
+        >>> expected = get_stats(data, use_nan=True, use_sum=True)
+        >>> for key in ['mean', 'std', 'min', 'max', 'nMin', 'nMax', 'num_nan']:
+        >>>     assert np.isclose(stats[key], expected[key]), key
+        >>> assert np.isclose(stats['sum'], expected['sum'])
+        >>> assert abs(stats['quantiles'][0] - 5) < 0.5
+        >>> print(stats['shape'])
+        (10000,)
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_dev import *  # NOQA
+        >>> acc1 = StatsAccumulator()
+        >>> acc2 = StatsAccumulator()
+        >>> acc1.update([1, 2, 3])
+        >>> acc2.update(4)
+        >>> acc1.merge(acc2)
+        >>> stats = acc1.get_stats()
+        >>> print('mean=%.3f std=%.3f min=%.1f max=%.1f shape=%r' % (
+        >>>     stats['mean'], stats['std'], stats['min'], stats['max'],
+        >>>     stats['shape']))
+        mean=2.500 std=1.118 min=1.0 max=4.0 shape=(4,)
+    """
+    def __init__(self, use_nan=False, quantile_samples=0, seed=0):
+        self.use_nan = use_nan
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.n_min = 0
+        self.n_max = 0
+        self.num_nan = 0
+        self.quantile_samples = quantile_samples
+        self._reservoir = np.empty(quantile_samples, dtype=np.float64)
+        self._rng = np.random.RandomState(seed)
+
+    def update(self, values):
+        """ adds a scalar or a chunk of values """
+        arr = np.asarray(values, dtype=np.float64).ravel()
+        if self.use_nan:
+            isnan = np.isnan(arr)
+            num_nan = int(isnan.sum())
+            if num_nan:
+                self.num_nan += num_nan
+                arr = arr[~isnan]
+        n_b = len(arr)
+        if n_b == 0:
+            return self
+        mean_b = arr.mean()
+        dev = arr - mean_b
+        m2_b = float(np.dot(dev, dev))
+        min_b = arr.min()
+        max_b = arr.max()
+        n_min_b = int(np.count_nonzero(arr == min_b))
+        n_max_b = int(np.count_nonzero(arr == max_b))
+        self._update_reservoir(arr)
+        self._combine(n_b, mean_b, m2_b, float(arr.sum()), min_b, n_min_b,
+                      max_b, n_max_b)
+        return self
+
+    def merge(self, other):
+        """ merges the statistics of another accumulator into this one """
+        self.num_nan += other.num_nan
+        if other.n == 0:
+            return self
+        if self.quantile_samples:
+            # Weight the other reservoir by the number of values it stands for
+            k = min(other.n, other.quantile_samples)
+            self._merge_reservoir(other._reservoir[:k], other.n)
+        self._combine(other.n, other.mean, other.m2, other.total, other.min,
+                      other.n_min, other.max, other.n_max)
+        return self
+
+    def _combine(self, n_b, mean_b, m2_b, total_b, min_b, n_min_b, max_b,
+                 n_max_b):
+        n_a = self.n
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * n_b / n
+        self.m2 = self.m2 + m2_b + delta * delta * n_a * n_b / n
+        self.total += total_b
+        self.n = n
+        if min_b < self.min or n_a == 0:
+            self.min, self.n_min = min_b, n_min_b
+        elif min_b == self.min:
+            self.n_min += n_min_b
+        if max_b > self.max or n_a == 0:
+            self.max, self.n_max = max_b, n_max_b
+        elif max_b == self.max:
+            self.n_max += n_max_b
+
+    def _update_reservoir(self, arr):
+        k = self.quantile_samples
+        if k == 0:
+            return
+        n_a = self.n
+        # Fill the remaining empty slots directly
+        nfill = max(0, min(k - n_a, len(arr)))
+        if nfill:
+            self._reservoir[n_a:n_a + nfill] = arr[:nfill]
+        rest = arr[nfill:]
+        if len(rest):
+            # Algorithm R: the i-th value replaces a random slot w.p. k / i
+            index = np.arange(n_a + nfill + 1, n_a + len(arr) + 1)
+            slots = (self._rng.rand(len(rest)) * index).astype(np.int64)
+            keep = slots < k
+            self._reservoir[slots[keep]] = rest[keep]
+
+    def _merge_reservoir(self, other_samples, other_n):
+        k = self.quantile_samples
+        mine = self._reservoir[:min(self.n, k)]
+        pool = np.concatenate([mine, other_samples])
+        weights = np.concatenate([
+            np.full(len(mine), self.n / max(len(mine), 1)),
+            np.full(len(other_samples), other_n / max(len(other_samples), 1)),
+        ])
+        size = min(k, len(pool))
+        idxs = self._rng.choice(len(pool), size=size, replace=False,
+                                p=weights / weights.sum())
+        self._reservoir[:size] = pool[idxs]
+
+    def quantiles(self, qs):
+        """ approximate quantiles estimated from the reservoir sample """
+        k = min(self.n, self.quantile_samples)
+        if k == 0:
+            return [np.nan for _ in qs]
+        return list(np.quantile(self._reservoir[:k], qs))
+
+    def get_stats(self, use_sum=False, size=False, quantiles=None):
+        """
+        Returns a dictionary with the same keys as :func:`get_stats`
+
+        Args:
+            use_sum (bool): include the sum
+            size (bool): report size instead of shape
+            quantiles (list): if specified include approximate quantiles
+        """
+        if self.n == 0 and self.num_nan == 0:
+            stats = OrderedDict([('empty_list', True)])
+            if size:
+                stats['size'] = 0
+            return stats
+        nan = np.float64(np.nan)
+        has_vals = self.n > 0
+        stats = OrderedDict([
+            ('mean', np.float32(self.mean if has_vals else nan)),
+            ('std', np.float32(np.sqrt(self.m2 / self.n) if has_vals else nan)),
+            ('max', np.float64(self.max if has_vals else nan)),
+            ('min', np.float64(self.min if has_vals else nan)),
+            ('nMin', np.int32(self.n_min)),
+            ('nMax', np.int32(self.n_max)),
+        ])
+        num = self.n + self.num_nan
+        if size:
+            stats['size'] = num
+        else:
+            stats['shape'] = (num,)
+        if self.use_nan:
+            stats['num_nan'] = self.num_nan
+        if use_sum:
+            stats['sum'] = np.float64(self.total)
+        if quantiles is not None:
+            stats['quantiles'] = self.quantiles(quantiles)
+        return stats
+
+
 def set_overlaps(set1, set2, s1='s1', s2='s2'):
     import utool as ut
     set1 = set(set1)
@@ -3042,6 +3337,288 @@ class ColumnLists(NiceRepr):
 #     # need to change local variables. seems not possible
 
 
+class RaggedArray(NiceRepr):
+    r"""
+    Columnar storage for a list of variable length rows.
+
+    All items live in one flat ``values`` array and row ``i`` is
+    ``values[offsets[i]:offsets[i + 1]]``. Compared to an unflat list of lists
+    this costs one array element per item and one offset per row instead of
+    a python object per item and a list per row, and operations over all
+    rows run in numpy.
+
+    Args:
+        values (ndarray): 1D array with the items of all rows
+        offsets (ndarray): nondecreasing row boundaries starting at 0 and
+            ending at len(values)
+
+    SeeAlso:
+        invertible_flatten2
+        unflatten2
+        unflat_map
+
+    CommandLine:
+        python -m utool.util_dev RaggedArray
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_dev import *  # NOQA
+        >>> import numpy as np
+        >>> unflat_list = [[5], [2, 3, 12], [], [13, 3]]
+        >>> self = RaggedArray.from_unflat(unflat_list)
+        >>> print(self)
+        <RaggedArray(rows=4, values=6, dtype=int64)>
+        >>> assert self.tolist() == unflat_list
+        >>> print(self.lengths.tolist())
+        [1, 3, 0, 2]
+        >>> print(self.take([3, 1]).tolist())
+        [[13, 3], [2, 3, 12]]
+        >>> print(self.compress([True, False, True, True]).tolist())
+        [[5], [], [13, 3]]
+        >>> print(self.map(lambda x: x * 10).tolist())
+        [[50], [20, 30, 120], [], [130, 30]]
+        >>> print(self.sum().tolist())
+        [5, 17, 0, 16]
+        >>> print(self.max(fill=-1).tolist())
+        [5, 12, -1, 13]
+        >>> print(self[1])
+        [ 2  3 12]
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_dev import *  # NOQA
+        >>> import numpy as np
+        >>> items = np.array([10, 11, 12, 13, 14, 15])
+        >>> labels = np.array([2, 1, 2, 1, 3, 2])
+        >>> keys, groupxs = RaggedArray.group_indices(labels)
+        >>> print(keys.tolist())
+        [1, 2, 3]
+        >>> print(groupxs.tolist())
+        [[1, 3], [0, 2, 5], [4]]
+        >>> grouped = groupxs.map(items.take, vectorized=True)
+        >>> print(grouped.tolist())
+        [[11, 13], [10, 12, 15], [14]]
+        >>> print(grouped.ungroup(groupxs).tolist())
+        [10, 11, 12, 13, 14, 15]
+    """
+    def __init__(self, values, offsets):
+        values = np.asarray(values)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if values.ndim != 1:
+            raise ValueError('values must be 1D, got shape=%r' % (values.shape,))
+        if (offsets.ndim != 1 or len(offsets) == 0 or offsets[0] != 0 or
+             offsets[-1] != len(values) or np.any(np.diff(offsets) < 0)):
+            raise ValueError(
+                'offsets must be nondecreasing from 0 to len(values)=%d' % (
+                    len(values),))
+        self.values = values
+        self.offsets = offsets
+
+    @classmethod
+    def from_lengths(cls, values, lengths):
+        """ Builds rows from flat values and the length of each row """
+        lengths = np.asarray(lengths, dtype=np.int64)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(values, offsets)
+
+    @classmethod
+    def from_unflat(cls, unflat_list, dtype=None):
+        """
+        Builds rows from a list of lists (or of 1D arrays). This is the
+        inverse of :func:`RaggedArray.tolist`.
+        """
+        from utool import util_list
+        lengths = np.fromiter(map(len, unflat_list), dtype=np.int64,
+                              count=len(unflat_list))
+        flat_list = util_list.flatten(unflat_list)
+        if dtype is not None or len(flat_list) > 0:
+            values = np.asarray(flat_list, dtype=dtype)
+        elif util_list._is_ndarray_list(unflat_list):
+            values = np.array([], dtype=unflat_list[0].dtype)
+        else:
+            values = np.array([], dtype=np.int64)
+        return cls.from_lengths(values, lengths)
+
+    @classmethod
+    def group_indices(cls, labels):
+        """
+        Groups the positions of labels by label value.
+
+        Args:
+            labels (ndarray): label of each item
+
+        Returns:
+            tuple: (keys, groupxs) where keys are the sorted unique labels and
+                row i of groupxs holds the (increasing) indices of the items
+                labeled keys[i]
+        """
+        labels = np.asarray(labels)
+        sortx = np.argsort(labels, kind='stable')
+        keys, lengths = np.unique(labels[sortx], return_counts=True)
+        return keys, cls.from_lengths(sortx, lengths)
+
+    def __nice__(self):
+        return 'rows=%d, values=%d, dtype=%s' % (
+            len(self), len(self.values), self.values.dtype)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        values = self.values
+        offsets = self.offsets.tolist()
+        for low, high in zip(offsets[:-1], offsets[1:]):
+            yield values[low:high]
+
+    def __getitem__(self, index):
+        """ an int returns a view of one row, anything else is a take """
+        if isinstance(index, (int, np.integer)):
+            num = len(self)
+            if not -num <= index < num:
+                raise IndexError('row %d is out of bounds for %d rows' % (
+                    index, num))
+            index = index % num
+            return self.values[self.offsets[index]:self.offsets[index + 1]]
+        if isinstance(index, slice):
+            index = np.arange(len(self))[index]
+        index = np.asarray(index)
+        if index.dtype.kind == 'b':
+            return self.compress(index)
+        return self.take(index)
+
+    @property
+    def lengths(self):
+        """ number of items in each row """
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.offsets.nbytes
+
+    def row_index(self):
+        """ the row of each item in values """
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def tolist(self):
+        """ Returns the rows as a list of lists of python scalars """
+        values = self.values.tolist()
+        offsets = self.offsets.tolist()
+        return [values[low:high] for low, high in zip(offsets[:-1], offsets[1:])]
+
+    def take(self, row_indices):
+        """ Returns a new RaggedArray with the selected rows """
+        row_indices = np.asarray(row_indices, dtype=np.int64)
+        starts = self.offsets[:-1].take(row_indices)
+        lengths = self.lengths.take(row_indices)
+        new_offsets = np.zeros(len(row_indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=new_offsets[1:])
+        # Position of every selected item in the old values
+        flat_index = (np.repeat(starts - new_offsets[:-1], lengths) +
+                      np.arange(new_offsets[-1]))
+        return self.__class__(self.values.take(flat_index), new_offsets)
+
+    def compress(self, flags):
+        """ Returns a new RaggedArray with the rows where flags is True """
+        flags = np.asarray(flags, dtype=bool)
+        if len(flags) != len(self):
+            raise ValueError('len(flags)=%d does not correspond with '
+                             'len(self)=%d' % (len(flags), len(self)))
+        return self.take(np.flatnonzero(flags))
+
+    def map(self, func, vectorized=True, **kwargs):
+        """
+        Applies func to every item, keeping the row structure. With
+        vectorized=True func is called once on the flat values array.
+        """
+        if vectorized:
+            new_values = func(self.values, **kwargs)
+        else:
+            new_values = [func(item, **kwargs) for item in self.values.tolist()]
+        new_values = np.asarray(new_values)
+        if len(new_values) != len(self.values):
+            raise ValueError(
+                'flat lens not the same, len(new_values)=%d len(values)=%d' %
+                (len(new_values), len(self.values)))
+        return self.__class__(new_values, self.offsets)
+
+    def reduce(self, ufunc, fill=None):
+        """
+        Reduces each row with a binary numpy ufunc (e.g. np.add, np.maximum).
+
+        Args:
+            ufunc (np.ufunc): reduction operator
+            fill (scalar): result for empty rows. If None, empty rows raise a
+                ValueError like numpy reductions of zero-size arrays.
+
+        Returns:
+            ndarray: one value per row
+        """
+        nonempty = self.offsets[:-1] != self.offsets[1:]
+        num_empty = len(self) - np.count_nonzero(nonempty)
+        if num_empty and fill is None:
+            raise ValueError('%d rows are empty and no fill was given' % (
+                num_empty,))
+        if num_empty == len(self):
+            return np.full(len(self), fill,
+                           dtype=np.result_type(self.values, np.asarray(fill)))
+        # An empty row ends where the next row starts, so reducing at the
+        # starts of the nonempty rows gives each of them its own segment.
+        reduced = ufunc.reduceat(self.values, self.offsets[:-1][nonempty])
+        if num_empty == 0:
+            return reduced
+        result = np.full(len(self), fill,
+                         dtype=np.result_type(reduced, np.asarray(fill)))
+        result[nonempty] = reduced
+        return result
+
+    def sum(self):
+        """ sum of each row, 0 for empty rows """
+        return self.reduce(np.add, fill=0)
+
+    def min(self, fill=None):
+        return self.reduce(np.minimum, fill=fill)
+
+    def max(self, fill=None):
+        return self.reduce(np.maximum, fill=fill)
+
+    def mean(self):
+        """ mean of each row, nan for empty rows """
+        sums = self.reduce(np.add, fill=0).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / self.lengths
+
+    def ungroup(self, groupxs, maxval=None, fill=0):
+        """
+        Inverse of grouping: scatters the items of each row back to the
+        positions in the corresponding row of groupxs.
+
+        Args:
+            groupxs (RaggedArray): positions of the items, with the same
+                row lengths as self
+            maxval (int): largest position, defaults to max(groupxs.values)
+            fill (scalar): value of positions not in groupxs. The result
+                keeps the dtype of the values when there are no such
+                positions.
+
+        Returns:
+            ndarray: ungrouped_items
+        """
+        if not np.array_equal(self.offsets, groupxs.offsets):
+            raise ValueError('groupxs rows do not correspond with self')
+        if maxval is None:
+            maxval = groupxs.values.max() if len(groupxs.values) else -1
+        covered = np.zeros(maxval + 1, dtype=bool)
+        covered[groupxs.values] = True
+        if covered.all():
+            ungrouped = np.empty(maxval + 1, dtype=self.values.dtype)
+        else:
+            ungrouped = np.full(maxval + 1, fill, dtype=np.result_type(
+                self.values, np.asarray(fill)))
+        ungrouped[groupxs.values] = self.values
+        return ungrouped
+
+
 class NamedPartial(functools.partial, NiceRepr):
     def __init__(self, func, *args, **kwargs):
         import utool as ut
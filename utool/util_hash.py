@@ -492,12 +492,96 @@ def hash_data(data, hashlen=None, alphabet=None):
         # Get a 128 character hex string
         text = hasher.hexdigest()
         # Shorten length of string (by increasing base)
-        hashstr2 = convert_hexstr_to_bigbase(text, alphabet, bigbase=len(alphabet))
+        hashstr2 = convert_hexstr_to_bigbase(text, alphabet, bigbase=len(alphabet),
+                                             maxlen=hashlen)
         # Truncate
         text = hashstr2[:hashlen]
         return text
 
 
+class HashStream(object):
+    r"""
+    Incrementally hashes a sequence of items with the same framing that
+    :func:`hash_data` applies to a list. Calling ``update`` on each item of a
+    list and then ``hashstr`` gives the same result as calling ``hash_data``
+    on the whole list, so results can be hashed as they are produced (e.g.
+    from ``generate2`` or ``ProgIter``) without holding them in memory.
+
+    To combine work done in separate processes, each worker can compute the
+    ``digest`` of its own chunk and the parent can ``update`` a new stream
+    with those digests. This hash-of-hashes is deterministic for a fixed
+    chunking, but it is not equal to the one-shot hash of the full data.
+
+    Args:
+        hasher (None): a hashlib hasher, defaults to sha512 like hash_data
+
+    CommandLine:
+        python -m utool.util_hash HashStream
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_hash import *  # NOQA
+        >>> import numpy as np
+        >>> data = ['1', np.array([1, 2, 3]), ('a', [b'b', 3]), 4]
+        >>> stream = HashStream()
+        >>> for item in data:
+        >>>     stream.update(item)
+        >>> assert stream.hashstr() == hash_data(data)
+        >>> assert stream.count == 4
+        >>> assert HashStream().hashstr() == hash_data([])
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_hash import *  # NOQA
+        >>> chunks = [list(range(0, 5)), list(range(5, 10))]
+        >>> # each worker would compute its own partial digest
+        >>> partials = [HashStream().update_all(c).digest() for c in chunks]
+        >>> parent = HashStream().update_all(partials)
+        >>> assert parent.hashstr() == hash_data(partials)
+    """
+    _SEP = b'SEP'
+    _ITER_PREFIX = b'ITER'
+
+    def __init__(self, hasher=None):
+        if hasher is None:
+            hasher = hashlib.sha512()
+        self.hasher = hasher
+        self.count = 0
+        self.hasher.update(self._ITER_PREFIX)
+
+    def update(self, item):
+        """ Adds the next item of the stream """
+        if self.count > 0:
+            self.hasher.update(self._SEP)
+        _update_hasher(self.hasher, item)
+        self.count += 1
+        return self
+
+    def update_all(self, items):
+        """ Adds each item of an iterable to the stream """
+        for item in items:
+            self.update(item)
+        return self
+
+    def digest(self):
+        """ Returns the raw digest bytes of the items seen so far """
+        return self.hasher.digest()
+
+    def hexdigest(self):
+        return self.hasher.hexdigest()
+
+    def hashstr(self, hashlen=None, alphabet=None):
+        """ Returns a string identical to what hash_data would produce """
+        if alphabet is None:
+            alphabet = ALPHABET_27
+        if hashlen is None:
+            hashlen = HASH_LEN2
+        text = self.hasher.hexdigest()
+        hashstr2 = convert_hexstr_to_bigbase(text, alphabet, bigbase=len(alphabet),
+                                             maxlen=hashlen)
+        return hashstr2[:hashlen]
+
+
 def digest_data(data, alg='sha256'):
     hasher = {
         'md5'    : hashlib.md5,
@@ -649,7 +733,8 @@ def hashstr(data, hashlen=HASH_LEN, alphabet=ALPHABET):
         # Get a 128 character hex string
         text = hashlib.sha512(data).hexdigest()
         # Shorten length of string (by increasing base)
-        hashstr2 = convert_hexstr_to_bigbase(text, alphabet, bigbase=len(alphabet))
+        hashstr2 = convert_hexstr_to_bigbase(text, alphabet, bigbase=len(alphabet),
+                                             maxlen=hashlen)
         # Truncate
         text = hashstr2[:hashlen]
     return text
@@ -723,50 +808,110 @@ def _test_int_byte_conversion():
         assert int_ == int_0
 
 
-def convert_bytes_to_bigbase(bytes_, alphabet=ALPHABET_27):
+# Cache of digit lookup tables keyed by alphabet
+_BIGBASE_TABLES = {}
+
+
+def _get_bigbase_table(alphabet):
+    """
+    Returns (k, chunkbase, table) where table[r] is the k-digit encoding of
+    r < chunkbase = len(alphabet) ** k, least significant digit first.
+    """
+    key = tuple(alphabet)
+    try:
+        return _BIGBASE_TABLES[key]
+    except KeyError:
+        import itertools as it
+        bigbase = len(alphabet)
+        k = 1
+        while bigbase ** (k + 1) <= 2 ** 16:
+            k += 1
+        # product varies the last position fastest, so reverse each entry to
+        # put the least significant digit first.
+        table = [''.join(digits)[::-1]
+                 for digits in it.product(alphabet, repeat=k)]
+        _BIGBASE_TABLES[key] = info = (k, bigbase ** k, table)
+        return info
+
+
+def _int_to_bigbase(x, alphabet, maxlen=None):
+    """
+    Encodes a positive integer least significant digit first using a
+    precomputed table of k-digit chunks. If maxlen is given only the first
+    maxlen digits are computed, which is all hashstr needs.
+    """
+    k, chunkbase, table = _get_bigbase_table(alphabet)
+    truncated = False
+    if maxlen is not None:
+        limit = len(alphabet) ** maxlen
+        if x >= limit:
+            x %= limit
+            truncated = True
+    parts = []
+    while x:
+        x, r = divmod(x, chunkbase)
+        parts.append(table[r])
+    # The most significant chunk is padded with zero digits
+    text = ''.join(parts).rstrip(alphabet[0])
+    if truncated:
+        # Zero digits are significant when higher digits were dropped
+        text = text.ljust(maxlen, alphabet[0])
+    return text
+
+
+def convert_bytes_to_bigbase(bytes_, alphabet=ALPHABET_27, maxlen=None):
     r"""
     Args:
         bytes_ (bytes):
+        alphabet (list): list of characters
+        maxlen (int): if specified only the first maxlen characters are
+            computed. Equivalent to (but faster than) slicing the result.
 
     Returns:
         str:
 
-    Ignore:
-
     CommandLine:
         python -m utool.util_hash convert_bytes_to_bigbase
 
-    Ignore:
-        >>> # DISABLE_DOCTEST
+    Example:
+        >>> # ENABLE_DOCTEST
         >>> from utool.util_hash import *  # NOQA
-        >>> import utool as ut
         >>> bytes_ = b('9999999999999999999999999999999999')
         >>> alphabet = ALPHABET_27
         >>> result = convert_bytes_to_bigbase(bytes_, alphabet)
         >>> print(result)
         fervudwhpustklnptklklcgswbmvtustqocdpgiwkgrvwytvneardkpytd
+        >>> assert convert_bytes_to_bigbase(bytes_, maxlen=8) == result[:8]
     """
     x = _bytes_to_int(bytes_)
     if x == 0:
-        return '0'
-    sign = 1 if x > 0 else -1
-    x *= sign
-    digits = []
-    bigbase = len(alphabet)
-    while x:
-        digits.append(alphabet[x % bigbase])
-        x //= bigbase
-    if sign < 0:
-        digits.append('-')
-        digits.reverse()
-    newbase_str = ''.join(digits)
-    return newbase_str
+        return '0'[:maxlen]
+    return _int_to_bigbase(x, alphabet, maxlen)
 
 
-def convert_hexstr_to_bigbase(hexstr, alphabet=ALPHABET, bigbase=BIGBASE):
+def convert_hexstr_to_bigbase(hexstr, alphabet=ALPHABET, bigbase=BIGBASE,
+                              maxlen=None):
     r"""
     Packs a long hexstr into a shorter length string with a larger base
 
+    Args:
+        hexstr (str): base 16 text
+        alphabet (list): list of characters
+        bigbase (int): must be len(alphabet) to use the table based encoder
+        maxlen (int): if specified only the first maxlen characters are
+            computed. Equivalent to (but faster than) slicing the result.
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_hash import *  # NOQA
+        >>> hexstr = hashlib.sha512(b'foobar').hexdigest()
+        >>> text = convert_hexstr_to_bigbase(hexstr, ALPHABET_27, 26)
+        >>> assert text == convert_bytes_to_bigbase(bytes.fromhex(hexstr))
+        >>> assert text[:16] == convert_hexstr_to_bigbase(
+        >>>     hexstr, ALPHABET_27, 26, maxlen=16)
+        >>> print(text[:16])
+        ruvvlhnzcpzcehzo
+
     Ignore:
         # Determine the length savings with lossless conversion
         import sympy as sy
@@ -789,12 +934,29 @@ def convert_hexstr_to_bigbase(hexstr, alphabet=ALPHABET, bigbase=BIGBASE):
         info(27, 16)
         info(27, 64)
         info(27, 216)
+
+    Ignore:
+        # Benchmark the table based encoder against the digit loop
+        import utool as ut
+        hexstr = hashlib.sha512(b'foobar').hexdigest()
+        for timer in ut.Timerit(10000, label='full'):
+            with timer:
+                convert_hexstr_to_bigbase(hexstr, ALPHABET_27, 26)
+        for timer in ut.Timerit(10000, label='maxlen'):
+            with timer:
+                convert_hexstr_to_bigbase(hexstr, ALPHABET_27, 26, maxlen=16)
     """
     x = int(hexstr, 16)  # first convert to base 16
     if x == 0:
-        return '0'
+        return '0'[:maxlen]
     sign = 1 if x > 0 else -1
     x *= sign
+    if bigbase == len(alphabet):
+        newbase_str = _int_to_bigbase(x, alphabet,
+                                      maxlen=None if sign < 0 else maxlen)
+        if sign < 0:
+            newbase_str = ('-' + newbase_str[::-1])[:maxlen]
+        return newbase_str
     digits = []
     while x:
         digits.append(alphabet[x % bigbase])
@@ -802,10 +964,112 @@ def convert_hexstr_to_bigbase(hexstr, alphabet=ALPHABET, bigbase=BIGBASE):
     if sign < 0:
         digits.append('-')
         digits.reverse()
-    newbase_str = ''.join(digits)
+    newbase_str = ''.join(digits)[:maxlen]
     return newbase_str
 
 
+def convert_bytes_to_bigbase_batch(bytes_list, alphabet=ALPHABET_27,
+                                   maxlen=None):
+    r"""
+    Vectorized version of :func:`convert_bytes_to_bigbase` for many digests of
+    the same length (e.g. a list of sha digests). The big integers are stored
+    as rows of 32-bit limbs and long division by a power of the base is done
+    for all rows at once with numpy.
+
+    Args:
+        bytes_list (list): list of bytes objects
+        alphabet (list): list of single ascii characters
+        maxlen (int): if specified truncate each result to this length
+
+    Returns:
+        list: text_list - identical to mapping convert_bytes_to_bigbase
+
+    CommandLine:
+        python -m utool.util_hash convert_bytes_to_bigbase_batch
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_hash import *  # NOQA
+        >>> bytes_list = [hashlib.sha512(b(str(x))).digest() for x in range(100)]
+        >>> bytes_list += [bytes(64), b'\x00' * 63 + b'\x1a', b'\xff' * 64]
+        >>> for alphabet in [ALPHABET_27, ALPHABET_41, ALPHABET_16]:
+        >>>     for maxlen in [None, 16]:
+        >>>         got = convert_bytes_to_bigbase_batch(bytes_list, alphabet, maxlen)
+        >>>         want = [convert_bytes_to_bigbase(x, alphabet, maxlen)
+        >>>                 for x in bytes_list]
+        >>>         assert got == want
+
+    Ignore:
+        import utool as ut
+        bytes_list = [hashlib.sha512(b(str(x))).digest() for x in range(10000)]
+        for timer in ut.Timerit(10, label='scalar'):
+            with timer:
+                [convert_bytes_to_bigbase(x) for x in bytes_list]
+        for timer in ut.Timerit(10, label='batch'):
+            with timer:
+                convert_bytes_to_bigbase_batch(bytes_list)
+    """
+    bytes_list = list(bytes_list)
+    nbytes_set = set(map(len, bytes_list))
+    is_ascii = all(len(c) == 1 and ord(c) < 128 for c in alphabet)
+    if not (util_type.HAVE_NUMPY and is_ascii and len(nbytes_set) == 1):
+        return [convert_bytes_to_bigbase(x, alphabet, maxlen)
+                for x in bytes_list]
+    nbytes = nbytes_set.pop()
+    num = len(bytes_list)
+    bigbase = len(alphabet)
+    # Largest power of the base whose remainder times 2 ** 32 fits in uint64
+    k = 1
+    while bigbase ** (k + 1) < 2 ** 32:
+        k += 1
+    chunkbase = np.uint64(bigbase ** k)
+    # Number of division passes needed to exhaust the largest value. When
+    # only maxlen digits are wanted we can stop early.
+    npasses = 1
+    while (bigbase ** k) ** npasses < 256 ** nbytes:
+        npasses += 1
+    if maxlen is not None:
+        npasses = min(npasses, max(1, -(-maxlen // k)))
+    # Left pad to a whole number of big-endian 32-bit limbs
+    npad = (-nbytes) % 4
+    buf = np.frombuffer(b''.join(bytes_list), dtype=np.uint8)
+    buf = buf.reshape(num, nbytes)
+    if npad:
+        buf = np.hstack([np.zeros((num, npad), dtype=np.uint8), buf])
+    limbs = buf.copy().view('>u4').astype(np.uint64)
+    nlimbs = limbs.shape[1]
+    shift = np.uint64(32)
+    base_ = np.uint64(bigbase)
+    digits = np.empty((num, npasses * k), dtype=np.uint8)
+    # Index of the first limb that is nonzero in any row
+    start = 0
+    for pass_idx in range(npasses):
+        while start < nlimbs and not limbs[:, start].any():
+            start += 1
+        rem = np.zeros(num, dtype=np.uint64)
+        for j in range(start, nlimbs):
+            cur = (rem << shift) | limbs[:, j]
+            quot = cur // chunkbase
+            rem = cur - quot * chunkbase
+            limbs[:, j] = quot
+        for d in range(pass_idx * k, (pass_idx + 1) * k):
+            rem, digit = np.divmod(rem, base_)
+            digits[:, d] = digit
+    # Rows with remaining value were truncated, so zero digits are significant
+    has_more = limbs[:, start:].any(axis=1)
+    lookup = np.frombuffer(''.join(alphabet).encode('ascii'), dtype=np.uint8)
+    rows = lookup[digits].tobytes()
+    width = digits.shape[1]
+    zero = alphabet[0]
+    text_list = []
+    for idx, more in enumerate(has_more.tolist()):
+        text = rows[idx * width:(idx + 1) * width].decode('ascii')
+        if not more:
+            text = text.rstrip(zero) or '0'
+        text_list.append(text[:maxlen])
+    return text_list
+
+
 def hashstr_md5(data):
     """
     Ignore:
@@ -839,7 +1103,8 @@ def get_file_hash(fpath, blocksize=65536, hasher=None, stride=1,
         hasher (None):  defaults to sha1 for fast (but insecure) hashing
         stride (int): strides > 1 skip data to hash, useful for faster
                       hashing, but less accurate, also makes hash dependant on
-                      blocksize.
+                      blocksize. For near constant time fingerprints of huge
+                      files see :func:`get_file_fingerprint`.
 
     References:
         http://stackoverflow.com/questions/3431825/generating-a-md5-checksum-of-a-file
@@ -899,6 +1164,94 @@ def get_file_hash(fpath, blocksize=65536, hasher=None, stride=1,
             return hasher.digest()
 
 
+def _pread(fd, size, offset):
+    """ os.pread with a seek + read fallback for platforms without it """
+    if hasattr(os, 'pread'):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def get_file_fingerprint(fpath, num_samples=16, samplesize=2 ** 14,
+                         hasher=None, hexdigest=False):
+    r"""
+    Computes a SAMPLED fingerprint of a file from its size and
+    ``num_samples`` fixed-offset windows spread evenly from the first to the
+    last byte. The cost is nearly constant regardless of file size, which
+    makes it useful for finding duplicate candidates among huge media files.
+
+    WARNING: This is NOT a full integrity check. Files that differ only
+    outside of the sampled windows will have the same fingerprint. Confirm
+    candidates with :func:`get_file_hash` before acting on them.
+
+    Files no larger than ``num_samples * samplesize`` are read completely,
+    so for small files the fingerprint depends on every byte.
+
+    Args:
+        fpath (str):  file path string
+        num_samples (int): number of windows to read (at least 2 if the file
+            is large enough, which always includes the head and tail)
+        samplesize (int): number of bytes in each window
+        hasher (None): defaults to sha1
+        hexdigest (bool): if True return a hex string instead of bytes
+
+    Returns:
+        bytes: the digest of the sampled data
+
+    CommandLine:
+        python -m utool.util_hash get_file_fingerprint
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_hash import *  # NOQA
+        >>> import utool as ut
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_fingerprint')
+        >>> fpath1 = ut.unixjoin(dpath, 'big1.bin')
+        >>> fpath2 = ut.unixjoin(dpath, 'big2.bin')
+        >>> data = bytearray(os.urandom(2 ** 20))
+        >>> ut.write_to(fpath1, bytes(data), mode='wb', verbose=False)
+        >>> data[2 ** 19 + 12345] ^= 1  # change a byte that is not sampled
+        >>> ut.write_to(fpath2, bytes(data), mode='wb', verbose=False)
+        >>> kw = dict(num_samples=4, samplesize=1024, hexdigest=True)
+        >>> fp1 = get_file_fingerprint(fpath1, **kw)
+        >>> fp2 = get_file_fingerprint(fpath2, **kw)
+        >>> # The fingerprints agree but the full hashes do not
+        >>> assert fp1 == fp2
+        >>> assert get_file_hash(fpath1) != get_file_hash(fpath2)
+        >>> # Small files are hashed completely
+        >>> ut.write_to(fpath2, b'abc', mode='wb', verbose=False)
+        >>> assert get_file_fingerprint(fpath2, hexdigest=True) != fp1
+        >>> ut.delete(dpath, verbose=False)
+    """
+    if hasher is None:
+        hasher = hashlib.sha1()
+    fd = os.open(fpath, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        filesize = os.fstat(fd).st_size
+        # The size is part of the fingerprint
+        hasher.update(b'SIZE' + _int_to_bytes(filesize))
+        if filesize <= num_samples * samplesize:
+            offset = 0
+            while offset < filesize:
+                buf = _pread(fd, samplesize, offset)
+                if not buf:
+                    break
+                hasher.update(buf)
+                offset += len(buf)
+        else:
+            num_samples = max(num_samples, 2)
+            last = filesize - samplesize
+            for idx in range(num_samples):
+                offset = (last * idx) // (num_samples - 1)
+                hasher.update(_pread(fd, samplesize, offset))
+    finally:
+        os.close(fd)
+    if hexdigest:
+        return hasher.hexdigest()
+    else:
+        return hasher.digest()
+
+
 def write_hash_file(fpath, hash_tag='md5', recompute=False):
     r""" Creates a hash file for each file in a path
 
@@ -981,6 +1334,344 @@ def get_file_uuid(fpath, hasher=None, stride=1):
     return uuid_
 
 
+def _iter_file_sizes(fpaths, min_size):
+    """
+    Yields (size, inode, fpath) for regular files, where inode is the
+    (st_dev, st_ino) pair. A directory path is walked recursively.
+    """
+    import stat
+    if isinstance(fpaths, six.string_types):
+        fpaths = (os.path.join(root, fname)
+                  for root, dnames, fnames in os.walk(fpaths)
+                  for fname in fnames)
+    for fpath in fpaths:
+        try:
+            st = os.lstat(fpath)
+        except OSError:
+            continue
+        if not stat.S_ISREG(st.st_mode) or st.st_size < min_size:
+            continue
+        yield st.st_size, (st.st_dev, st.st_ino), fpath
+
+
+def _iter_size_groups(size_fpath_iter, nbuckets):
+    """
+    Yields lists of paths that share a file size. With nbuckets > 1 the
+    (size, inode, path) records are spilled into temporary bucket files
+    partitioned by size, so only one bucket needs to be held in memory at a
+    time.
+
+    Only the first path of each inode is kept: hardlinked paths already share
+    their data, and the same file reached through two paths (e.g. via a
+    symlinked directory) must not be reported as its own duplicate. Paths
+    of one inode always share a size, so this is done per size group.
+    """
+    import collections
+
+    def _unique_inode_groups(size_to_records):
+        for size, records in six.iteritems(size_to_records):
+            if len(records) > 1:
+                seen_inodes = set()
+                group = []
+                for inode, fpath in records:
+                    if inode not in seen_inodes:
+                        seen_inodes.add(inode)
+                        group.append(fpath)
+                if len(group) > 1:
+                    yield size, group
+
+    if nbuckets <= 1:
+        size_to_records = collections.defaultdict(list)
+        for size, inode, fpath in size_fpath_iter:
+            size_to_records[size].append((inode, fpath))
+        for item in _unique_inode_groups(size_to_records):
+            yield item
+        return
+    import tempfile
+    import shutil
+    tmp_dpath = tempfile.mkdtemp(prefix='utool_dedup_')
+    try:
+        bucket_fpaths = [os.path.join(tmp_dpath, 'bucket_%d' % (idx,))
+                         for idx in range(nbuckets)]
+        bucket_files = [open(fpath, 'wb') for fpath in bucket_fpaths]
+        try:
+            for size, (dev, ino), fpath in size_fpath_iter:
+                record = (b'%d\t%d\t%d\t' % (size, dev, ino) +
+                          os.fsencode(fpath) + b'\0')
+                bucket_files[size % nbuckets].write(record)
+        finally:
+            for file_ in bucket_files:
+                file_.close()
+        for bucket_fpath in bucket_fpaths:
+            size_to_records = collections.defaultdict(list)
+            with open(bucket_fpath, 'rb') as file_:
+                for record in file_.read().split(b'\0')[:-1]:
+                    size, dev, ino, fpath = record.split(b'\t', 3)
+                    size_to_records[int(size)].append(
+                        ((int(dev), int(ino)), os.fsdecode(fpath)))
+            os.remove(bucket_fpath)
+            for item in _unique_inode_groups(size_to_records):
+                yield item
+    finally:
+        shutil.rmtree(tmp_dpath, ignore_errors=True)
+
+
+def _sample_hash_worker(fpath, samplesize):
+    try:
+        return get_file_fingerprint(fpath, num_samples=2,
+                                    samplesize=samplesize)
+    except (IOError, OSError):
+        return None
+
+
+def _full_hash_worker(fpath):
+    try:
+        return get_file_hash(fpath, hasher=hashlib.sha256())
+    except (IOError, OSError):
+        return None
+
+
+def _group_by_result(fpaths, future_list):
+    """
+    Groups fpaths by the results of their futures, keeping the input order
+    within each group. Paths whose worker failed (returned None) are dropped.
+    """
+    import collections
+    key_to_fpaths = collections.defaultdict(list)
+    for fpath, future in zip(fpaths, future_list):
+        key = future.result()
+        if key is not None:
+            key_to_fpaths[key].append(fpath)
+    return [group for group in key_to_fpaths.values() if len(group) > 1]
+
+
+def _iter_hash_groups(size_groups, samplesize, nthreads, max_pending=None):
+    """
+    Yields the groups of paths that share a size and a sample hash (and a
+    full hash for files larger than the samples).
+
+    A single thread pool hashes across size groups, so many small size
+    groups are hashed concurrently. Sample hashes are submitted for up to
+    max_pending files ahead of the size group being resolved, and the
+    groups are yielded in size group order.
+    """
+    import collections
+    from concurrent import futures
+    if max_pending is None:
+        max_pending = 256 * nthreads
+    # (size, fpaths, sample futures) in submission order
+    pending = collections.deque()
+    npending = 0
+    executor = futures.ThreadPoolExecutor(nthreads)
+    try:
+        size_groups = iter(size_groups)
+        exhausted = False
+        while True:
+            while not exhausted and npending < max_pending:
+                try:
+                    size, group = next(size_groups)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future_list = [
+                    executor.submit(_sample_hash_worker, fpath, samplesize)
+                    for fpath in group]
+                pending.append((size, group, future_list))
+                npending += len(group)
+            if not pending:
+                break
+            size, group, future_list = pending.popleft()
+            npending -= len(group)
+            sample_groups = _group_by_result(group, future_list)
+            if size <= 2 * samplesize:
+                # The samples covered the entire file
+                for sample_group in sample_groups:
+                    yield sample_group
+                continue
+            # Full hashes of all colliding files in this size group are
+            # submitted together and run alongside the queued samples
+            full_jobs = [
+                (sample_group, [executor.submit(_full_hash_worker, fpath)
+                                for fpath in sample_group])
+                for sample_group in sample_groups]
+            for sample_group, full_futures in full_jobs:
+                for full_group in _group_by_result(sample_group, full_futures):
+                    yield full_group
+    finally:
+        # Do not hash the rest if the caller stops consuming early
+        for _, _, future_list in pending:
+            for future in future_list:
+                future.cancel()
+        executor.shutdown(wait=True)
+
+
+def ifind_duplicate_files(fpaths, samplesize=2 ** 14, min_size=1,
+                          nbuckets=1, nthreads=None, verbose=False):
+    r"""
+    Iteratively finds groups of files with identical contents.
+
+    Files go through increasingly expensive stages and only files that still
+    collide move on to the next stage:
+
+        1. group by file size (a single stat per file)
+        2. group by a hash of the head and tail samples
+        3. group by a full sha256 hash of the file contents
+
+    Hashing is done on one thread pool shared by all size groups because it
+    is IO bound.
+
+    Args:
+        fpaths (str or iterable): a directory to walk recursively or an
+            iterable of file paths (e.g. the result of ``ut.glob``)
+        samplesize (int): number of bytes in the head and tail samples. Files
+            no larger than twice this are fully read in stage 2 and skip
+            stage 3.
+        min_size (int): ignore files smaller than this (empty files are
+            ignored by default)
+        nbuckets (int): if larger than 1, the (size, path) pairs from stage 1
+            are spilled to this many temporary files on disk, which bounds
+            memory to roughly 1 / nbuckets of the input. Use this for tens of
+            millions of files.
+        nthreads (int): number of hashing threads, defaults to the number of
+            cpus.
+        verbose (bool): verbosity flag
+
+    Yields:
+        list: a group of paths with identical contents. The paths within
+            each group are in their input order.
+
+    SeeAlso:
+        find_duplicate_files
+        link_duplicate_files
+
+    CommandLine:
+        python -m utool.util_hash ifind_duplicate_files
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_hash import *  # NOQA
+        >>> from os.path import join, relpath
+        >>> import utool as ut
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_dedup')
+        >>> ut.delete(dpath, verbose=False)
+        >>> ut.ensuredir((dpath, 'sub'))
+        >>> big1 = b'x' * 50000 + b'A' + b'x' * 50000
+        >>> big2 = b'x' * 50000 + b'B' + b'x' * 50000
+        >>> contents = {'a.txt': b'foo', 'b.txt': b'foo', 'sub/c.txt': b'foo',
+        >>>             'd.txt': b'bar', 'e.txt': b'baz', 'f.txt': b'',
+        >>>             'g.txt': b'', 'big1': big1, 'big2': big2,
+        >>>             'sub/big3': big1}
+        >>> for fname, data in contents.items():
+        >>>     ut.write_to(join(dpath, fname), data, mode='wb', verbose=False)
+        >>> groups = sorted(sorted(relpath(p, dpath) for p in group)
+        >>>                 for group in ifind_duplicate_files(dpath))
+        >>> print(ut.repr2(groups))
+        [['a.txt', 'b.txt', 'sub/c.txt'], ['big1', 'sub/big3']]
+        >>> groups2 = sorted(sorted(relpath(p, dpath) for p in group)
+        >>>                  for group in ifind_duplicate_files(
+        >>>                      dpath, nbuckets=3, nthreads=1))
+        >>> assert groups == groups2
+        >>> ut.delete(dpath, verbose=False)
+    """
+    from utool import util_progress
+    from utool import util_parallel
+    if nthreads is None:
+        nthreads = util_parallel.get_default_numprocs()
+    size_fpath_iter = _iter_file_sizes(fpaths, min_size)
+    size_groups = _iter_size_groups(size_fpath_iter, nbuckets)
+    if verbose:
+        size_groups = util_progress.ProgIter(
+            size_groups, lbl='dedup size groups', adjust=True)
+    for group in _iter_hash_groups(size_groups, samplesize, max(1, nthreads)):
+        yield group
+
+
+def find_duplicate_files(fpaths, **kwargs):
+    r"""
+    Finds groups of files with identical contents. See
+    :func:`ifind_duplicate_files` for the arguments.
+
+    Returns:
+        list: groups of duplicate file paths
+    """
+    return list(ifind_duplicate_files(fpaths, **kwargs))
+
+
+def link_duplicate_files(groups, mode='hardlink', dryrun=False, verbose=True):
+    r"""
+    Replaces all but the first file in each duplicate group with a link to
+    the first file. Each link is created under a temporary name and then
+    renamed over the duplicate, so a failure never leaves a file missing.
+
+    Args:
+        groups (list): groups of duplicate paths (e.g. from
+            :func:`find_duplicate_files`)
+        mode (str): either 'hardlink' or 'symlink'
+        dryrun (bool): if True only report what would be done
+        verbose (bool): verbosity flag
+
+    Returns:
+        list: (keep, dup) pairs for each duplicate that was replaced
+
+    CommandLine:
+        python -m utool.util_hash link_duplicate_files
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> # xdoctest: +REQUIRES(POSIX)
+        >>> from utool.util_hash import *  # NOQA
+        >>> from os.path import join
+        >>> import utool as ut
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_dedup_link')
+        >>> ut.delete(dpath, verbose=False)
+        >>> ut.ensuredir(dpath)
+        >>> for fname in ['a.txt', 'b.txt', 'c.txt']:
+        >>>     ut.write_to(join(dpath, fname), 'foo', verbose=False)
+        >>> groups = find_duplicate_files(dpath)
+        >>> pairs = link_duplicate_files(groups, mode='hardlink', verbose=False)
+        >>> assert len(pairs) == 2
+        >>> assert os.stat(join(dpath, 'a.txt')).st_nlink == 3
+        >>> # Hardlinked files are no longer reported as duplicates
+        >>> assert find_duplicate_files(dpath) == []
+        >>> # One file reached through two paths is not its own duplicate
+        >>> alias = join(dpath, 'alias')
+        >>> os.symlink(dpath, alias)
+        >>> fpaths = [join(dpath, 'a.txt'), join(alias, 'a.txt')]
+        >>> assert find_duplicate_files(fpaths) == []
+        >>> assert link_duplicate_files([fpaths], mode='symlink',
+        >>>                             verbose=False) == []
+        >>> assert not os.path.islink(join(dpath, 'a.txt'))
+        >>> os.remove(alias)
+        >>> ut.delete(dpath, verbose=False)
+    """
+    from utool import util_path
+    if mode not in {'hardlink', 'symlink'}:
+        raise ValueError('unknown mode=%r' % (mode,))
+    linked_pairs = []
+    for group in groups:
+        keep = group[0]
+        for dup in group[1:]:
+            try:
+                same = os.path.samefile(keep, dup)
+            except OSError:
+                same = False
+            if same:
+                # replacing a file with a link to itself would destroy it
+                continue
+            if verbose:
+                print('[util_hash] %s %s -> %s' % (mode, dup, keep))
+            if not dryrun:
+                tmp_fpath = dup + '.utool_link_tmp'
+                if mode == 'hardlink':
+                    os.link(keep, tmp_fpath)
+                else:
+                    util_path.symlink(os.path.abspath(keep), tmp_fpath,
+                                      verbose=0)
+                os.replace(tmp_fpath, dup)
+            linked_pairs.append((keep, dup))
+    return linked_pairs
+
+
 def image_uuid(pil_img):
     """
     UNSAFE: DEPRICATE: JPEG IS NOT GAURENTEED TO PRODUCE CONSITENT VALUES ON
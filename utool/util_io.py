@@ -5,6 +5,8 @@ from six.moves import cPickle as pickle
 from utool import util_path
 from utool import util_inject
 from os.path import splitext, basename, exists
+from collections import OrderedDict
+from collections.abc import Mapping
 try:
     import lockfile
     HAVE_LOCKFILE = True
@@ -36,6 +38,8 @@ def load_data(fpath, **kwargs):
         return load_cPkl(fpath, **kwargs)
     elif ext in ['.json']:
         return load_json(fpath, **kwargs)
+    elif ext in JSONL_EXTS:
+        return list(iter_data(fpath, **kwargs))
     elif ext in ['.hdf5']:
         return load_hdf5(fpath, **kwargs)
     elif ext in ['.txt']:
@@ -49,18 +53,25 @@ def load_data(fpath, **kwargs):
 def save_data(fpath, data, **kwargs):
     """ More generic interface to write data """
     ext = splitext(fpath)[1]
-    if ext in ['.pickle', '.cPkl', '.pkl']:
-        return save_cPkl(fpath, data, **kwargs)
-    elif ext in ['.json']:
-        return save_json(fpath, data, **kwargs)
-    elif ext in ['.hdf5']:
-        return save_hdf5(fpath, data, **kwargs)
-    elif ext in ['.txt']:
-        return save_text(fpath, **kwargs)
-    elif HAS_NUMPY and ext in ['.npz', '.npy']:
-        return save_numpy(fpath, data, **kwargs)
-    else:
-        assert False, 'unknown ext=%r for fpath=%r' % (ext, fpath)
+    try:
+        if ext in ['.pickle', '.cPkl', '.pkl']:
+            return save_cPkl(fpath, data, **kwargs)
+        elif ext in ['.json']:
+            return save_json(fpath, data, **kwargs)
+        elif ext in JSONL_EXTS:
+            with open_data_writer(fpath, mode='w', **kwargs) as writer:
+                writer.extend(data)
+        elif ext in ['.hdf5']:
+            return save_hdf5(fpath, data, **kwargs)
+        elif ext in ['.txt']:
+            return save_text(fpath, **kwargs)
+        elif HAS_NUMPY and ext in ['.npz', '.npy']:
+            return save_numpy(fpath, data, **kwargs)
+        else:
+            assert False, 'unknown ext=%r for fpath=%r' % (ext, fpath)
+    finally:
+        # the file was created or changed behind any active StatCache
+        util_path._invalidate_stat_caches(fpath)
 
 
 def _rectify_verb_write(verbose):
@@ -134,31 +145,35 @@ def write_to(fpath, to_write, aslines=False, verbose=None,
         # Should just read from the file
         fpath = fpath.name
 
-    with open(fpath, mode) as file_:
-        if aslines:
-            file_.writelines(to_write)
-        else:
-            # Ensure python2 writes in bytes
-            if six.PY2:
-                if isinstance(to_write, unicode):  # NOQA
-                    to_write = to_write.encode('utf8')
-            try:
-                file_.write(to_write)
-            except UnicodeEncodeError as ex:
-                start = max(ex.args[2] - 10, 0)
-                end = ex.args[3] + 10
-                context = to_write[start:end]
-                print(repr(context))
-                print(context)
-                from utool import util_dbg
-                util_dbg.printex(ex, keys=[(type, 'to_write')])
-                file_.close()
-                if backup:
-                    # restore
-                    util_path.copy(fpath + '.backup', fpath)
-                # import utool
-                # utool.embed()
-                raise
+    try:
+        with open(fpath, mode) as file_:
+            if aslines:
+                file_.writelines(to_write)
+            else:
+                # Ensure python2 writes in bytes
+                if six.PY2:
+                    if isinstance(to_write, unicode):  # NOQA
+                        to_write = to_write.encode('utf8')
+                try:
+                    file_.write(to_write)
+                except UnicodeEncodeError as ex:
+                    start = max(ex.args[2] - 10, 0)
+                    end = ex.args[3] + 10
+                    context = to_write[start:end]
+                    print(repr(context))
+                    print(context)
+                    from utool import util_dbg
+                    util_dbg.printex(ex, keys=[(type, 'to_write')])
+                    file_.close()
+                    if backup:
+                        # restore
+                        util_path.copy(fpath + '.backup', fpath)
+                    # import utool
+                    # utool.embed()
+                    raise
+    finally:
+        # the file was created or changed behind any active StatCache
+        util_path._invalidate_stat_caches(fpath)
 
 
 def read_from(fpath, verbose=None, aslines=False, strict=True, n=None, errors='replace'):
@@ -613,7 +628,13 @@ def save_hdf5(fpath, data, verbose=None, compression='lzf'):
             dset[...] = data
 
 
-def load_hdf5(fpath, verbose=None):
+def load_hdf5(fpath, verbose=None, lazy=False):
+    """
+    Args:
+        fpath (str): file written by :func:`save_hdf5`
+        lazy (bool): if True return a :class:`LazyHDF5` view instead of
+            reading everything into memory.
+    """
     import h5py
     fname = basename(fpath)
     #file_ = h5py.File(fpath, 'r')
@@ -622,6 +643,8 @@ def load_hdf5(fpath, verbose=None):
     verbose = _rectify_verb_read(verbose)
     if verbose:
         print('[util_io] * load_hdf5(%r)' % (util_path.tail(fpath),))
+    if lazy:
+        return open_lazy_data(fpath, verbose=False)
     with h5py.File(fpath, 'r') as file_:
         value = file_[fname]
         if isinstance(value, h5py.Group):
@@ -707,10 +730,19 @@ def load_pytables(fpath, verbose=False):
     return data
 
 
-def load_numpy(fpath, mmap_mode=None, verbose=None):
+def load_numpy(fpath, mmap_mode=None, verbose=None, lazy=False):
+    """
+    Args:
+        fpath (str): .npy or .npz file
+        mmap_mode (str): passed to np.load
+        lazy (bool): if True return a read-only memory map (.npy) or a
+            :class:`LazyNpz` view (.npz) instead of reading into memory.
+    """
     verbose = _rectify_verb_read(verbose)
     if verbose:
         print('[util_io] * load_numpy(%r)' % util_path.tail(fpath))
+    if lazy:
+        return open_lazy_data(fpath, verbose=False)
     return np.load(fpath, mmap_mode=mmap_mode)
 
 
@@ -721,6 +753,539 @@ def save_numpy(fpath, data, verbose=None, **kwargs):
     return np.save(fpath, data)
 
 
+# --- Lazy containers ---
+
+
+class _LazyContainer(Mapping):
+    """
+    Read-only dict-like view over the arrays in a file. Values are opened on
+    first access and cached.
+    """
+    def __init__(self, fpath, mmap=True):
+        self.fpath = fpath
+        self.mmap = mmap
+        self._cache = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            if key not in self._keys:
+                raise
+            value = self._cache[key] = self._load(key)
+            return value
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __repr__(self):
+        return '<%s(%r) keys=%r>' % (self.__class__.__name__,
+                                     basename(self.fpath), list(self._keys))
+
+    def close(self):
+        self._cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value, trace):
+        self.close()
+        if trace is not None:
+            return False  # return a falsey value on error
+
+
+def _npy_memmap_at(fpath, file_, offset):
+    """ memory maps the npy array stored at ``offset`` in an open file """
+    fmt = np.lib.format
+    file_.seek(offset)
+    version = fmt.read_magic(file_)
+    if version == (1, 0):
+        shape, fortran_order, dtype = fmt.read_array_header_1_0(file_)
+    else:
+        shape, fortran_order, dtype = fmt.read_array_header_2_0(file_)
+    if dtype.hasobject:
+        return None
+    order = 'F' if fortran_order else 'C'
+    return np.memmap(fpath, dtype=dtype, mode='r', offset=file_.tell(),
+                     shape=shape, order=order)
+
+
+class LazyNpz(_LazyContainer):
+    """
+    Lazy view of an ``.npz`` file. Arrays stored without compression (as
+    written by ``np.savez``) are memory mapped directly out of the archive,
+    compressed arrays are decompressed on first access.
+
+    Args:
+        fpath (str): path to an .npz file
+        mmap (bool): memory map uncompressed members
+    """
+    def __init__(self, fpath, mmap=True):
+        import zipfile
+        super(LazyNpz, self).__init__(fpath, mmap)
+        self._zip = zipfile.ZipFile(fpath)
+        self._members = OrderedDict(
+            (name[:-4], name) for name in self._zip.namelist()
+            if name.endswith('.npy'))
+        self._keys = self._members
+
+    def _load(self, key):
+        import zipfile
+        import struct
+        info = self._zip.getinfo(self._members[key])
+        if self.mmap and info.compress_type == zipfile.ZIP_STORED:
+            with open(self.fpath, 'rb') as file_:
+                # Skip the local file header to find the member data
+                file_.seek(info.header_offset)
+                local_header = file_.read(30)
+                name_len, extra_len = struct.unpack('<HH', local_header[26:30])
+                offset = info.header_offset + 30 + name_len + extra_len
+                arr = _npy_memmap_at(self.fpath, file_, offset)
+            if arr is not None:
+                return arr
+        with self._zip.open(info) as file_:
+            return np.lib.format.read_array(file_, allow_pickle=False)
+
+    def close(self):
+        super(LazyNpz, self).close()
+        self._zip.close()
+
+
+class LazyHDF5(_LazyContainer):
+    """
+    Lazy view of an HDF5 file written by :func:`save_hdf5`.
+
+    Contiguous uncompressed datasets are memory mapped. Chunked or
+    compressed datasets are returned as ``h5py.Dataset`` objects, which
+    read only the chunks a slice touches. Attributes are returned as values,
+    like :func:`load_hdf5` does. The file stays open until :func:`close`.
+
+    Args:
+        fpath (str): path to an .hdf5 file
+        mmap (bool): memory map contiguous datasets
+    """
+    def __init__(self, fpath, mmap=True):
+        import h5py
+        super(LazyHDF5, self).__init__(fpath, mmap)
+        self.file_ = h5py.File(fpath, 'r')
+        fname = basename(fpath)
+        self.root = self.file_[fname] if fname in self.file_ else self.file_
+        if isinstance(self.root, h5py.Dataset):
+            self._keys = []
+        else:
+            self._keys = list(self.root.keys()) + [
+                key for key in self.root.attrs.keys() if key not in self.root]
+
+    def _load(self, key):
+        if key not in self.root:
+            return self.root.attrs[key]
+        dset = self.root[key]
+        if self.mmap:
+            arr = _hdf5_memmap(self.fpath, dset)
+            if arr is not None:
+                return arr
+        return dset
+
+    def close(self):
+        super(LazyHDF5, self).close()
+        if self.file_ is not None:
+            self.file_.close()
+            self.file_ = None
+
+
+def _hdf5_memmap(fpath, dset):
+    """ memory maps a contiguous uncompressed dataset, otherwise None """
+    if dset.chunks is not None or dset.compression is not None:
+        return None
+    if dset.dtype.hasobject or dset.size == 0:
+        return None
+    offset = dset.id.get_offset()
+    if offset is None:
+        return None
+    return np.memmap(fpath, dtype=dset.dtype, mode='r', offset=offset,
+                     shape=dset.shape)
+
+
+def open_lazy_data(fpath, mmap=True, verbose=None):
+    r"""
+    Opens an array file without reading it into memory.
+
+    Args:
+        fpath (str): .npy, .npz or .hdf5 file
+        mmap (bool): memory map data wherever the format allows
+
+    Returns:
+        LazyNpz or LazyHDF5 or ndarray: for .npy files (and HDF5 files
+            holding a single dataset) the lazy array itself, otherwise a
+            read-only dict-like view whose values are opened on first access.
+
+    CommandLine:
+        python -m utool.util_io open_lazy_data
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_io import *  # NOQA
+        >>> import utool as ut
+        >>> import numpy as np
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_lazy_io')
+        >>> fpath = ut.unixjoin(dpath, 'feats.npz')
+        >>> np.savez(fpath, feats=np.arange(12).reshape(3, 4), ids=np.arange(3))
+        >>> with open_lazy_data(fpath, verbose=False) as lazy:
+        >>>     print(sorted(lazy.keys()))
+        >>>     feats = lazy['feats']
+        >>>     print(type(feats).__name__, feats[1:, 2].tolist())
+        ['feats', 'ids']
+        memmap [6, 10]
+        >>> fpath2 = ut.unixjoin(dpath, 'feats_compressed.npz')
+        >>> np.savez_compressed(fpath2, feats=np.arange(12).reshape(3, 4))
+        >>> lazy = open_lazy_data(fpath2, verbose=False)
+        >>> print(type(lazy['feats']).__name__, lazy['feats'][2, 3])
+        ndarray 11
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> # xdoctest: +REQUIRES(module:h5py)
+        >>> from utool.util_io import *  # NOQA
+        >>> import utool as ut
+        >>> import numpy as np
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_lazy_io')
+        >>> fpath = ut.unixjoin(dpath, 'feats.hdf5')
+        >>> data = {'feats': np.arange(12).reshape(3, 4), 'name': 'foo'}
+        >>> save_hdf5(fpath, data, verbose=False)
+        >>> with load_hdf5(fpath, lazy=True, verbose=False) as lazy:
+        >>>     print(sorted(lazy.keys()), lazy['feats'][1:, 2].tolist())
+        ['feats', 'name'] [6, 10]
+    """
+    verbose = _rectify_verb_read(verbose)
+    if verbose:
+        print('[util_io] * open_lazy_data(%r)' % (util_path.tail(fpath),))
+    ext = splitext(fpath)[1]
+    if ext == '.npy':
+        return np.load(fpath, mmap_mode='r' if mmap else None)
+    elif ext == '.npz':
+        return LazyNpz(fpath, mmap=mmap)
+    elif ext in ['.hdf5', '.h5']:
+        import h5py
+        lazy = LazyHDF5(fpath, mmap=mmap)
+        if isinstance(lazy.root, h5py.Dataset):
+            # A single array was saved, mirror load_hdf5 and return it
+            dset = lazy.root
+            arr = _hdf5_memmap(fpath, dset) if mmap else None
+            return dset if arr is None else arr
+        return lazy
+    else:
+        assert False, 'unknown lazy ext=%r for fpath=%r' % (ext, fpath)
+
+
+# --- Streaming record files ---
+
+JSONL_EXTS = ['.jsonl', '.ndjson']
+PICKLE_EXTS = ['.pickle', '.cPkl', '.pkl']
+
+
+class _RecordWriter(object):
+    """
+    Base class for append-able record writers created by
+    :func:`open_data_writer`.
+    """
+    def __init__(self, fpath, mode='a', verbose=None):
+        if mode not in ['a', 'w']:
+            raise ValueError('mode must be "a" or "w", got mode=%r' % (mode,))
+        self.fpath = fpath
+        self.mode = mode
+        self.count = 0
+        self.file_ = None
+        verbose = _rectify_verb_write(verbose)
+        if verbose:
+            print('[util_io] * open %s(%r, mode=%r)' % (
+                self.__class__.__name__, util_path.tail(fpath), mode))
+
+    def write(self, record):
+        raise NotImplementedError('abstract')
+
+    def extend(self, records):
+        """ writes each record in an iterable """
+        for record in records:
+            self.write(record)
+        return self
+
+    def flush(self):
+        self.file_.flush()
+
+    def close(self):
+        if self.file_ is not None:
+            self.file_.close()
+            self.file_ = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value, trace):
+        self.close()
+        if trace is not None:
+            return False  # return a falsey value on error
+
+
+class JsonLinesWriter(_RecordWriter):
+    """
+    Appends one JSON document per line, encoded with :func:`ut.to_json`.
+    """
+    def __init__(self, fpath, mode='a', verbose=None, allow_pickle=False):
+        super(JsonLinesWriter, self).__init__(fpath, mode, verbose)
+        self.allow_pickle = allow_pickle
+        self.file_ = open(fpath, mode + 'b')
+
+    def write(self, record):
+        from utool import util_cache
+        line = util_cache.to_json(record, allow_pickle=self.allow_pickle)
+        self.file_.write(line.encode('utf8') + b'\n')
+        self.count += 1
+        return self
+
+
+class PickleStreamWriter(_RecordWriter):
+    """
+    Appends consecutive pickles to a single file. :func:`load_cPkl` reads
+    the first record, :func:`iter_data` reads all of them.
+    """
+    def __init__(self, fpath, mode='a', verbose=None):
+        super(PickleStreamWriter, self).__init__(fpath, mode, verbose)
+        self.file_ = open(fpath, mode + 'b')
+
+    def write(self, record):
+        # Use protocol 2 to support python2 and 3
+        pickle.dump(record, self.file_, protocol=2)
+        self.count += 1
+        return self
+
+
+class NpyAppendWriter(_RecordWriter):
+    """
+    Appends rows to a ``.npy`` file. The header is rewritten in place after
+    every write, so readers (including ``np.load(mmap_mode='r')``) always see
+    every completed write even if the writer process dies.
+
+    Args:
+        fpath (str): path to a .npy file
+        mode (str): 'a' to append to an existing file, 'w' to truncate
+        dtype (dtype): dtype of a new file (default: dtype of the first write)
+    """
+    # Spare bytes in new headers so the shape can grow in place
+    _HEADER_SPARE = 64
+
+    def __init__(self, fpath, mode='a', verbose=None, dtype=None):
+        super(NpyAppendWriter, self).__init__(fpath, mode, verbose)
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self.shape = None
+        self._header_len = None
+        if mode == 'a' and exists(fpath):
+            self.file_ = open(fpath, 'r+b')
+            self._read_existing_header()
+        else:
+            self.file_ = open(fpath, 'wb')
+
+    def _read_existing_header(self):
+        fmt = np.lib.format
+        file_ = self.file_
+        version = fmt.read_magic(file_)
+        if version == (1, 0):
+            shape, fortran_order, dtype = fmt.read_array_header_1_0(file_)
+        else:
+            shape, fortran_order, dtype = fmt.read_array_header_2_0(file_)
+        if fortran_order:
+            raise ValueError('cannot append to fortran ordered fpath=%r' % (
+                self.fpath,))
+        if len(shape) == 0:
+            raise ValueError('cannot append to a 0-d array fpath=%r' % (
+                self.fpath,))
+        if self.dtype is not None and self.dtype != dtype:
+            raise ValueError('dtype=%r does not match existing dtype=%r' % (
+                self.dtype, dtype))
+        self._version = version
+        self._header_len = file_.tell()
+        self.dtype = dtype
+        self.shape = tuple(shape)
+        self.count = shape[0]
+        # Drop any partially written trailing data
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        file_.truncate(self._header_len + nbytes)
+        file_.seek(0, 2)
+
+    def _header_bytes(self, shape, header_len=None):
+        import struct
+        fmt = np.lib.format
+        header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+            fmt.dtype_to_descr(self.dtype), tuple(shape))
+        if header_len is None:
+            version = (1, 0)
+            prefix_len = 10
+            total = prefix_len + len(header) + 1 + self._HEADER_SPARE
+            total = ((total + 63) // 64) * 64
+        else:
+            version = self._version
+            prefix_len = 10 if version == (1, 0) else 12
+            total = header_len
+        pad = total - prefix_len - len(header) - 1
+        if pad < 0:
+            raise ValueError('no room to grow the header of fpath=%r' % (
+                self.fpath,))
+        header = (header + ' ' * pad + '\n').encode('latin1')
+        self._version = version
+        magic = fmt.magic(*version)
+        lenfmt = '<H' if version == (1, 0) else '<I'
+        return magic + struct.pack(lenfmt, len(header)) + header
+
+    def write(self, chunk):
+        """
+        Appends an array whose trailing dimensions match the file. A
+        single row (with the trailing shape) is also accepted.
+        """
+        chunk = np.asarray(chunk, dtype=self.dtype)
+        if self.dtype is None:
+            self.dtype = chunk.dtype
+        if self.shape is None:
+            if chunk.ndim == 0:
+                chunk = chunk.reshape(1)
+            self.shape = (0,) + chunk.shape[1:]
+            header = self._header_bytes(self.shape)
+            self._header_len = len(header)
+            self.file_.write(header)
+        row_shape = self.shape[1:]
+        if chunk.shape == row_shape:
+            chunk = chunk.reshape((1,) + row_shape)
+        if chunk.shape[1:] != row_shape:
+            raise ValueError('chunk shape %r is incompatible with %r' % (
+                chunk.shape, self.shape))
+        self.file_.write(np.ascontiguousarray(chunk).tobytes())
+        self.shape = (self.shape[0] + len(chunk),) + row_shape
+        self.count = self.shape[0]
+        self._update_header()
+        return self
+
+    def _update_header(self):
+        header = self._header_bytes(self.shape, self._header_len)
+        file_ = self.file_
+        file_.seek(0)
+        file_.write(header)
+        file_.seek(0, 2)
+
+
+def open_data_writer(fpath, mode='a', verbose=None, **kwargs):
+    r"""
+    Opens an append-able record writer chosen by the file extension.
+
+    ``.jsonl`` / ``.ndjson`` files hold one JSON document per line, pickle
+    extensions hold consecutive pickles, and ``.npy`` files are extended
+    along the first axis. Records can be read back lazily with
+    :func:`iter_data`.
+
+    Args:
+        fpath (str): file path
+        mode (str): 'a' appends to an existing file, 'w' truncates it
+        **kwargs: passed to the writer class
+
+    Returns:
+        JsonLinesWriter or PickleStreamWriter or NpyAppendWriter: writer
+
+    CommandLine:
+        python -m utool.util_io open_data_writer
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_io import *  # NOQA
+        >>> import utool as ut
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_stream_io')
+        >>> for ext in ['.jsonl', '.pkl']:
+        >>>     fpath = ut.unixjoin(dpath, 'records' + ext)
+        >>>     with open_data_writer(fpath, mode='w', verbose=False) as writer:
+        >>>         writer.write({'a': 1})
+        >>>     with open_data_writer(fpath, verbose=False) as writer:
+        >>>         writer.extend([{'b': 2}, [3, 4]])
+        >>>     print(list(iter_data(fpath, verbose=False)))
+        [{'a': 1}, {'b': 2}, [3, 4]]
+        [{'a': 1}, {'b': 2}, [3, 4]]
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_io import *  # NOQA
+        >>> import utool as ut
+        >>> import numpy as np
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_stream_io')
+        >>> fpath = ut.unixjoin(dpath, 'rows.npy')
+        >>> with open_data_writer(fpath, mode='w', verbose=False) as writer:
+        >>>     writer.write(np.zeros((2, 3), dtype=np.float32))
+        >>>     writer.write(np.ones(3))
+        >>> with open_data_writer(fpath, verbose=False) as writer:
+        >>>     writer.write(np.full((4, 3), 2))
+        >>> data = np.load(fpath)
+        >>> print(data.shape, data.dtype, data[:, 0].tolist())
+        (7, 3) float32 [0.0, 0.0, 1.0, 2.0, 2.0, 2.0, 2.0]
+        >>> chunks = list(iter_data(fpath, chunksize=4, verbose=False))
+        >>> print([len(c) for c in chunks])
+        [4, 3]
+    """
+    ext = splitext(fpath)[1]
+    if ext in JSONL_EXTS:
+        return JsonLinesWriter(fpath, mode=mode, verbose=verbose, **kwargs)
+    elif ext in PICKLE_EXTS:
+        return PickleStreamWriter(fpath, mode=mode, verbose=verbose, **kwargs)
+    elif HAS_NUMPY and ext in ['.npy']:
+        return NpyAppendWriter(fpath, mode=mode, verbose=verbose, **kwargs)
+    else:
+        assert False, 'unknown stream ext=%r for fpath=%r' % (ext, fpath)
+
+
+def iter_data(fpath, chunksize=None, verbose=None, **kwargs):
+    """
+    Lazily iterates over the records of a file written by
+    :func:`open_data_writer` (or any .jsonl, pickle or .npy file).
+
+    Args:
+        fpath (str): file path
+        chunksize (int): for .npy files yield blocks of this many rows
+            instead of single rows. The file is memory mapped.
+
+    Yields:
+        object: records
+    """
+    verbose = _rectify_verb_read(verbose)
+    if verbose:
+        print('[util_io] * iter_data(%r)' % (util_path.tail(fpath),))
+    ext = splitext(fpath)[1]
+    if ext in JSONL_EXTS:
+        from utool import util_cache
+        allow_pickle = kwargs.get('allow_pickle', False)
+        with open(fpath, 'rb') as file_:
+            for line in file_:
+                line = line.strip()
+                if line:
+                    yield util_cache.from_json(line.decode('utf8'),
+                                               allow_pickle=allow_pickle)
+    elif ext in PICKLE_EXTS:
+        with open(fpath, 'rb') as file_:
+            while True:
+                try:
+                    yield pickle.load(file_)
+                except EOFError:
+                    break
+    elif HAS_NUMPY and ext in ['.npy']:
+        arr = np.load(fpath, mmap_mode='r')
+        if chunksize is None:
+            for row in arr:
+                yield row
+        else:
+            for start in range(0, len(arr), chunksize):
+                yield np.array(arr[start:start + chunksize])
+    else:
+        assert False, 'unknown stream ext=%r for fpath=%r' % (ext, fpath)
+
+
 #def save_capnp(fpath, data, verbose=False):
 #    r"""
 #    Refernces:
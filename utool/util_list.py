@@ -416,10 +416,62 @@ def flatten(list_):
         >>> result = ut.repr4(unflat_list2, nl=False)
         >>> print(result)
         ['a', 'b', 'c', 'd']
-    """
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_list import *  # NOQA
+        >>> import numpy as np
+        >>> arrs = [np.array([1, 2]), np.array([3]), np.array([], dtype=int)]
+        >>> assert flatten(arrs) == [1, 2, 3]
+        >>> assert flatten(np.arange(4).reshape(2, 2)) == [0, 1, 2, 3]
+    """
+    if util_type.HAVE_NUMPY:
+        # ndarray inputs are flattened in C. The items are the same numpy
+        # scalars that iterating over the rows would produce.
+        if isinstance(list_, np.ndarray):
+            if list_.ndim == 2:
+                return list(list_.ravel())
+        elif _is_ndarray_list(list_):
+            return list(np.concatenate(list_))
     return list(util_iter.iflatten(list_))
 
 
+def _is_ndarray_list(list_):
+    """
+    True if list_ is a non-empty list of 1D ndarrays which share a dtype, and
+    can be concatenated without changing any item.
+    """
+    if not isinstance(list_, (list, tuple)) or len(list_) == 0:
+        return False
+    first = list_[0]
+    if not isinstance(first, np.ndarray):
+        return False
+    dtype = first.dtype
+    return all(isinstance(arr, np.ndarray) and arr.ndim == 1 and
+               arr.dtype == dtype for arr in list_)
+
+
+# util_dev imports this module, so RaggedArray is resolved on first use
+_RaggedArray = None
+
+
+def _is_ragged(unflat_list):
+    """ True if unflat_list is a :class:`utool.util_dev.RaggedArray` """
+    global _RaggedArray
+    if _RaggedArray is None:
+        from utool.util_dev import RaggedArray as _RaggedArray
+    return isinstance(unflat_list, _RaggedArray)
+
+
+def _is_index_array(index_list, kinds='iu'):
+    """
+    True if index_list is a 1D ndarray whose dtype kind is in ``kinds``
+    (integers by default, use 'b' for boolean masks).
+    """
+    return (util_type.HAVE_NUMPY and isinstance(index_list, np.ndarray) and
+            index_list.ndim == 1 and index_list.dtype.kind in kinds)
+
+
 def invertible_flatten1(unflat_list):
     r"""
     Flattens `unflat_list` but remember how to reconstruct the `unflat_list`
@@ -487,6 +539,9 @@ def accumulate(iterator):
         yield total
 
 
+_accumulate = getattr(itertools, 'accumulate', accumulate)
+
+
 def total_flatten(unflat_list):
     """
     unflat_list = [1, 2, [3, 4], [5, [9]]]
@@ -656,11 +711,9 @@ def invertible_flatten2(unflat_list):
         %timeit utool.unflatten2(flat_aids2, cumlen_list)
     """
     sublen_list = list(map(len, unflat_list))
-    if not util_type.HAVE_NUMPY:
-        cumlen_list = np.cumsum(sublen_list)
-        # Build an unflat list of flat indexes
-    else:
-        cumlen_list = list(accumulate(sublen_list))
+    # itertools.accumulate is faster than np.cumsum on a list of lengths, and
+    # keeps cumlen_list a list of ints
+    cumlen_list = list(_accumulate(sublen_list))
     flat_list = flatten(unflat_list)
     return flat_list, cumlen_list
 
@@ -719,7 +772,19 @@ def unflatten2(flat_list, cumlen_list):
         >>> result = (unflat_list2)
         >>> print(result)
         [[5], [2, 3, 12, 3, 3], [9], [13, 3], [5]]
-    """
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_list import *  # NOQA
+        >>> import numpy as np
+        >>> flat_arr = np.array([5, 2, 3, 12, 3])
+        >>> unflat_list2 = unflatten2(flat_arr, np.array([1, 4, 5]))
+        >>> print([arr.tolist() for arr in unflat_list2])
+        [[5], [2, 3, 12], [3]]
+    """
+    if _is_index_array(cumlen_list):
+        # slicing with python ints is faster than with numpy scalars
+        cumlen_list = cumlen_list.tolist()
     unflat_list2 = [flat_list[low:high] for low, high in
                     zip(itertools.chain([0], cumlen_list), cumlen_list)]
     return unflat_list2
@@ -908,10 +973,21 @@ def compress(item_list, flag_list):
 
     Returns:
         list : filtered_items - masked items
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_list import *  # NOQA
+        >>> import numpy as np
+        >>> flags = np.array([True, False, True])
+        >>> assert compress([1, 2, 3], flags) == [1, 3]
+        >>> assert compress(np.array([1, 2, 3]), flags) == [1, 3]
     """
     assert len(item_list) == len(flag_list), (
         'lists should correspond. len(item_list)=%r len(flag_list)=%r' %
         (len(item_list), len(flag_list)))
+    if (_is_index_array(flag_list, 'b') and isinstance(item_list, np.ndarray)
+         and item_list.ndim == 1):
+        return list(item_list.compress(flag_list))
     filtered_items = list(util_iter.iter_compress(item_list, flag_list))
     return filtered_items
 
@@ -1586,7 +1662,19 @@ def unflat_take(items_list, unflat_index_list):
         >>> result = unflat_take(items_list, unflat_index_list)
         >>> print(result)
         [[1, 2], [3, 4], [1, 5]]
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_list import *  # NOQA
+        >>> import utool as ut
+        >>> items_list = [1, 2, 3, 4, 5]
+        >>> unflat_index_list = ut.RaggedArray.from_unflat([[0, 1], [2, 3], [0, 4]])
+        >>> result = unflat_take(items_list, unflat_index_list)
+        >>> print(result.tolist())
+        [[1, 2], [3, 4], [1, 5]]
     """
+    if _is_ragged(unflat_index_list):
+        return unflat_index_list.map(np.asarray(items_list).take)
     return [unflat_take(items_list, xs)
             if isinstance(xs, list) else
             take(items_list, xs)
@@ -1815,7 +1903,33 @@ def take(list_, index_list):
         >>> result = take(list_, index)
         >>> print(result)
         [1, 3]
-    """
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_list import *  # NOQA
+        >>> import numpy as np
+        >>> index_list = np.array([2, 0, -1])
+        >>> assert take([0, 1, 2, 3], index_list) == [2, 0, 3]
+        >>> assert take(np.arange(4), index_list) == [2, 0, 3]
+        >>> assert take(np.arange(4), [3, 1]) == [3, 1]
+        >>> # nested index lists fancy index each item
+        >>> print(take(np.arange(4), [[0, 1], [2]]))
+        [array([0, 1]), array([2])]
+    """
+    if util_type.HAVE_NUMPY:
+        if isinstance(list_, np.ndarray) and list_.ndim == 1:
+            index_arr = index_list
+            if isinstance(index_list, list):
+                try:
+                    index_arr = np.asarray(index_list)
+                except ValueError:
+                    # ragged nested indices use the generic path below
+                    index_arr = None
+            if _is_index_array(index_arr):
+                return list(list_.take(index_arr))
+        elif _is_index_array(index_list):
+            # indexing with python ints is faster than with numpy scalars
+            index_list = index_list.tolist()
     try:
         return [list_[index] for index in index_list]
     except TypeError:
@@ -2586,6 +2700,8 @@ def depth_profile(list_, max_depth=None, compress_homogenous=True, compress_cons
         >>> result = depth_profile(list_, max_depth=max_depth, new_depth=new_depth)
         >>> print(result)
     """
+    if _is_ragged(list_):
+        list_ = list(list_)
     if isinstance(list_, dict):
         list_ = list(list_.values())   # handle dict
     level_shape_list = []
@@ -3197,6 +3313,8 @@ def unflat_map(func, unflat_items, vectorized=False, **kwargs):
         [[], [2, 3, 4], [5, 6], [7, 8, 9, 10], [], []]
     """
     import utool as ut
+    if _is_ragged(unflat_items):
+        return unflat_items.map(func, vectorized=vectorized, **kwargs)
     # First flatten the list, and remember the original dimensions
     flat_items, reverse_list = ut.invertible_flatten2(unflat_items)
     # Then preform the lookup / implicit mapping
@@ -3221,6 +3339,8 @@ def unflat_map(func, unflat_items, vectorized=False, **kwargs):
 def unflat_vecmap(func, unflat_items, vectorized=False, **kwargs):
     """ unflat map for vectorized functions """
     import utool as ut
+    if _is_ragged(unflat_items):
+        return unflat_items.map(func, vectorized=True, **kwargs)
     # First flatten the list, and remember the original dimensions
     flat_items, reverse_list = ut.invertible_flatten2(unflat_items)
     # Then preform the lookup / implicit mapping
@@ -14,10 +14,14 @@ from os.path import (join, basename, relpath, normpath, split, isdir, isfile,
 import os
 import re
 import sys
+import time
+import errno
 import shutil
+import stat as stat_module
 import fnmatch
 import warnings
 import itertools
+import threading
 from utool.util_regex import extend_regex
 from utool import util_dbg
 from utool import util_progress
@@ -246,6 +250,7 @@ def remove_file(fpath, verbose=None, ignore_errors=True, dryrun=False,
     else:
         try:
             os.remove(fpath)
+            _invalidate_stat_caches(fpath)
             if verbose:
                 print('[util_path] Removed %r' % fpath)
         except OSError:
@@ -295,6 +300,7 @@ def remove_dirs(dpath, verbose=None, ignore_errors=True, dryrun=False,
         return False
     try:
         shutil.rmtree(dpath)
+        _invalidate_stat_caches(dpath, recursive=True)
     except OSError as e:
         warnings.warn('OSError: %s,\n Could not delete %s' % (str(e), dpath))
         if not ignore_errors:
@@ -429,6 +435,7 @@ def delete(path, dryrun=False, recursive=True, verbose=None, print_exists=True,
             flag = remove_file(path, **rmargs)
         else:
             raise ValueError('Unknown type of path=%r' % (path,))
+        _invalidate_stat_caches(path, recursive=True)
         if verbose > 0:
             print('[util_path] Finished deleting path=%r' % path)
     return flag
@@ -505,6 +512,198 @@ def remove_fpaths(fpaths, verbose=VERBOSE, quiet=QUIET, strict=False,
 remove_file_list = remove_fpaths  # backwards compatible
 
 
+# --- Stat Cache ---
+
+#: stat caches opened by the current thread, innermost last
+#: (see :class:`StatCache`)
+_STAT_CACHE_LOCAL = threading.local()
+#: open stat caches of all threads, which all see utool's invalidations
+_ACTIVE_STAT_CACHES = []
+
+
+def _stat_cache_stack():
+    """ the open stat caches of the current thread """
+    try:
+        return _STAT_CACHE_LOCAL.stack
+    except AttributeError:
+        _STAT_CACHE_LOCAL.stack = []
+        return _STAT_CACHE_LOCAL.stack
+
+
+class StatCache(object):
+    r"""
+    Opt-in cache of ``os.stat`` results (and optionally directory listings)
+    used by path utilities such as :func:`checkpath`, :func:`ensuredir`,
+    :func:`existing_subpath`, :func:`search_in_dirs`,
+    :func:`search_candidate_paths` and :func:`find_lib_fpath` while it is
+    active as a context manager. Repeated existence checks of the same paths
+    then cost one metadata syscall, which matters on network filesystems.
+
+    Missing paths are cached too. If the listing of a path's parent
+    directory was cached by :func:`StatCache.listdir`, a path that is not in
+    it is known not to exist without a syscall.
+
+    A cache only answers stat calls made on the thread that opened it.
+
+    The utool functions that create, write or delete paths (delete,
+    remove_file, remove_dirs, ensuredir, touch, copy, move, symlink, sed,
+    writeto and save_data) invalidate them in the caches of every thread.
+    Changes made by anything else require :func:`StatCache.invalidate` or a
+    ttl.
+
+    Args:
+        ttl (float): seconds an entry stays valid (default forever)
+
+    CommandLine:
+        python -m utool.util_path StatCache
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_path import *  # NOQA
+        >>> import utool as ut
+        >>> dpath = dirname(ut.__file__)
+        >>> with StatCache() as cache:
+        >>>     for _ in range(3):
+        >>>         found = search_in_dirs('util_path.py', [dirname(dpath), dpath])
+        >>>         flag = checkpath(join(dpath, 'util_path.py'))
+        >>> print('hits=%d, misses=%d' % (cache.hits, cache.misses))
+        hits=7, misses=2
+        >>> assert found == join(dpath, 'util_path.py') and flag
+        >>> # without the context manager nothing is cached
+        >>> assert not checkpath(join(dpath, 'nonexistant'))
+        >>> assert cache.hits == 7
+        >>> # cached listings keep the os.listdir order
+        >>> with StatCache() as cache:
+        >>>     assert cache.listdir(dpath) == cache.listdir(dpath) == os.listdir(dpath)
+        >>> # utool writers invalidate cached entries
+        >>> fpath = join(ut.ensure_app_resource_dir('utool'), 'statcache.txt')
+        >>> ut.delete(fpath, verbose=False)
+        >>> with StatCache() as cache:
+        >>>     assert not checkpath(fpath)
+        >>>     ut.writeto(fpath, 'foo', verbose=False)
+        >>>     assert checkpath(fpath)
+        >>>     # other threads do not use this thread's cache
+        >>>     from concurrent.futures import ThreadPoolExecutor
+        >>>     with ThreadPoolExecutor(1) as pool:
+        >>>         pool.submit(checkpath, fpath).result()
+        >>>     assert cache.hits == 0
+        >>> ut.delete(fpath, verbose=False)
+    """
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # path -> (timestamp, stat_result or None)
+        self._stats = {}
+        # dpath -> (timestamp, frozenset of names)
+        self._listings = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        _stat_cache_stack().append(self)
+        _ACTIVE_STAT_CACHES.append(self)
+        return self
+
+    def __exit__(self, type_, value, trace):
+        _stat_cache_stack().remove(self)
+        _ACTIVE_STAT_CACHES.remove(self)
+        if trace is not None:
+            return False  # return a falsey value on error
+
+    def _fresh(self, entry):
+        return (entry is not None and
+                (self.ttl is None or time.time() - entry[0] < self.ttl))
+
+    def stat(self, path):
+        """
+        Returns the (cached) ``os.stat`` of path or None if it does not exist
+        """
+        key = normpath(path)
+        with self._lock:
+            entry = self._stats.get(key, None)
+            if self._fresh(entry):
+                self.hits += 1
+                return entry[1]
+            listing = self._listings.get(dirname(key), None)
+            if self._fresh(listing) and basename(key) not in listing[1]:
+                self.hits += 1
+                return None
+            self.misses += 1
+        try:
+            result = os.stat(key)
+        except (OSError, ValueError):
+            result = None
+        with self._lock:
+            self._stats[key] = (time.time(), result)
+        return result
+
+    def exists(self, path):
+        """ cached ``os.path.exists`` """
+        return self.stat(path) is not None
+
+    def isdir(self, path):
+        """ cached ``os.path.isdir`` """
+        result = self.stat(path)
+        return result is not None and stat_module.S_ISDIR(result.st_mode)
+
+    def isfile(self, path):
+        """ cached ``os.path.isfile`` """
+        result = self.stat(path)
+        return result is not None and stat_module.S_ISREG(result.st_mode)
+
+    def listdir(self, dpath):
+        """
+        Returns the (cached) names in a directory in ``os.listdir`` order.
+        The listing also answers later existence checks of missing paths in
+        that directory.
+        """
+        key = normpath(dpath)
+        with self._lock:
+            entry = self._listings.get(key, None)
+            if self._fresh(entry):
+                self.hits += 1
+                return list(entry[2])
+            self.misses += 1
+        names = os.listdir(key)
+        with self._lock:
+            self._listings[key] = (time.time(), frozenset(names), tuple(names))
+        return names
+
+    def invalidate(self, path=None, recursive=False):
+        """
+        Forgets cached information about a path (and everything below it if
+        recursive), or everything if path is None.
+        """
+        with self._lock:
+            if path is None:
+                self._stats.clear()
+                self._listings.clear()
+                return
+            key = normpath(path)
+            self._stats.pop(key, None)
+            self._listings.pop(key, None)
+            self._listings.pop(dirname(key), None)
+            if recursive:
+                prefix = join(key, '')
+                for cache in [self._stats, self._listings]:
+                    for other in [k for k in cache if k.startswith(prefix)]:
+                        del cache[other]
+
+
+def _cached_exists(path):
+    """ os.path.exists through the active :class:`StatCache`, if any """
+    stack = _stat_cache_stack()
+    if stack:
+        return stack[-1].exists(path)
+    return exists(path)
+
+
+def _invalidate_stat_caches(path, recursive=False):
+    """ tells active stat caches that utool created or removed path """
+    for cache in list(_ACTIVE_STAT_CACHES):
+        cache.invalidate(path, recursive=recursive)
+
+
 def longest_existing_path(_path):
     r"""
     Returns the longest root of _path that exists
@@ -532,7 +731,7 @@ def longest_existing_path(_path):
     existing_path = _path
     while True:
         _path_new = os.path.dirname(existing_path)
-        if exists(_path_new):
+        if _cached_exists(_path_new):
             existing_path = _path_new
             break
         if _path_new == existing_path:
@@ -607,7 +806,7 @@ def checkpath(path_, verbose=VERYVERBOSE, n=None, info=VERYVERBOSE):
             if len(dirs) > 1 and len(dirs[0]) == 0 and len(dirs[1]) == 1:
                 dirs[1] = dirs[1].upper() + ':'
                 path_ = '\\'.join(dirs[1:])
-    does_exist = exists(path_)
+    does_exist = _cached_exists(path_)
     if verbose:
         #print_('[utool] checkpath(%r)' % (path_))
         pretty_path = path_ndir_split(path_, n)
@@ -658,6 +857,9 @@ def ensuredir(path_, verbose=None, info=False, mode=0o1777):
     if not checkpath(path_, verbose=verbose, info=info):
         if verbose:
             print('[util_path] mkdir(%r)' % path_)
+        # the highest directory makedirs will create is below this one
+        created_root = (longest_existing_path(path_) if _ACTIVE_STAT_CACHES
+                        else None)
         try:
             os.makedirs(normpath(path_), mode=mode)
         except OSError as ex:
@@ -666,6 +868,9 @@ def ensuredir(path_, verbose=None, info=False, mode=0o1777):
                 'check that the longest existing path '
                 'is not a bad windows symlink.', keys=['path_'])
             raise
+        finally:
+            if created_root is not None:
+                _invalidate_stat_caches(created_root, recursive=True)
     return path_
 
 
@@ -695,6 +900,7 @@ def touch(fpath, times=None, verbose=True):
             print('[util_path] touching %r' % fpath)
         with open(fpath, 'a'):
             os.utime(fpath, times)
+        _invalidate_stat_caches(fpath)
     except Exception as ex:
         import utool
         utool.printex(ex, 'touch %s' % fpath)
@@ -707,21 +913,354 @@ ensurefile = touch
 
 # ---File Copy---
 
-def _copy_worker(src, dst):
+#: ioctl request that clones (reflinks) a whole file on Linux (btrfs, xfs)
+_FICLONE = 0x40049409
+#: errors meaning a kernel copy fast path is unsupported for these files
+_FASTCOPY_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF, errno.ENOTSUP,
+    errno.EOPNOTSUPP, errno.ETXTBSY, errno.EPERM, errno.ENOTTY}
+#: bytes per kernel copy call
+_FASTCOPY_CHUNK = 2 ** 30
+
+
+def _open_copy_dst(dst):
+    """
+    Opens dst for writing without truncating it.
+
+    Returns:
+        tuple: (outfd, created) where created is True if dst did not exist
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
     try:
-        shutil.copy2(src, dst)
+        return os.open(dst, flags, 0o666), True
+    except OSError as ex:
+        if ex.errno != errno.EEXIST:
+            raise
+    return os.open(dst, flags & ~(os.O_CREAT | os.O_EXCL)), False
+
+
+def _copy_file_data(src, dst, reflink='auto'):
+    """
+    Copies file contents using the fastest mechanism the platform supports:
+    a reflink clone, then ``os.copy_file_range``, then ``os.sendfile``,
+    then a buffered copy.
+
+    dst is only truncated once a reflink clone is ruled out, so a failed
+    clone with reflink=True leaves an existing dst intact. If the copy fails
+    after that, the partially written dst is removed.
+
+    Returns:
+        str: name of the mechanism that was used
+    """
+    with open(src, 'rb') as fsrc:
+        outfd, created = _open_copy_dst(dst)
+        modified = created
+        try:
+            with os.fdopen(outfd, 'wb') as fdst:
+                infd = fsrc.fileno()
+                if reflink and sys.platform.startswith('linux'):
+                    try:
+                        import fcntl
+                        fcntl.ioctl(outfd, _FICLONE, infd)
+                    except (ImportError, IOError, OSError):
+                        if reflink is True:
+                            raise
+                    else:
+                        # the clone does not shrink a larger existing dst
+                        modified = True
+                        os.ftruncate(outfd, os.fstat(infd).st_size)
+                        return 'reflink'
+                elif reflink is True:
+                    raise NotImplementedError('reflink copies require Linux')
+                modified = True
+                os.ftruncate(outfd, 0)
+                for method in ['copy_file_range', 'sendfile']:
+                    if not hasattr(os, method):
+                        continue
+                    offset = 0
+                    try:
+                        while True:
+                            if method == 'copy_file_range':
+                                nbytes = os.copy_file_range(infd, outfd,
+                                                            _FASTCOPY_CHUNK)
+                            else:
+                                nbytes = os.sendfile(outfd, infd, offset,
+                                                     _FASTCOPY_CHUNK)
+                            if nbytes == 0:
+                                return method
+                            offset += nbytes
+                    except OSError as ex:
+                        # Fall back only if nothing has been written yet
+                        if (offset > 0 or
+                              ex.errno not in _FASTCOPY_UNSUPPORTED_ERRNOS):
+                            raise
+                shutil.copyfileobj(fsrc, fdst, 2 ** 20)
+                return 'buffered'
+        except BaseException:
+            if modified:
+                try:
+                    os.remove(dst)
+                except OSError:
+                    pass
+            raise
+
+
+def _copy_task(src, dst, overwrite, skip_same, reflink, move):
+    """
+    Copies (or moves) one file like shutil.copy2 unless dst is up to date.
+    dst must already be a file path (see :func:`_copy_dst_fpath`).
+
+    Returns:
+        tuple: (action, dst, nbytes, src_stat)
+    """
+    src_stat = os.stat(src)
+    try:
+        dst_stat = os.stat(dst)
     except OSError:
-        return False
-    except shutil.Error:
+        dst_stat = None
+    if dst_stat is not None:
+        # Like shutil.copy2, refuse to copy a file onto itself (e.g. a hard
+        # or symbolic link to it), which would truncate the source.
+        if (dst_stat.st_dev, dst_stat.st_ino) == (src_stat.st_dev,
+                                                  src_stat.st_ino):
+            raise shutil.SameFileError(
+                '%r and %r are the same file' % (src, dst))
+        if not overwrite:
+            return 'skipped', dst, 0, src_stat
+        # like rsync, compare modification times to the second
+        if (skip_same and dst_stat.st_size == src_stat.st_size and
+                int(dst_stat.st_mtime) == int(src_stat.st_mtime)):
+            return 'skipped', dst, 0, src_stat
+    if move:
+        shutil.move(src, dst)
+        return 'moved', dst, src_stat.st_size, src_stat
+    if not stat_module.S_ISREG(src_stat.st_mode):
+        shutil.copy2(src, dst)
+    else:
+        _copy_file_data(src, dst, reflink=reflink)
+        shutil.copystat(src, dst)
+    return 'copied', dst, src_stat.st_size, src_stat
+
+
+def _copy_dst_fpath(src, dst):
+    """ like shutil.copy2, copying into a directory keeps the file name """
+    if isdir(dst):
+        dst = join(dst, basename(src))
+    return dst
+
+
+def _read_copy_manifest(manifest_fpath):
+    """ Returns the completed copies recorded in a manifest, by src path """
+    from utool import util_io
+    done = {}
+    if manifest_fpath is None or not exists(manifest_fpath):
+        return done
+    try:
+        for record in util_io.iter_data(manifest_fpath, verbose=False):
+            done[record['src']] = record
+    except ValueError:
+        # the last line is incomplete if the copy was killed mid-write
         pass
-    return True
+    return done
+
+
+def parallel_copy(src_list, dst_list, nthreads=None, overwrite=True,
+                  skip_same=True, reflink='auto', move=False,
+                  manifest_fpath=None, on_error='ignore', verbose=True,
+                  lbl=None):
+    r"""
+    Copies (or moves) many files on a bounded thread pool.
+
+    File data is copied in the kernel where possible (reflink clones,
+    ``os.copy_file_range`` or ``os.sendfile``) and the stat info is copied
+    like :func:`shutil.copy2`. Files that are already up to date are
+    skipped.
+
+    Args:
+        src_list (list): source file paths
+        dst_list (list): destination file paths (or directories)
+        nthreads (int): number of copy threads. Defaults to a few more than
+            the number of cpus, because copying is I/O bound.
+        overwrite (bool): if False, existing destinations are never replaced
+        skip_same (bool): skip destinations with the same size and
+            modification time (to the second) as their source
+        reflink (bool or str): 'auto' clones files where the filesystem
+            supports it, True requires it, and False never clones
+        move (bool): move files instead of copying them
+        manifest_fpath (str): a .jsonl file that records each completed
+            file. An interrupted copy resumes from it, skipping files whose
+            source has not changed since.
+        on_error (str): 'ignore' records failures; 'raise' stops submitting
+            tasks and raises the first error
+        verbose (bool): show progress and throughput
+        lbl (str): progress label
+
+    Returns:
+        dict: report with a per-file ``status_list`` ('copied', 'moved',
+            'skipped', or 'failed'), the ``errors`` by index, and the
+            totals ``nbytes``, ``seconds``, ``files_per_sec`` and
+            ``mb_per_sec``
+
+    CommandLine:
+        python -m utool.util_path parallel_copy
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_path import *  # NOQA
+        >>> import utool as ut
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_parallel_copy')
+        >>> ut.delete(dpath, verbose=False)
+        >>> src_list = [join(dpath, 'src', 'f%d.txt' % i) for i in range(5)]
+        >>> dst_list = [join(dpath, 'dst', 'f%d.txt' % i) for i in range(5)]
+        >>> ut.ensuredir(join(dpath, 'src'))
+        >>> ut.ensuredir(join(dpath, 'dst'))
+        >>> for i, fpath in enumerate(src_list):
+        >>>     ut.writeto(fpath, 'data' * i, verbose=False)
+        >>> manifest_fpath = join(dpath, 'manifest.jsonl')
+        >>> report = parallel_copy(src_list, dst_list, nthreads=2,
+        >>>                        manifest_fpath=manifest_fpath, verbose=False)
+        >>> print(report['status_list'])
+        ['copied', 'copied', 'copied', 'copied', 'copied']
+        >>> assert ut.readfrom(dst_list[3], verbose=False) == 'datadatadata'
+        >>> # Up to date files are skipped
+        >>> ut.writeto(src_list[0], 'changed', verbose=False)
+        >>> report = parallel_copy(src_list, dst_list, verbose=False)
+        >>> print(report['status_list'])
+        ['copied', 'skipped', 'skipped', 'skipped', 'skipped']
+        >>> # A manifest resumes a forced recopy without redoing finished files
+        >>> report = parallel_copy(src_list, dst_list, skip_same=False,
+        >>>                        manifest_fpath=manifest_fpath, verbose=False)
+        >>> print(report['status_list'])
+        ['copied', 'skipped', 'skipped', 'skipped', 'skipped']
+        >>> # The manifest also matches files copied into a directory
+        >>> report = parallel_copy(src_list, [join(dpath, 'dst')] * 5,
+        >>>                        skip_same=False,
+        >>>                        manifest_fpath=manifest_fpath, verbose=False)
+        >>> print(report['status_list'])
+        ['skipped', 'skipped', 'skipped', 'skipped', 'skipped']
+        >>> # A file is never copied onto a link to itself
+        >>> link_fpath = join(dpath, 'link.txt')
+        >>> os.link(src_list[2], link_fpath)
+        >>> report = parallel_copy([src_list[2]], [link_fpath],
+        >>>                        skip_same=False, verbose=False)
+        >>> print(report['status_list'], report['errors'][0].__class__.__name__)
+        ['failed'] SameFileError
+        >>> assert ut.readfrom(src_list[2], verbose=False) == 'datadata'
+        >>> report = parallel_copy(src_list + ['nonexistant'], dst_list + [dpath],
+        >>>                        verbose=False)
+        >>> print(report['status_list'][-1], list(report['errors'].keys()))
+        failed [5]
+        >>> ut.delete(dpath, verbose=False)
+    """
+    from concurrent import futures
+    from utool import util_io
+    from utool import util_parallel
+    src_list = list(src_list)
+    dst_list = list(dst_list)
+    assert len(src_list) == len(dst_list), 'bad correspondence'
+    if on_error not in ['ignore', 'raise']:
+        raise ValueError('on_error must be "ignore" or "raise"')
+    if nthreads is None:
+        nthreads = min(32, util_parallel.get_default_numprocs() + 4)
+    if lbl is None:
+        lbl = 'Moving' if move else 'Copying'
+    ntasks = len(src_list)
+    status_list = [None] * ntasks
+    errors = {}
+    nbytes = 0
+    done = _read_copy_manifest(manifest_fpath)
+    manifest = None
+    if manifest_fpath is not None:
+        manifest = util_io.open_data_writer(manifest_fpath, mode='a',
+                                            verbose=False)
+
+    def _task(src, dst):
+        # the manifest records the destination file, not its directory
+        dst = _copy_dst_fpath(src, dst)
+        record = done.get(src, None)
+        if record is not None and record['dst'] == dst:
+            src_stat = os.stat(src)
+            if (record['size'] == src_stat.st_size and
+                    record['mtime_ns'] == src_stat.st_mtime_ns and
+                    exists(dst)):
+                return 'skipped', dst, 0, None
+        return _copy_task(src, dst, overwrite, skip_same, reflink, move)
+
+    executor = futures.ThreadPoolExecutor(nthreads)
+    stop = []
+
+    def _iter_finished():
+        # Only a bounded number of tasks are in flight at any time
+        task_iter = enumerate(zip(src_list, dst_list))
+        pending = {}
+        while True:
+            for index, (src, dst) in task_iter:
+                pending[executor.submit(_task, src, dst)] = (index, src)
+                if len(pending) >= nthreads * 2:
+                    break
+            if len(pending) == 0 or stop:
+                break
+            finished, _ = futures.wait(pending,
+                                       return_when=futures.FIRST_COMPLETED)
+            for future in finished:
+                index, src = pending.pop(future)
+                yield index, src, future
+
+    start = time.time()
+    try:
+        _iter = util_progress.ProgIter(_iter_finished(), length=ntasks,
+                                       lbl=lbl, adjust=True, enabled=verbose)
+        for index, src, future in _iter:
+            try:
+                action, dst, size, src_stat = future.result()
+            except (IOError, OSError, shutil.Error) as ex:
+                status_list[index] = 'failed'
+                errors[index] = ex
+                if on_error == 'raise':
+                    stop.append(index)
+            else:
+                status_list[index] = action
+                nbytes += size
+                _invalidate_stat_caches(dst)
+                if move:
+                    _invalidate_stat_caches(src)
+                if manifest is not None and src_stat is not None:
+                    manifest.write({'src': src, 'dst': dst,
+                                    'size': src_stat.st_size,
+                                    'mtime_ns': src_stat.st_mtime_ns})
+                    manifest.flush()
+    finally:
+        executor.shutdown(wait=True)
+        if manifest is not None:
+            manifest.close()
+    seconds = max(time.time() - start, 1e-9)
+    nworked = sum(status in ['copied', 'moved'] for status in status_list)
+    report = {
+        'status_list': status_list,
+        'errors': errors,
+        'nbytes': nbytes,
+        'seconds': seconds,
+        'files_per_sec': nworked / seconds,
+        'mb_per_sec': nbytes / seconds / 2 ** 20,
+    }
+    if verbose:
+        print('[util_path] %s %d files (%d skipped, %d failed) in %.2fs: '
+              '%.1f files/s, %.1f MB/s' % (
+                  lbl, nworked, status_list.count('skipped'), len(errors),
+                  seconds, report['files_per_sec'], report['mb_per_sec']))
+    if on_error == 'raise' and errors:
+        raise errors[min(errors)]
+    return report
 
 
 def copy_files_to(src_fpath_list, dst_dpath=None, dst_fpath_list=None,
-                  overwrite=False, verbose=True, veryverbose=False):
+                  overwrite=False, verbose=True, veryverbose=False,
+                  nthreads=None, manifest_fpath=None):
     """
     parallel copier
 
+    Files are copied by :func:`parallel_copy` on a thread pool.
+
     Example:
         >>> # DISABLE_DOCTEST
         >>> from utool.util_path import *
@@ -735,9 +1274,6 @@ def copy_files_to(src_fpath_list, dst_dpath=None, dst_fpath_list=None,
         >>> copy_files_to(src_fpath_list, dst_dpath, overwrite=overwrite,
         >>>               verbose=verbose)
     """
-    from utool import util_list
-    from utool import util_parallel
-
     if verbose:
         print('[util_path] +--- COPYING FILES ---')
         print('[util_path]  * len(src_fpath_list) = %r' % (len(src_fpath_list)))
@@ -751,27 +1287,15 @@ def copy_files_to(src_fpath_list, dst_dpath=None, dst_fpath_list=None,
         assert dst_dpath is None, 'dst_dpath was specified but overrided'
         assert len(dst_fpath_list) == len(src_fpath_list), 'bad correspondence'
 
-    exists_list = list(map(exists, dst_fpath_list))
-    if verbose:
-        print('[util_path]  * %d files already exist dst_dpath' % (
-            sum(exists_list),))
-    if not overwrite:
-        notexists_list = util_list.not_list(exists_list)
-        dst_fpath_list_ = util_list.compress(dst_fpath_list, notexists_list)
-        src_fpath_list_ = util_list.compress(src_fpath_list, notexists_list)
-    else:
-        dst_fpath_list_ = dst_fpath_list
-        src_fpath_list_ = src_fpath_list
-
-    args_list = zip(src_fpath_list_, dst_fpath_list_)
-    _gen = util_parallel.generate2(_copy_worker, args_list,
-                                   ntasks=len(src_fpath_list_))
-    success_list = list(_gen)
-
-    #success_list = copy_list(src_fpath_list_, dst_fpath_list_)
+    report = parallel_copy(src_fpath_list, dst_fpath_list, nthreads=nthreads,
+                           overwrite=overwrite, manifest_fpath=manifest_fpath,
+                           verbose=verbose)
+    status_list = report['status_list']
     if verbose:
-        print('[util_path]  * Copied %d / %d' % (sum(success_list),
-                                                 len(src_fpath_list)))
+        ncopied = sum(status in ['copied', 'moved'] for status in status_list)
+        print('[util_path]  * Copied %d / %d' % (ncopied, len(src_fpath_list)))
+        print('[util_path]  * Skipped %d / %d' % (status_list.count('skipped'),
+                                                  len(src_fpath_list)))
         print('[util_path] L___ DONE COPYING FILES ___')
 
 
@@ -835,6 +1359,7 @@ def copy_single(src, dst, overwrite=True, verbose=True, deeplink=True,
                     shutil.copytree(src, dst)
                 else:
                     shutil.copy2(src, dst)
+                _invalidate_stat_caches(dst, recursive=True)
         else:
             prefix = 'Miss'
             if verbose:
@@ -869,28 +1394,15 @@ def copy_all(src_dir, dest_dir, glob_str_list, recursive=False):
 
 
 def copy_list(src_list, dst_list, lbl='Copying',
-              ioerr_ok=False, sherro_ok=False, oserror_ok=False):
-    """ Copies all data and stat info """
+              ioerr_ok=False, sherro_ok=False, oserror_ok=False,
+              nthreads=None):
+    """ Copies all data and stat info (see :func:`parallel_copy`) """
     # Feb - 6 - 2014 Copy function
-    task_iter = zip(src_list, dst_list)
-    def docopy(src, dst):
-        try:
-            shutil.copy2(src, dst)
-        except OSError:
-            if ioerr_ok:
-                return False
-            raise
-        except shutil.Error:
-            if sherro_ok:
-                return False
-            raise
-        except IOError:
-            if ioerr_ok:
-                return False
-            raise
-        return True
-    progiter = util_progress.ProgIter(task_iter, adjust=True, lbl=lbl)
-    success_list = [docopy(src, dst) for (src, dst) in progiter]
+    # shutil.Error is an OSError, so ioerr_ok has always covered all errors
+    on_error = 'ignore' if ioerr_ok else 'raise'
+    report = parallel_copy(src_list, dst_list, nthreads=nthreads,
+                           skip_same=False, on_error=on_error, lbl=lbl)
+    success_list = [status != 'failed' for status in report['status_list']]
     return success_list
 
 
@@ -906,6 +1418,8 @@ def move(src, dst, verbose=True):
             print('[path] move failed')
         return False
     else:
+        _invalidate_stat_caches(src, recursive=True)
+        _invalidate_stat_caches(dst, recursive=True)
         return True
 
 
@@ -1029,9 +1543,6 @@ def iglob(dpath, pattern=None, recursive=False, with_files=True, with_dirs=True,
     r"""
     Iteratively globs directory for pattern
 
-    FIXME:
-        This function has a speed issue
-
     Args:
         dpath (str):  directory path
         pattern (str):
@@ -1041,6 +1552,10 @@ def iglob(dpath, pattern=None, recursive=False, with_files=True, with_dirs=True,
         maxdepth (None): (default = None)
         exclude_dirs (list): (default = [])
 
+    Kwargs:
+        nthreads (int): list directories on a thread pool
+            (see :func:`scandir_walk`)
+
     Yields:
         path
 
@@ -1078,7 +1593,7 @@ def iglob(dpath, pattern=None, recursive=False, with_files=True, with_dirs=True,
         )
         for item in util_iter.iflatten(subiters):
             yield item
-        raise StopIteration
+        return
     if kwargs.get('verbose', False):
         print('[iglob] pattern = %r' % (pattern,))
         print('[iglob] dpath = %r' % (dpath,))
@@ -1087,59 +1602,45 @@ def iglob(dpath, pattern=None, recursive=False, with_files=True, with_dirs=True,
     current_depth = 0
     dpath_ = truepath(dpath)
     posx1 = len(dpath_) + len(os.path.sep)
-    #exclude_dirs_rel = [relpath(dpath_, dir_) for dir_ in exclude_dirs]
-    #exclude_dirs_rel = [relpath(dpath_, dir_) for dir_ in exclude_dirs]
-    #print('\n\n\n')
-    #import utool as ut
-    #print('exclude_dirs = %s' % (ut.repr4(exclude_dirs),))
-    for root, dirs, files in os.walk(dpath_, topdown=True):
-        # Modifying dirs in-place will prune the subsequent files and
-        # directories visitied by os.walk
-        # References:
-        #     http://stackoverflow.com/questions/19859840/excluding-directories-in-os-walk
-        rel_root = relpath(root, dpath_)
-        rel_root2 = relpath(root, dirname(dpath_))
-        #print('rel_root = %r' % (rel_root,))
-        #if len(dirs) > 0:
-        #    print('dirs = %s' % (ut.repr4([join(rel_root, d) for d in dirs]),))
+    pattern_match = _compile_glob_patterns([pattern])
+    nthreads = kwargs.get('nthreads', None)
+    walk = scandir_walk(dpath_, recursive=recursive, nthreads=nthreads)
+    for root, dir_entries, file_entries in walk:
+        # Removing entries from dir_entries in-place prunes the walk
         if len(exclude_dirs) > 0:
-            dirs[:] = [d for d in dirs if normpath(join(rel_root, d)) not in exclude_dirs]
-            # hack
-            dirs[:] = [d for d in dirs if normpath(join(rel_root2, d)) not in exclude_dirs]
-            # check abs path as well
-            dirs[:] = [d for d in dirs if normpath(join(root, d)) not in exclude_dirs]
-
-        # yeild data
-        # print it only if you want
+            rel_root = relpath(root, dpath_)
+            rel_root2 = relpath(root, dirname(dpath_))
+            dir_entries[:] = [
+                entry for entry in dir_entries
+                if normpath(join(rel_root, entry.name)) not in exclude_dirs and
+                # hack
+                normpath(join(rel_root2, entry.name)) not in exclude_dirs and
+                # check abs path as well
+                normpath(join(root, entry.name)) not in exclude_dirs]
+
         if maxdepth is not None:
             current_depth = root[posx1:].count(os.path.sep)
             if maxdepth <= current_depth:
+                # subdirectories are at least as deep
+                dir_entries[:] = []
                 continue
-        #print('-----------')
-        #print(current_depth)
-        #print(root)
-        #print('==')
-        #print(dirs)
-        #print('-----------')
         if with_files:
-            for fname in fnmatch.filter(files, pattern):
-                n_files += 1
-                fpath = join(root, fname)
-                if fullpath:
-                    yield fpath
-                else:
-                    yield relpath(fpath, dpath_)
+            for entry in file_entries:
+                if pattern_match(entry.name):
+                    n_files += 1
+                    if fullpath:
+                        yield entry.path
+                    else:
+                        yield relpath(entry.path, dpath_)
 
         if with_dirs:
-            for dname in fnmatch.filter(dirs, pattern):
-                dpath = join(root, dname)
-                n_dirs += 1
-                if fullpath:
-                    yield dpath
-                else:
-                    yield relpath(dpath, dpath_)
-        if not recursive:
-            break
+            for entry in dir_entries:
+                if pattern_match(entry.name):
+                    n_dirs += 1
+                    if fullpath:
+                        yield entry.path
+                    else:
+                        yield relpath(entry.path, dpath_)
     if kwargs.get('verbose', False):  # log what i've done
         n_total = n_dirs + n_files
         print('[util_path] iglob Found: %d' % (n_total))
@@ -1546,18 +2047,21 @@ def list_images(img_dpath_, ignore_list=[], recursive=False, fullpath=False,
     assertpath(img_dpath)
     # Get all the files in a directory recursively
     true_imgpath = truepath(img_dpath)
-    for root, dlist, flist in os.walk(true_imgpath):
+    imgext_match = _compile_glob_patterns(
+        sorted(set(['*' + ext.lower() for ext in IMG_EXTENSIONS])))
+    walk = scandir_walk(true_imgpath, recursive=recursive)
+    for root, dir_entries, file_entries in walk:
+        # Ignored directories are not walked
+        dir_entries[:] = [entry for entry in dir_entries
+                          if entry.name not in ignore_set]
         root = util_str.ensure_unicode(root)
         rel_dpath = relpath(root, img_dpath)
-        # Ignore directories
-        if any([dname in ignore_set for dname in dirsplit(rel_dpath)]):
-            continue
-        for fname in iter(flist):
-            fname = util_str.ensure_unicode(fname)
+        for entry in file_entries:
+            fname = util_str.ensure_unicode(entry.name)
             gname = join(rel_dpath, fname).replace('\\', '/')
             if gname.startswith('./'):
                 gname = gname[2:]
-            if fpath_has_imgext(gname):
+            if imgext_match(gname.lower()):
                 # Ignore Files
                 if gname in ignore_set:
                     continue
@@ -1566,8 +2070,6 @@ def list_images(img_dpath_, ignore_list=[], recursive=False, fullpath=False,
                     gname_list_.append(gpath)
                 else:
                     gname_list_.append(gname)
-        if not recursive:
-            break
     if sort:
         gname_list = sorted(gname_list_)
     return gname_list
@@ -1596,6 +2098,117 @@ def pathsplit_full(path):
     return path.replace('\\', '/').split('/')
 
 
+def _compile_glob_patterns(patterns):
+    """
+    Compiles shell glob patterns into one regex match function with the same
+    semantics as :func:`fnmatch.fnmatch`. Nothing matches an empty list.
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_path import *  # NOQA
+        >>> from utool.util_path import _compile_glob_patterns
+        >>> match = _compile_glob_patterns(['*.py', 'setup.*'])
+        >>> print([bool(match(name)) for name in ['a.py', 'setup.cfg', 'a.pyc']])
+        [True, True, False]
+        >>> print(_compile_glob_patterns([])('a.py'))
+        None
+    """
+    if isinstance(patterns, six.string_types):
+        patterns = [patterns]
+    if len(patterns) == 0:
+        return _NEVER_MATCH
+    flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+    pattern = '|'.join('(?:%s)' % (fnmatch.translate(pat),) for pat in patterns)
+    return re.compile(pattern, flags=flags).match
+
+
+_NEVER_MATCH = re.compile(r'(?!)').match
+
+
+def _scandir_listing(root):
+    """ lists a directory into (dir_entries, file_entries) like os.walk """
+    dir_entries = []
+    file_entries = []
+    try:
+        with os.scandir(root) as iter_:
+            for entry in iter_:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    dir_entries.append(entry)
+                else:
+                    file_entries.append(entry)
+    except OSError:
+        return None
+    return dir_entries, file_entries
+
+
+def scandir_walk(dpath, recursive=True, followlinks=False, nthreads=None):
+    r"""
+    Top-down directory walker built on :func:`os.scandir`.
+
+    Like ``os.walk(dpath)``, but yields :class:`os.DirEntry` lists, so the
+    file types (and cached stat results) of the directory listing can be
+    reused. Removing entries from the yielded directory list prunes them
+    before they are listed.
+
+    Args:
+        dpath (str): directory to walk
+        recursive (bool): if False only dpath is listed
+        followlinks (bool): descend into symlinked directories
+        nthreads (int): if specified, subdirectories are listed ahead of time
+            on this many threads, which helps on high latency (network)
+            filesystems. The yield order is the same.
+
+    Yields:
+        tuple: (root, dir_entries, file_entries)
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_path import *  # NOQA
+        >>> import utool as ut
+        >>> dpath = dirname(ut.__file__)
+        >>> walk1 = [(root, [e.name for e in dirs], [e.name for e in files])
+        >>>          for root, dirs, files in scandir_walk(dpath)]
+        >>> assert walk1 == [(r, d, f) for r, d, f in os.walk(dpath)]
+        >>> walk2 = [(root, [e.name for e in dirs], [e.name for e in files])
+        >>>          for root, dirs, files in scandir_walk(dpath, nthreads=4)]
+        >>> assert walk1 == walk2
+    """
+    executor = None
+    if nthreads is not None and nthreads > 1 and recursive:
+        from concurrent import futures
+        executor = futures.ThreadPoolExecutor(nthreads)
+
+    def _list(root):
+        if executor is None:
+            return root, _scandir_listing(root)
+        return root, executor.submit(_scandir_listing, root)
+
+    try:
+        stack = [_list(dpath)]
+        while stack:
+            root, listing = stack.pop()
+            if executor is not None:
+                listing = listing.result()
+            if listing is None:
+                continue
+            dir_entries, file_entries = listing
+            yield root, dir_entries, file_entries
+            if not recursive:
+                break
+            # Subdirectories are listed after the caller had a chance to
+            # prune them, and popped in the original order.
+            children = [_list(entry.path) for entry in dir_entries
+                        if followlinks or not entry.is_symlink()]
+            stack.extend(children[::-1])
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
 def get_standard_exclude_dnames():
     return ['lib.linux-x86_64-2.7', 'dist', 'build', '_page', '_doc',
             'utool.egg-info', '.git']
@@ -1607,7 +2220,7 @@ def get_standard_include_patterns():
 
 def matching_fpaths(dpath_list, include_patterns, exclude_dirs=[],
                     greater_exclude_dirs=[], exclude_patterns=[],
-                    recursive=True):
+                    recursive=True, nthreads=None):
     r"""
     walks dpath lists returning all directories that match the requested
     pattern.
@@ -1615,8 +2228,14 @@ def matching_fpaths(dpath_list, include_patterns, exclude_dirs=[],
     Args:
         dpath_list       (list):
         include_patterns (str):
-        exclude_dirs     (None):
+        exclude_dirs     (None): files directly in directories with these
+            names are skipped
+        greater_exclude_dirs (list): directories with these names are not
+            walked
+        exclude_patterns (list): file patterns to skip
         recursive        (bool):
+        nthreads         (int): list directories on a thread pool
+            (see :func:`scandir_walk`)
 
     References:
         # TODO: fix names and behavior of exclude_dirs and greater_exclude_dirs
@@ -1638,44 +2257,51 @@ def matching_fpaths(dpath_list, include_patterns, exclude_dirs=[],
     """
     if isinstance(dpath_list, six.string_types):
         dpath_list = [dpath_list]
+    include_match = _compile_glob_patterns(include_patterns)
+    exclude_match = _compile_glob_patterns(exclude_patterns)
+    greater_exclude_dirs = set(greater_exclude_dirs)
     for dpath in dpath_list:
-        for root, dname_list, fname_list in os.walk(dpath):
-            # Look at all subdirs
-            subdirs = pathsplit_full(relpath(root, dpath))
-            # HACK:
-            if any([dir_ in greater_exclude_dirs for dir_ in subdirs]):
-                continue
+        walk = scandir_walk(dpath, recursive=recursive, nthreads=nthreads)
+        for root, dir_entries, file_entries in walk:
+            # Directories under a greater excluded directory are never listed
+            if greater_exclude_dirs:
+                dir_entries[:] = [entry for entry in dir_entries
+                                  if entry.name not in greater_exclude_dirs]
             # Look at one subdir
             if basename(root) in exclude_dirs:
                 continue
-            _match = fnmatch.fnmatch
-            for name in fname_list:
-                # yeild filepaths that are included
-                if any(_match(name, pat) for pat in include_patterns):
-                    # ... and not excluded
-                    if not any(_match(name, pat) for pat in exclude_patterns):
-                        fpath = join(root, name)
-                        yield fpath
-            if not recursive:
-                break
+            for entry in file_entries:
+                # yeild filepaths that are included and not excluded
+                name = entry.name
+                if include_match(name) and not exclude_match(name):
+                    yield entry.path
 
 
 def sed(regexpr, repl, force=False, recursive=False, dpath_list=None,
         fpath_list=None, verbose=None, include_patterns=None,
-        exclude_patterns=[]):
+        exclude_patterns=[], nprocs=None):
     """
     Python implementation of sed. NOT FINISHED
 
     searches and replaces text in files
 
+    All files are scanned (in parallel when there are many) and every edit is
+    computed before anything is written. With force the edits are applied as
+    one transaction by :func:`apply_sed_edits`, otherwise this is a dry run
+    that prints the diffs and a summary.
+
     Args:
         regexpr (str): regx patterns to find
         repl (str): text to replace
-        force (bool):
+        force (bool): write the changes
         recursive (bool):
         dpath_list (list): directories to search (defaults to cwd)
+        nprocs (int): number of processes used to scan files
+
+    Returns:
+        list: the edits (see :func:`find_sed_edits`)
     """
-    #_grep(r, [repl], dpath_list=dpath_list, recursive=recursive)
+    import utool as ut
     if include_patterns is None:
         include_patterns = ['*.py', '*.pyx', '*.pxi', '*.cxx', '*.cpp', '*.hxx', '*.hpp', '*.c', '*.h', '*.html', '*.tex']
     if dpath_list is None:
@@ -1698,29 +2324,267 @@ def sed(regexpr, repl, force=False, recursive=False, dpath_list=None,
         print(' * include_patterns   : %r' % (include_patterns,))
         print(' * recursive: %r' % (recursive,))
         print(' * force: %r' % (force,))
-        from utool import util_str
-        print(' * fpath_list: %s' % (util_str.repr3(fpath_list),))
+        if fpath_list is not None:
+            print(' * len(fpath_list): %d' % (len(fpath_list),))
     regexpr = extend_regex(regexpr)
-    #if '\x08' in regexpr:
-    #    print('Remember \\x08 != \\b')
-    #    print('subsituting for you for you')
-    #    regexpr = regexpr.replace('\x08', '\\b')
-    #    print(' * regular expression : %r' % (regexpr,))
+    fpath_list_ = list(fpath_generator)
+    return _sed_fpaths(fpath_list_, regexpr, repl, force, verbose, nprocs)
 
-    # Walk through each directory recursively
-    num_changed = 0
-    num_files_checked = 0
-    fpaths_changed = []
-    for fpath in fpath_generator:
-        num_files_checked += 1
-        changed_lines = sedfile(fpath, regexpr, repl, force, verbose=verbose)
-        if changed_lines is not None:
-            fpaths_changed.append(fpath)
-            num_changed += len(changed_lines)
+
+def _sed_fpaths(fpath_list_, regexpr, repl, force, verbose, nprocs=None):
+    """
+    Scans files for a (non-extended) sed pattern, prints the edits, and
+    applies them as one transaction if force.
+
+    Returns:
+        list: the edits (see :func:`find_sed_edits`)
+    """
     import utool as ut
-    print('num_files_checked = %r' % (num_files_checked,))
+    edit_list = find_sed_edits(fpath_list_, regexpr, repl, nprocs=nprocs)
+    num_changed = 0
+    for edit in edit_list:
+        num_changed += len(edit['changed_lines'])
+        _print_sed_edit(edit, force, verbose)
+    if verbose and len(edit_list) > 0:
+        print(sed_summary(edit_list))
+    if force and len(edit_list) > 0:
+        print(' ! WRITING CHANGES')
+        apply_sed_edits(edit_list)
+    fpaths_changed = [edit['fpath'] for edit in edit_list]
+    print('num_files_checked = %r' % (len(fpath_list_),))
     print('fpaths_changed = %s' % (ut.repr3(sorted(fpaths_changed)),))
     print('total lines changed = %r' % (num_changed,))
+    return edit_list
+
+
+#: sed patterns with these tokens can match differently on a whole file than
+#: on its lines, so files are not prefiltered with a whole-file search
+_SED_CONTEXT_TOKENS = ('\\A', '\\Z', '(?<', '(?=', '(?!')
+
+
+def _compile_sed(regexpr):
+    regex = re.compile(regexpr)
+    prefilter = None
+    if not any(token in regexpr for token in _SED_CONTEXT_TOKENS):
+        # A line match is also a match of the whole text in multiline mode
+        prefilter = re.compile(regexpr, flags=re.MULTILINE)
+    return regex, prefilter
+
+
+def _sed_file_edit(fpath, regex, repl, prefilter=None):
+    """
+    Computes the edit of one file without writing it.
+
+    Returns:
+        dict: the edit, or None if nothing would change. Files that are not
+            valid utf8 are never edited and return an edit with
+            ``error`` set.
+    """
+    with open(fpath, 'rb') as file_:
+        stat = os.fstat(file_.fileno())
+        data = file_.read()
+    try:
+        text = data.decode('utf8')
+    except UnicodeDecodeError as ex:
+        return {'fpath': fpath, 'error': ex}
+    if prefilter is not None and prefilter.search(text) is None:
+        return None
+    # split like readlines so per-line patterns behave as before
+    file_lines = [line + '\n' for line in text.split('\n')]
+    file_lines[-1] = file_lines[-1][:-1]
+    if file_lines[-1] == '':
+        file_lines.pop()
+    new_file_lines = [regex.sub(repl, line) for line in file_lines]
+    changed_lines = [(newline, line)
+                     for newline, line in zip(new_file_lines, file_lines)
+                     if newline != line]
+    if len(changed_lines) == 0:
+        return None
+    edit = {
+        'fpath': fpath,
+        'old_text': text,
+        'new_text': ''.join(new_file_lines),
+        'changed_lines': changed_lines,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+    return edit
+
+
+def _sed_files_worker(fpath_list, regexpr, repl):
+    regex, prefilter = _compile_sed(regexpr)
+    edit_list = []
+    for fpath in fpath_list:
+        try:
+            edit = _sed_file_edit(fpath, regex, repl, prefilter)
+        except (IOError, OSError) as ex:
+            edit = {'fpath': fpath, 'error': ex}
+        if edit is not None:
+            edit_list.append(edit)
+    return edit_list
+
+
+def find_sed_edits(fpath_list, regexpr, repl, nprocs=None, chunksize=64):
+    r"""
+    Computes the line-wise substitution of every file without writing
+    anything. Files are scanned in parallel when there are many of them.
+
+    Args:
+        fpath_list (list): files to edit
+        regexpr (str): pattern to find in each line
+        repl (str): replacement
+        nprocs (int): number of processes. Defaults to all cpus when there
+            are many files and to serial execution otherwise.
+        chunksize (int): number of files per task
+
+    Returns:
+        list: an edit dict for each file that would change, with the keys
+            fpath, old_text, new_text, changed_lines (list of (new, old)
+            line pairs), size and mtime_ns. Unreadable files and files that
+            are not utf8 are not edited and are reported with warnings.
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_path import *  # NOQA
+        >>> import utool as ut
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_sed')
+        >>> fpath1 = join(dpath, 'a.txt')
+        >>> fpath2 = join(dpath, 'b.txt')
+        >>> ut.writeto(fpath1, 'foo\nbar foo\n', verbose=False)
+        >>> ut.writeto(fpath2, 'bar\n', verbose=False)
+        >>> edit_list = find_sed_edits([fpath1, fpath2], 'foo', 'baz')
+        >>> print([(basename(edit['fpath']), edit['new_text']) for edit in edit_list])
+        [('a.txt', 'baz\nbar baz\n')]
+        >>> print(sed_summary(edit_list).replace(dpath + os.sep, ''))
+        a.txt | 2 lines changed
+        1 files changed, 2 lines changed
+        >>> apply_sed_edits(edit_list)
+        >>> print(ut.readfrom(fpath1, verbose=False))
+        baz
+        bar baz
+        >>> ut.delete(dpath, verbose=False)
+    """
+    from utool import util_parallel
+    fpath_list = list(fpath_list)
+    if nprocs is None:
+        if len(fpath_list) < _GREP_MIN_PARALLEL_FILES:
+            nprocs = 1
+        else:
+            nprocs = util_parallel.get_default_numprocs()
+    if nprocs == 1 or len(fpath_list) == 0:
+        result_list = _sed_files_worker(fpath_list, regexpr, repl)
+    else:
+        chunks = [fpath_list[idx:idx + chunksize]
+                  for idx in range(0, len(fpath_list), chunksize)]
+        args_list = [(chunk, regexpr, repl) for chunk in chunks]
+        gen = util_parallel.generate2(_sed_files_worker, args_list,
+                                      nprocs=nprocs, ordered=True, verbose=0)
+        result_list = [edit for edit_list in gen for edit in edit_list]
+    edit_list = []
+    for edit in result_list:
+        if 'error' in edit:
+            warnings.warn('[util_path] sed skipped %r: %s' % (
+                edit['fpath'], edit['error']))
+        else:
+            edit_list.append(edit)
+    return edit_list
+
+
+def sed_summary(edit_list):
+    """
+    Returns a dry-run summary of edits with the number of changed lines in
+    each file.
+    """
+    lines = []
+    total = 0
+    for edit in edit_list:
+        num = len(edit['changed_lines'])
+        total += num
+        lines.append('%s | %d lines changed' % (edit['fpath'], num))
+    lines.append('%d files changed, %d lines changed' % (len(edit_list), total))
+    return '\n'.join(lines)
+
+
+def apply_sed_edits(edit_list):
+    """
+    Writes a batch of edits as one transaction.
+
+    Every new file is first written to a temp file next to its target, with
+    the mode and owner of the target. The targets are then replaced by
+    atomic renames while a backup of each is kept. If anything fails
+    (including a file that changed after it was scanned, or an owner that
+    cannot be kept) the files that were already replaced are restored and
+    the error is raised, so the tree is never left half edited.
+
+    Because each file is replaced by a new one, other hard links to an
+    edited file keep the old contents. Symlinks are followed and their
+    targets are edited.
+
+    Args:
+        edit_list (list): edits from :func:`find_sed_edits`
+    """
+    import tempfile
+    # Refuse to write anything if a file changed since it was scanned
+    target_list = []
+    for edit in edit_list:
+        target = realpath(edit['fpath'])
+        stat = os.stat(target)
+        if (stat.st_size, stat.st_mtime_ns) != (edit['size'], edit['mtime_ns']):
+            raise IOError('%r was modified after it was scanned' % (
+                edit['fpath'],))
+        target_list.append((target, stat))
+    tmp_list = []
+    backup_list = []
+    replaced = []
+    try:
+        for edit, (target, stat) in zip(edit_list, target_list):
+            dpath, fname = split(target)
+            fd, tmp = tempfile.mkstemp(prefix='.' + fname + '.',
+                                       suffix='.sed', dir=dpath)
+            tmp_list.append(tmp)
+            with os.fdopen(fd, 'wb') as file_:
+                file_.write(edit['new_text'].encode('utf8'))
+                tmp_stat = os.fstat(file_.fileno())
+                if (hasattr(os, 'fchown') and
+                        (tmp_stat.st_uid, tmp_stat.st_gid) !=
+                        (stat.st_uid, stat.st_gid)):
+                    # before the chmod, because chown clears setuid bits
+                    os.fchown(file_.fileno(), stat.st_uid, stat.st_gid)
+            shutil.copymode(target, tmp)
+        for (target, stat), tmp in zip(target_list, tmp_list):
+            backup = tmp + '.orig'
+            try:
+                os.link(target, backup)
+            except (OSError, AttributeError):
+                shutil.copy2(target, backup)
+            backup_list.append(backup)
+            os.replace(tmp, target)
+            replaced.append((target, backup))
+            _invalidate_stat_caches(target)
+    except BaseException:
+        for target, backup in replaced[::-1]:
+            os.replace(backup, target)
+            _invalidate_stat_caches(target)
+        raise
+    finally:
+        for fpath in tmp_list + backup_list:
+            if exists(fpath):
+                os.remove(fpath)
+
+
+def _print_sed_edit(edit, force, verbose):
+    n_changed = len(edit['changed_lines'])
+    try:
+        rel_fpath = relpath(edit['fpath'], os.getcwd())
+    except ValueError:
+        # Can happen on windows
+        rel_fpath = edit['fpath']
+    print(' * %s changed %d lines in %r ' %
+          (['(dry-run)', '(real-run)'][force], n_changed, rel_fpath))
+    print(' * --------------------')
+    if verbose:
+        from utool import util_print
+        util_print.print_difftext(edit['old_text'], edit['new_text'])
 
 
 def sedfile(fpath, regexpr, repl, force=False, verbose=True, veryverbose=False):
@@ -1756,69 +2620,23 @@ def sedfile(fpath, regexpr, repl, force=False, verbose=True, veryverbose=False):
         >>> print(result)
     """
     # TODO: move to util_edit
-    path, name = split(fpath)
-    new_file_lines = []
-
     if veryverbose:
         print('[sedfile] fpath=%r' % fpath)
         print('[sedfile] regexpr=%r' % regexpr)
         print('[sedfile] repl=%r' % repl)
         print('[sedfile] force=%r' % force)
-
-    import utool as ut
-    file_lines = ut.readfrom(fpath, aslines=True, verbose=False)
-    # with open(fpath, 'r') as file:
-    #     import utool
-    #     with utool.embed_on_exception_context:
-    #         file_lines = file.readlines()
-    # Search each line for the desired regexpr
-    new_file_lines = [re.sub(regexpr, repl, line) for line in file_lines]
-
-    changed_lines = [(newline, line)
-                     for newline, line in zip(new_file_lines, file_lines)
-                     if  newline != line]
-    n_changed = len(changed_lines)
-    if n_changed > 0:
-        try:
-            rel_fpath = relpath(fpath, os.getcwd())
-        except ValueError:
-            # Can happen on windows
-            rel_fpath = fpath
-
-        print(' * %s changed %d lines in %r ' %
-              (['(dry-run)', '(real-run)'][force], n_changed, rel_fpath))
-        print(' * --------------------')
-        import utool as ut
-        new_file_lines = ut.lmap(ut.ensure_unicode, new_file_lines)
-        new_file = ''.join(new_file_lines)
-        #print(new_file.replace('\n','\n))
-        if verbose:
-            if True:
-                import utool as ut
-                old_file = ut.ensure_unicode(
-                    ''.join(ut.lmap(ut.ensure_unicode, file_lines)))
-                ut.print_difftext(old_file, new_file)
-            else:
-                changed_new, changed_old = zip(*changed_lines)
-                prefixold = ' * old (%d, %r):  \n | ' % (n_changed, name)
-                prefixnew = ' * new (%d, %r):  \n | ' % (n_changed, name)
-                print(prefixold + (' | '.join(changed_old)).strip('\n'))
-                print(' * ____________________')
-                print(prefixnew + (' | '.join(changed_new)).strip('\n'))
-                print(' * --------------------')
-                print(' * =====================================================')
-        # Write back to file
-        if force:
-            print(' ! WRITING CHANGES')
-            ut.writeto(fpath, new_file)
-            # with open(fpath, 'w') as file:
-            #     file.write(new_file.encode('utf8'))
-        else:
-            print(' dry run')
-        return changed_lines
-    #elif verbose:
-    #    print('Nothing changed')
-    return None
+    edit_list = find_sed_edits([fpath], regexpr, repl, nprocs=1)
+    if len(edit_list) == 0:
+        return None
+    edit = edit_list[0]
+    _print_sed_edit(edit, force, verbose)
+    # Write back to file
+    if force:
+        print(' ! WRITING CHANGES')
+        apply_sed_edits(edit_list)
+    else:
+        print(' dry run')
+    return edit['changed_lines']
 
 
 #@profile
@@ -1858,57 +2676,416 @@ def grepfile(fpath, regexpr_list, reflags=0, cache=None):
     islist2 = isinstance(reflags, (list, tuple))
     regexpr_list_ = regexpr_list if islist else [regexpr_list]
     reflags_list = reflags if islist2 else [reflags] * len(regexpr_list_)
-    re_list = [re.compile(pat, flags=_flags)
-               for pat, _flags in  zip(regexpr_list_, reflags_list)]
-    #print('regexpr_list_ = %r' % (regexpr_list_,))
-    #print('re_list = %r' % (re_list,))
+    patterns = _compile_grep_patterns(regexpr_list_, reflags_list)
 
-    import numpy as np
+    import bisect
     # Open file and search lines or use cache
     if cache is None or fpath not in cache:
-        #with open(fpath, 'r') as file_:
-        #    lines = list(file_.readlines())
         from utool import util_io
         lines = util_io.read_from(fpath, aslines=True, verbose=False)
-        #import utool as ut
-        #cumsum = ut.cumsum(map(len, lines))
-        cumsum = np.cumsum(list(map(len, lines)))
+        cumsum = list(itertools.accumulate(map(len, lines)))
         text = ''.join(lines)
         if cache is not None:
             cache[fpath] = (cumsum, text, lines)
     else:
         (cumsum, text, lines) = cache[fpath]
 
-    # Search each line for each pattern
-    old_method = False
-    if old_method:
-        for lx, line in enumerate(lines):
-            #for regexpr_ in regexpr_list_:
-            match_objects = [re_.search(line) for re_ in re_list]
-            for match in match_objects:
-                if match is not None:
-                    found_lines.append(line)
-                    found_lxs.append(lx)
+    # FIXME: multiline mode doesnt work
+    nlines = len(cumsum)
+    for start in _grep_match_starts(text, patterns):
+        # index of the first line ending after the match start
+        lx = bisect.bisect_right(cumsum, start)
+        if lx < nlines:
+            line_start = cumsum[lx - 1] if lx > 0 else 0
+            line = text[line_start:cumsum[lx]]
+            found_lines.append(line)
+            found_lxs.append(lx)
+    return found_lines, found_lxs
+
+
+#: characters that make a grep pattern a regex instead of a plain literal
+_REGEX_METACHARS = frozenset('.^$*+?{}[]\\|()')
+_REGEX_METABYTES = frozenset(b'.^$*+?{}[]\\|()')
+#: regex flags that change what a literal pattern matches
+_LITERAL_UNSAFE_FLAGS = int(re.IGNORECASE | re.VERBOSE)
+
+
+def _compile_grep_patterns(regexpr_list, reflags_list):
+    """
+    Compiles grep patterns once per search.
+
+    Patterns without regex metacharacters (and without flags that change
+    how a literal matches) are marked so :func:`_grep_match_starts` can use
+    plain substring search instead of the regex engine.
+
+    Returns:
+        list: of (key, literal, compiled) tuples, where literal is None for
+            real regexes
+    """
+    patterns = []
+    for pat, flags in zip(regexpr_list, reflags_list):
+        literal = None
+        if len(pat) > 0 and not flags & _LITERAL_UNSAFE_FLAGS:
+            metachars = (_REGEX_METABYTES if isinstance(pat, bytes) else
+                         _REGEX_METACHARS)
+            if metachars.isdisjoint(pat):
+                literal = pat
+        patterns.append(((pat, flags), literal, re.compile(pat, flags=flags)))
+    return patterns
+
+
+def _grep_match_starts(data, patterns):
+    """
+    Finds the start offset of every match in ``data`` (str, bytes, or mmap).
+    Many literal patterns in a large input are found together in one pass
+    by :func:`_find_literals`. Other literals use ``str.find``, and each
+    regex is searched with its own ``finditer`` pass. Offsets are ordered by
+    pattern and then by position, which is the order grepfile reports
+    matches in. Repeated patterns are searched once.
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_path import *  # NOQA
+        >>> from utool.util_path import _compile_grep_patterns, _grep_match_starts
+        >>> patterns = _compile_grep_patterns(['ab', 'b+', 'ab'], [0, 0, 0])
+        >>> print([literal for key, literal, re_ in patterns])
+        ['ab', None, 'ab']
+        >>> print(_grep_match_starts('abbab', patterns))
+        [0, 3, 1, 4, 0, 3]
+    """
+    from utool import util_type
+    literals = []
+    for key, literal, re_ in patterns:
+        if literal is not None and literal not in literals:
+            literals.append(literal)
+    literal_starts = {}
+    if (len(literals) >= _GREP_MULTI_LITERAL_MIN and
+            len(data) >= _GREP_MULTI_LITERAL_MIN_SIZE and
+            util_type.HAVE_NUMPY):
+        literal_starts = _find_literals(data, literals)
+    starts = []
+    seen = {}
+    for key, literal, re_ in patterns:
+        pat_starts = seen.get(key, None)
+        if pat_starts is None:
+            if literal is None:
+                pat_starts = [match.start() for match in re_.finditer(data)]
+            elif literal in literal_starts:
+                pat_starts = literal_starts[literal]
+            else:
+                # substring search is much faster than the regex engine
+                pat_starts = []
+                find = data.find
+                step = len(literal)
+                pos = find(literal)
+                while pos != -1:
+                    pat_starts.append(pos)
+                    pos = find(literal, pos + step)
+            seen[key] = pat_starts
+        starts.extend(pat_starts)
+    return starts
+
+
+#: literal patterns are searched in one pass if there are at least this many
+#: (below it repeated str.find is faster)
+_GREP_MULTI_LITERAL_MIN = 10
+#: ... and the searched text has at least this many characters
+_GREP_MULTI_LITERAL_MIN_SIZE = 2 ** 16
+#: positions hashed at once by _find_literals, to bound its memory use
+_GREP_MULTI_LITERAL_BLOCK = 2 ** 22
+#: the hash table of the last literal set searched by _find_literals
+_LITERAL_TABLE_CACHE = {}
+
+
+def _literal_table(literals, isbytes):
+    """
+    Buckets literals by a hash of their first k <= 3 characters (the exact
+    first bytes for bytes literals), and marks the used hashes in a table.
+    """
+    import numpy as np
+    cachekey = (isbytes, tuple(literals))
+    if cachekey in _LITERAL_TABLE_CACHE:
+        return _LITERAL_TABLE_CACHE[cachekey]
+    k = min(3, min(map(len, literals)))
+    mask = (1 << (8 * k)) - 1
+    buckets = {}
+    for literal in literals:
+        code = 0
+        for unit in bytearray(literal[:k]) if isbytes else map(ord, literal[:k]):
+            code = (code << 8) ^ unit
+        buckets.setdefault(code & mask, []).append(literal)
+    table = np.zeros(mask + 1, dtype=bool)
+    table[list(buckets.keys())] = True
+    _LITERAL_TABLE_CACHE.clear()
+    _LITERAL_TABLE_CACHE[cachekey] = (k, mask, buckets, table)
+    return k, mask, buckets, table
+
+
+def _find_literals(data, literals):
+    """
+    Finds several non-empty literals in one vectorized pass over ``data``
+    (str, bytes, or mmap) instead of one ``find`` pass per literal. Each
+    position is hashed by its first k characters, and positions whose hash
+    starts a literal are compared with it. Like repeated ``str.find``, the
+    occurrences of each literal do not overlap.
+
+    Returns:
+        dict: mapping each literal to the list of its start offsets
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_path import *  # NOQA
+        >>> from utool.util_path import _find_literals
+        >>> import utool as ut
+        >>> found = _find_literals('abcabc aaab', ['ab', 'bc', 'abc', 'aa'])
+        >>> print(ut.repr2(found, sorted_=True))
+        {'aa': [7], 'ab': [0, 3, 9], 'abc': [0, 3], 'bc': [1, 4]}
+        >>> assert _find_literals(b'abcabc aaab', [b'aa', b'ab'])[b'aa'] == [7]
+    """
+    import numpy as np
+    isbytes = not isinstance(data, six.text_type)
+    k, mask, buckets, table = _literal_table(literals, isbytes)
+    if isbytes:
+        buf = np.frombuffer(data, dtype=np.uint8)
     else:
-        for re_ in re_list:
-            # FIXME: multiline mode doesnt work
-            for match_object in re_.finditer(text):
-                #print('match_object = %r' % (match_object,))
-                lxs = np.where(match_object.start() < cumsum)[0][0:1]
-                if len(lxs) == 1:
-                    lx = lxs[0]
-                    if lx > 0:
-                        line_start = cumsum[lx - 1]
-                    else:
-                        line_start = 0
-                    line_end = cumsum[lx]
-                    line = text[line_start:line_end]
-                    found_lines.append(line)
-                    found_lxs.append(lx)
-                #[match_object.start > x for x in cumsum]
+        buf = np.frombuffer(data.encode('utf-32-le'), dtype=np.uint32)
+    npos = len(buf) - k + 1
+    blocks = []
+    for start in range(0, max(npos, 0), _GREP_MULTI_LITERAL_BLOCK):
+        stop = min(start + _GREP_MULTI_LITERAL_BLOCK, npos)
+        codes = buf[start:stop].astype(np.uint32)
+        for offset in range(1, k):
+            codes <<= 8
+            codes ^= buf[start + offset:stop + offset]
+        codes &= mask
+        hits = np.flatnonzero(table[codes])
+        blocks.append((hits + start, codes[hits]))
+    del buf
+    found = {literal: [] for literal in literals}
+    ends = {literal: 0 for literal in literals}
+    for poses, codes in blocks:
+        for pos, code in zip(poses.tolist(), codes.tolist()):
+            for literal in buckets[code]:
+                if (pos >= ends[literal] and
+                        data[pos:pos + len(literal)] == literal):
+                    found[literal].append(pos)
+                    ends[literal] = pos + len(literal)
+    return found
+
+
+#: files smaller than this are read instead of memory mapped
+_GREP_MMAP_MIN_BYTES = 2 ** 16
+#: bytes at the start of a file checked for nulls to detect binary files
+_GREP_BINARY_CHECK_BYTES = 8192
+#: serial grep is used for fewer files than this
+_GREP_MIN_PARALLEL_FILES = 512
+
+
+def _compile_bytes_regexes(regexpr_list, reflags_list):
+    """
+    Compiles str patterns for searching raw file bytes. Returns None if any
+    pattern is not ASCII, because byte and unicode semantics would differ.
+    """
+    bytes_list = []
+    for pat in regexpr_list:
+        if isinstance(pat, six.text_type):
+            try:
+                pat = pat.encode('ascii')
+            except UnicodeEncodeError:
+                return None
+        bytes_list.append(pat)
+    no_unicode = ~int(re.UNICODE)
+    flags_list = [flags & no_unicode for flags in reflags_list]
+    return _compile_grep_patterns(bytes_list, flags_list)
+
+
+def grepfile_bytes(fpath, regexpr_list, reflags=0, skip_binary=True):
+    r"""
+    Like :func:`grepfile`, but searches the raw (memory mapped) bytes of the
+    file and maps match offsets to line numbers with a vectorized newline
+    index. Only lines containing matches are decoded.
+
+    The results are always the same as :func:`grepfile`. Byte regexes only
+    match like unicode regexes on ASCII text (e.g. \w, \b and IGNORECASE
+    are ASCII-only on bytes), so :func:`grepfile` is used instead when any
+    pattern is not ASCII, or when a non-literal pattern is searched in a
+    file that is not pure ASCII.
+
+    Args:
+        fpath (str): file path
+        regexpr_list (list or str): pattern or list of patterns
+        reflags (int or list): regex flags
+        skip_binary (bool): return None for files with a null byte near the
+            start
+
+    Returns:
+        tuple (list, list): list of lines and list of line numbers (or None
+            if the file is binary and skip_binary is True)
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_path import *  # NOQA
+        >>> import utool as ut
+        >>> fpath = ut.get_modpath(ut.util_path)
+        >>> regexpr_list = ['grepfile_bytes', '__future__']
+        >>> found = grepfile_bytes(fpath, regexpr_list)
+        >>> assert found == grepfile(fpath, regexpr_list)
+        >>> assert 7 in found[1]
+        >>> # zero-width matches at the end of the file
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_grepfile_bytes')
+        >>> fpath = join(dpath, 'lines.txt')
+        >>> for text in ['foo\nbar', 'foo\n\n', 'foo\nbar\n']:
+        >>>     ut.writeto(fpath, text, verbose=False)
+        >>>     for pat in ['$', r'\Z', '^$', '(?m)^$']:
+        >>>         assert grepfile_bytes(fpath, pat) == grepfile(fpath, pat)
+        >>> print(grepfile_bytes(fpath, '$'))
+        (['bar\n'], [1])
+        >>> # unicode-sensitive patterns on non-ASCII text
+        >>> ut.writeto(fpath, u'caf\xe9 ok\nCAF\xc9\n', verbose=False)
+        >>> for pat in [r'caf\w', r'\bok', u'caf\xe9', '(?i)caf.$', 'caf']:
+        >>>     assert grepfile_bytes(fpath, pat) == grepfile(fpath, pat)
+        >>> assert len(grepfile_bytes(fpath, r'caf\w')[0]) == 1
+        >>> ut.delete(dpath, verbose=False)
+    """
+    import mmap
+    import numpy as np
+    islist = isinstance(regexpr_list, (list, tuple))
+    islist2 = isinstance(reflags, (list, tuple))
+    regexpr_list_ = regexpr_list if islist else [regexpr_list]
+    reflags_list = reflags if islist2 else [reflags] * len(regexpr_list_)
+    patterns = _compile_bytes_regexes(regexpr_list_, reflags_list)
+    if patterns is None:
+        return grepfile(fpath, regexpr_list_, reflags_list)
+    found_lines = []
+    found_lxs = []
+    with open(fpath, 'rb') as file_:
+        size = os.fstat(file_.fileno()).st_size
+        if size == 0:
+            return found_lines, found_lxs
+        if skip_binary:
+            head = file_.read(_GREP_BINARY_CHECK_BYTES)
+            if b'\x00' in head:
+                return None
+            file_.seek(0)
+        if size < _GREP_MMAP_MIN_BYTES:
+            data = file_.read()
+        else:
+            data = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    try:
+        is_literal = all(literal is not None for key, literal, re_ in patterns)
+        if not is_literal and buf.max() > 127:
+            # Regexes could match differently on the decoded text
+            return grepfile(fpath, regexpr_list_, reflags_list)
+        # Like grepfile, zero-width matches at EOF (e.g. '$') do not start a
+        # line
+        starts = [start for start in _grep_match_starts(data, patterns)
+                  if start < size]
+        if len(starts) > 0:
+            newlines = np.flatnonzero(buf == 10)
+            # number of newlines before each match is its line index
+            lxs = np.searchsorted(newlines, starts, side='left')
+            nnewlines = len(newlines)
+            for lx in lxs.tolist():
+                line_start = newlines[lx - 1] + 1 if lx > 0 else 0
+                line_end = newlines[lx] + 1 if lx < nnewlines else size
+                line = data[line_start:line_end].decode('utf8', errors='replace')
+                found_lines.append(line)
+                found_lxs.append(lx)
+    finally:
+        # the mmap cannot be closed while the array references it
+        del buf
+        if isinstance(data, mmap.mmap):
+            data.close()
     return found_lines, found_lxs
 
 
+def _grep_files_worker(fpath_list, regexpr_list, reflags_list, skip_binary,
+                       yield_empty):
+    results = []
+    for fpath in fpath_list:
+        # Like grepfile, unreadable files raise
+        found = grepfile_bytes(fpath, regexpr_list, reflags_list,
+                               skip_binary=skip_binary)
+        if found is None:
+            found = ([], [])
+        if yield_empty or len(found[0]) > 0:
+            results.append((fpath, found[0], found[1]))
+    return results
+
+
+def igrep(regexpr_list, fpath_list, reflags=0, nprocs=None, skip_binary=True,
+          ordered=True, chunksize=64, yield_empty=False):
+    r"""
+    Greps many files, optionally across a process pool, and yields results
+    as they are found.
+
+    Each file is searched with :func:`grepfile_bytes`. Files are sent to the
+    workers in chunks to amortize the inter-process overhead.
+
+    Args:
+        regexpr_list (list or str): pattern or list of patterns
+        fpath_list (list): files to search
+        reflags (int or list): regex flags
+        nprocs (int): number of processes. Defaults to all cpus when there
+            are many files and to serial execution otherwise.
+        skip_binary (bool): skip files with a null byte near the start
+        ordered (bool): yield results in the order of fpath_list. If False
+            results are yielded as soon as any worker finishes.
+        chunksize (int): number of files per task
+        yield_empty (bool): also yield files without matches
+
+    Yields:
+        tuple: (fpath, found_lines, found_lxs)
+
+    CommandLine:
+        python -m utool.util_path igrep
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_path import *  # NOQA
+        >>> import utool as ut
+        >>> fpath_list = list(matching_fpaths([dirname(ut.__file__)], ['*.py']))
+        >>> results = list(igrep(['def igrep'], fpath_list, nprocs=2, chunksize=8))
+        >>> print([basename(fpath) for fpath, lines, lxs in results])
+        ['util_path.py']
+        >>> serial = list(igrep(['def igrep'], fpath_list, nprocs=1))
+        >>> assert serial == results
+    """
+    from utool import util_parallel
+    if isinstance(regexpr_list, six.string_types):
+        regexpr_list = [regexpr_list]
+    regexpr_list = list(regexpr_list)
+    if isinstance(reflags, (list, tuple)):
+        reflags_list = list(reflags)
+    else:
+        reflags_list = [reflags] * len(regexpr_list)
+    fpath_list = list(fpath_list)
+    if len(fpath_list) == 0:
+        return
+    if nprocs is None:
+        if len(fpath_list) < _GREP_MIN_PARALLEL_FILES:
+            nprocs = 1
+        else:
+            nprocs = util_parallel.get_default_numprocs()
+    if nprocs == 1:
+        for fpath in fpath_list:
+            results = _grep_files_worker([fpath], regexpr_list, reflags_list,
+                                         skip_binary, yield_empty)
+            for result in results:
+                yield result
+        return
+    chunks = [fpath_list[idx:idx + chunksize]
+              for idx in range(0, len(fpath_list), chunksize)]
+    args_list = [(chunk, regexpr_list, reflags_list, skip_binary, yield_empty)
+                 for chunk in chunks]
+    gen = util_parallel.generate2(_grep_files_worker, args_list,
+                                  nprocs=nprocs, ordered=ordered, verbose=0)
+    for results in gen:
+        for result in results:
+            yield result
+
+
 def greplines(lines, regexpr_list, reflags=0):
     """
     grepfile - greps a specific file
@@ -1922,32 +3099,21 @@ def greplines(lines, regexpr_list, reflags=0):
     islist2 = isinstance(reflags, (list, tuple))
     regexpr_list_ = regexpr_list if islist else [regexpr_list]
     reflags_list = reflags if islist2 else [reflags] * len(regexpr_list_)
-    re_list = [re.compile(pat, flags=_flags)
-               for pat, _flags in  zip(regexpr_list_, reflags_list)]
-    #print('regexpr_list_ = %r' % (regexpr_list_,))
-    #print('re_list = %r' % (re_list,))
+    patterns = _compile_grep_patterns(regexpr_list_, reflags_list)
 
-    import numpy as np
-    #import utool as ut
-    #cumsum = ut.cumsum(map(len, lines))
-    cumsum = np.cumsum(list(map(len, lines)))
+    import bisect
+    cumsum = list(itertools.accumulate(map(len, lines)))
     text = ''.join(lines)
 
-    # Search each line for each pattern
-    for re_ in re_list:
-        # FIXME: multiline mode doesnt work
-        for match_object in re_.finditer(text):
-            lxs = np.where(match_object.start() < cumsum)[0][0:1]
-            if len(lxs) == 1:
-                lx = lxs[0]
-                if lx > 0:
-                    line_start = cumsum[lx - 1]
-                else:
-                    line_start = 0
-                line_end = cumsum[lx]
-                line = text[line_start:line_end]
-                found_lines.append(line)
-                found_lxs.append(lx)
+    # FIXME: multiline mode doesnt work
+    nlines = len(cumsum)
+    for start in _grep_match_starts(text, patterns):
+        lx = bisect.bisect_right(cumsum, start)
+        if lx < nlines:
+            line_start = cumsum[lx - 1] if lx > 0 else 0
+            line = text[line_start:cumsum[lx]]
+            found_lines.append(line)
+            found_lxs.append(lx)
     return found_lines, found_lxs
 
 
@@ -1979,7 +3145,7 @@ def testgrep():
 def grep(regex_list, recursive=True, dpath_list=None, include_patterns=None,
          exclude_dirs=[], greater_exclude_dirs=None, inverse=False,
          exclude_patterns=[], verbose=VERBOSE, fpath_list=None, reflags=0,
-         cache=None):
+         cache=None, nprocs=None):
     r"""
     greps for patterns
     Python implementation of grep. NOT FINISHED
@@ -1989,6 +3155,10 @@ def grep(regex_list, recursive=True, dpath_list=None, include_patterns=None,
         recursive (bool):
         dpath_list (list): directories to search (defaults to cwd)
         include_patterns (list) : defaults to standard file extensions
+        cache (dict): if specified, decoded file text is cached here and
+            files are searched with :func:`grepfile`. Otherwise the files are
+            searched by :func:`igrep`, which skips binary files.
+        nprocs (int): number of processes used by :func:`igrep`
 
     Returns:
         (list, list, list): (found_fpaths, found_lines_list, found_lxs_list)
@@ -2059,11 +3229,17 @@ def grep(regex_list, recursive=True, dpath_list=None, include_patterns=None,
     # HACK
     reflags = reflags_list[0]
 
+    if cache is None:
+        result_gen = igrep(extended_regex_list, fpath_generator, reflags_list,
+                           nprocs=nprocs, yield_empty=inverse)
+    else:
+        result_gen = (
+            (fpath,) + tuple(grepfile(fpath, extended_regex_list, reflags_list,
+                                      cache=cache))
+            for fpath in fpath_generator)
+
     # For each matching filepath
-    for fpath in fpath_generator:
-        # For each search pattern
-        found_lines, found_lxs = grepfile(fpath, extended_regex_list,
-                                          reflags_list, cache=cache)
+    for fpath, found_lines, found_lxs in result_gen:
         if inverse:
             if len(found_lines) == 0:
                 # Append files that the pattern was not found in
@@ -2302,7 +3478,7 @@ def search_in_dirs(fname, search_dpaths=[], shortcircuit=True,
         fpath = join(dpath, fname)
         if return_tried:
             tried_list.append(fpath)
-        if exists(fpath):
+        if _cached_exists(fpath):
             if shortcircuit:
                 if return_tried:
                     return fpath, tried_list
@@ -2361,7 +3537,7 @@ def find_lib_fpath(libname, root_dir, recurse_down=True, verbose=False, debug=Fa
         for lib_fname in lib_fname_list:
             for lib_dpath in get_lib_dpath_list(root_dir):
                 lib_fpath = normpath(join(lib_dpath, lib_fname))
-                if exists(lib_fpath):
+                if _cached_exists(lib_fpath):
                     if verbose:
                         print('\n[c] Checked: '.join(tried_fpaths))
                     if debug:
@@ -2516,7 +3692,7 @@ def search_candidate_paths(candidate_path_list, candidate_name_list=None,
 
     return_path = None
     for path in candidate_path_list_:
-        if path is not None and exists(path):
+        if path is not None and _cached_exists(path):
             if verbose >= 2:
                 print('[search_candidate_paths] Found candidate directory %r' % (path,))
                 print('[search_candidate_paths] ... checking for approprate structure')
@@ -2634,13 +3810,15 @@ def symlink(real_path, link_path, overwrite=False, on_error='raise',
         # Use ubelt implementation
         import ubelt as ub
         try:
-            return ub.symlink(real_path, link_path, overwrite=overwrite,
+            link = ub.symlink(real_path, link_path, overwrite=overwrite,
                               verbose=verbose)
         except Exception:
             if on_error == 'ignore':
                 return False
             else:
                 raise
+        _invalidate_stat_caches(link_path)
+        return link
 
     path = normpath(real_path)
     link = normpath(link_path)
@@ -6,9 +6,13 @@ Old progress funcs needto be depricated ProgressIter and ProgChunks are pretty
 much the only useful things here.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
+import os
+import sys
 import time
 import math
+import itertools
 import datetime
+import threading
 from functools import partial
 from utool import util_logging
 from utool import util_inject
@@ -186,6 +190,148 @@ def ProgChunks(list_, chunksize, nInput=None, **kwargs):
     return progiter_
 
 
+class ProgressEventEmitter(object):
+    r"""
+    Sends structured progress events from a ProgressIter to a callback, a
+    JSON-lines file, or a local datagram socket, so schedulers and dashboards
+    can monitor throughput without scraping the formatted text.
+
+    Each event is a dict with the keys: event ('start', 'progress', 'end', or
+    'abort'), lbl, count, total, rate (iterations per second), etr (estimated
+    seconds remaining), ellapsed (seconds), timestamp (unix time), and pid.
+    'abort' replaces 'end' when the loop is broken out of or raises.
+
+    Progress events are rate limited to at most one per ``interval`` seconds
+    and are only considered when the ProgressIter would update its display,
+    so the cost inside the loop is negligible. Start and end (or abort)
+    events are always sent, and a file or socket target is closed after
+    them.
+
+    Args:
+        target (callable | str | file): where to send events. A string is
+            treated as a socket address if it starts with 'udp://' or
+            'unix://' and as a file path to append to otherwise.
+        interval (float): minimum seconds between progress events
+
+    CommandLine:
+        python -m utool.util_progress ProgressEventEmitter
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_progress import *  # NOQA
+        >>> import utool as ut
+        >>> events = []
+        >>> prog = ProgIter(range(1000), lbl='work', events=events.append,
+        >>>                 event_interval=0, verbose=False)
+        >>> for _ in prog:
+        >>>     pass
+        >>> assert events[0]['event'] == 'start'
+        >>> assert events[-1]['event'] == 'end'
+        >>> assert events[-1]['count'] == 1000 and events[-1]['total'] == 1000
+        >>> assert set(events[-1]) == {'event', 'lbl', 'count', 'total', 'rate',
+        >>>                            'etr', 'ellapsed', 'timestamp', 'pid'}
+        >>> # breaking out of the loop sends an abort event
+        >>> events = []
+        >>> for count in ProgIter(range(1000), events=events.append,
+        >>>                       event_interval=0, verbose=False):
+        >>>     if count == 10:
+        >>>         break
+        >>> print(events[-1]['event'], events[-1]['count'])
+        abort 11
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_progress import *  # NOQA
+        >>> import utool as ut
+        >>> import json
+        >>> dpath = ut.ensure_app_resource_dir('utool')
+        >>> fpath = ut.unixjoin(dpath, 'test_progress_events.jsonl')
+        >>> ut.delete(fpath, verbose=False)
+        >>> for _ in ProgIter(range(10), lowoverhead=True, verbose=False,
+        >>>                   events=fpath):
+        >>>     pass
+        >>> with open(fpath) as file_:
+        >>>     events = [json.loads(line) for line in file_]
+        >>> assert events[-1]['event'] == 'end' and events[-1]['count'] == 10
+        >>> ut.delete(fpath, verbose=False)
+    """
+    def __init__(self, target, interval=1.0):
+        self.target = target
+        self.interval = interval
+        self._last_time = -float('inf')
+        self._send = None
+        self._closers = []
+
+    def _make_sender(self):
+        import json
+        target = self.target
+        if callable(target):
+            return target
+        if isinstance(target, six.string_types):
+            if target.startswith('udp://') or target.startswith('unix://'):
+                import socket
+                if target.startswith('udp://'):
+                    host, port = target[len('udp://'):].rsplit(':', 1)
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                    address = (host, int(port))
+                else:
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                    address = target[len('unix://'):]
+                self._closers.append(sock.close)
+
+                def _send(event):
+                    try:
+                        sock.sendto(json.dumps(event).encode('utf8'), address)
+                    except (IOError, OSError):
+                        # Nobody is listening. Progress must never kill a job
+                        pass
+                return _send
+            file_ = open(target, 'a')
+            self._closers.append(file_.close)
+        else:
+            file_ = target
+
+        def _send(event):
+            file_.write(json.dumps(event) + '\n')
+            file_.flush()
+        return _send
+
+    def emit(self, kind, prog):
+        """
+        Sends an event describing the current state of a ProgressIter
+        """
+        now = time.time()
+        if kind == 'progress' and now - self._last_time < self.interval:
+            return
+        self._last_time = now
+        if self._send is None:
+            self._send = self._make_sender()
+        length = prog.length * prog.parent_length
+        rate = prog.iters_per_second
+        event = {
+            'event': kind,
+            'lbl': prog.lbl,
+            'count': prog.count,
+            'total': length if length else None,
+            'rate': None if rate != rate else rate,
+            'etr': prog.est_seconds_left if length else None,
+            'ellapsed': prog.total_seconds,
+            'timestamp': now,
+            'pid': os.getpid(),
+        }
+        try:
+            self._send(event)
+        finally:
+            if kind in ['end', 'abort']:
+                self.close()
+
+    def close(self):
+        for closer in self._closers:
+            closer()
+        self._closers = []
+        self._send = None
+
+
 def ProgPartial(*args, **kwargs):
     return partial(ProgressIter, *args, **kwargs)
 
@@ -221,6 +367,13 @@ class ProgressIter(object):
         ffreq (None): alias for flush_freq
         total (None): alias for length
         num (None):   alias for length
+        lowoverhead (bool): if True only check the clock every 2 ** k
+            iterations (k is adjusted automatically). Use for tight loops over
+            millions of cheap items. (default False)
+        events (None): a callable, a JSON-lines file path, a file object, or
+            a 'udp://host:port' / 'unix:///path' socket address that receives
+            structured progress events. See ProgressEventEmitter.
+        event_interval (float): minimum seconds between progress events
 
     Timeit::
         import utool as ut
@@ -351,6 +504,8 @@ class ProgressIter(object):
         self.prog_hook          = kwargs.pop('prog_hook', None)
         self.prehack            = kwargs.pop('prehack', None)
         self.freq_est_strat     = kwargs.pop('freq_est', 'between')
+        # only check the clock every 2 ** k iterations
+        self.lowoverhead        = kwargs.pop('lowoverhead', False)
         if 'separate' in kwargs:
             print('WARNING separate no longer supported by ProgIter')
 
@@ -370,6 +525,13 @@ class ProgressIter(object):
         #self.start_offset       = self.substep_min
 
         self.stream      = kwargs.pop('stream', None)
+        # structured progress events (see ProgressEventEmitter)
+        events                  = kwargs.pop('events', None)
+        event_interval          = kwargs.pop('event_interval', 1.0)
+        if events is None or isinstance(events, ProgressEventEmitter):
+            self.event_emitter = events
+        else:
+            self.event_emitter = ProgressEventEmitter(events, event_interval)
         self.extra = ''
 
         if FORCE_ALL_PROGRESS:
@@ -412,40 +574,15 @@ class ProgressIter(object):
             return iter(self.iterable)
         else:
             #if self.use_rate:
+            if self.lowoverhead and not (self.prehack or self.prog_hook):
+                return self.iter_lowoverhead()
             # STANDARD CALL CASE
             return self.iter_rate()
             #else:
             #    return self.iter_without_rate()
 
-    #def get_subindexers(prog_iter, num_substeps):
-    #    # FIXME and  make this a method of progiter
-    #    step_min = (((prog_iter.count - 1) / prog_iter.length) *
-    #                prog_iter.substep_size + prog_iter.substep_min)
-    #    step_size = (1.0 / prog_iter.length) * prog_iter.substep_size
-
-    #    substep_size = step_size / num_substeps
-    #    substep_min_list = [(step * substep_size) + step_min
-    #                        for step in range(num_substeps)]
-    #    #level = prog_iter.level + 1
-    #    DEBUG = False
-    #    if DEBUG:
-    #        with ut.Indenter(' ' * 4 * prog_iter.level):
-    #            print('\n')
-    #            print('+____<NEW SUBSTEPS>____')
-    #            print('Making %d substeps for prog_iter.lbl = %s' % (
-    #                num_substeps, prog_iter.lbl,))
-    #            print(' * step_min         = %.2f' % (step_min,))
-    #            print(' * step_size        = %.2f' % (step_size,))
-    #            print(' * substep_size     = %.2f' % (substep_size,))
-    #            print(' * substep_min_list = %r' % (substep_min_list,))
-    #            print(r'L____</NEW SUBSTEPS>____')
-    #            print('\n')
-    #    subprog_partial_list = [
-    #        partial(ProgressIter,
-    #                parent_length=prog_iter.length * num_substeps,
-    #                parent_index=(prog_iter.count - 1) + (prog_iter.length * step))
-    #        for step in range(num_substeps)]
-    #    return subprog_partial_list
+    # NOTE: nested progress (formerly the get_subindexers sketch) is handled
+    # by ProgressManager
 
     #def build_msg_fmtstr_time(self, lbl, invert_rate, backspace):
     #    with_wall = True
@@ -604,6 +741,9 @@ class ProgressIter(object):
                                                  self.invert_rate,
                                                  self.backspace)
 
+        if self.event_emitter is not None:
+            self.event_emitter.emit('start', self)
+
         try:
             util_logging._utool_flush()()
         except IOError as ex:
@@ -651,109 +791,231 @@ class ProgressIter(object):
         measure_between_time = collections.deque([], maxlen=self.est_window)
 
         # Wrap the for loop with a generator
-        for self.count, item in enumerate(self.iterable, start=start):
+        ended = False
+        try:
+            for self.count, item in enumerate(self.iterable, start=start):
+                if self.prehack:
+                    # hack to print before yeilding
+                    # so much for efficiency
+                    self.set_extra((self.lbl + '=' + self.prehack) % item)
+                    self.display_message()
+                    self.ensure_newline()
+
+                # GENERATE
+                yield item
+
+                if self.prehack or (self.count) % freq == 0:
+                    now_time          = default_timer()
+                    between_time      = (now_time - last_time)
+                    between_count     = self.count - last_count
+                    total_seconds     = (now_time - start_time)
+                    self.total_seconds = total_seconds
+                    if FREQ_EST == 0:
+                        if USE_RECORD:
+                            measure_between_time.append(between_count / (float(between_time) + 1E-9))
+                            iters_per_second = sum(measure_between_time) / len(measure_between_time)
+                        else:
+                            iters_per_second = between_count / (float(between_time) + 1E-9)
+                    elif FREQ_EST == 1:
+                        iters_per_second = (now_time - start_time) / self.count
+
+                    self.iters_per_second = iters_per_second
+                    # If the future is known
+                    if length is None:
+                        est_seconds_left = -1
+                    else:
+                        iters_left = length - self.count
+                        est_seconds_left = iters_left / (iters_per_second + 1E-9)
+                    self.est_seconds_left = est_seconds_left
+
+                    # /future
+                    last_count        = self.count
+                    last_time         = now_time
+                    # ADJUST FREQ IF NEEDED
+                    # Adjust frequency if printing too quickly
+                    # so progress doesnt slow down actual function
+                    # TODO: better adjust algorithm
+                    time_thresh *= time_thresh_growth
+                    if adjust and (between_time < time_thresh or between_time > time_thresh * 2.0):
+                        max_between_time = max(max(max_between_time, between_time),
+                                               1E-9)
+                        max_between_count = max(max_between_count, between_count)
+                        # If progress was uniform and all time estimates were
+                        # perfect this would be the new freq to achieve time_thresh
+                        new_freq = max(int(time_thresh * max_between_count /
+                                           max_between_time), 1)
+                        if DEBUG_FREQ_ADJUST:
+                            print('\n+---')
+                            print('[prog] between_count = %r' % between_count)
+                            print('[prog] between_time = %.8r' % between_time)
+                            print('[prog] time_thresh = %r' % time_thresh)
+                            print('[prog] max_between_count = %r' % max_between_count)
+                            print('[prog] max_between_time = %.8r' % max_between_time)
+                            print('[prog] Adusting frequency from: %r' % freq)
+                            print('[prog] Adusting frequency to: %r' % new_freq)
+                            print('L___')
+                        # But things are not perfect. So, don't make drastic changes
+                        max_freq_change_up = max(256, freq * 2)
+                        max_freq_change_down = freq // 2
+                        if (new_freq - freq) > max_freq_change_up:
+                            freq += max_freq_change_up
+                        elif (freq - new_freq) > max_freq_change_down:
+                            freq -= max_freq_change_down
+                        else:
+                            freq = new_freq
+
+                    if not self.prehack:
+                        self.display_message()
+
+                    # DO PROGRESS INFO
+                    if self.prog_hook is not None:
+                        # From the point of view of the progress iter, we are about
+                        # to enter the body of a for loop. (But we may have
+                        # executed the body implicitly in the yeild....  so it is
+                        # ambiguous. In the second case 0 will be executed twice.
+                        self.prog_hook(self.count, length)
+
             if self.prehack:
-                # hack to print before yeilding
-                # so much for efficiency
-                self.set_extra((self.lbl + '=' + self.prehack) % item)
+                self.set_extra('')
+
+            # --- end of main loop
+            # cleanup
+            if (self.count) % freq != 0:
+                # If the final line of progress was not written in the loop, write
+                # it here
+                self.est_seconds_left = 0
+                self.total_seconds = (default_timer() - start_time)
                 self.display_message()
-                self.ensure_newline()
+                if self.prog_hook is not None:
+                    # From the point of view of the progress iter, we are about to
+                    # enter the body of a for loop. (But we may have executed the
+                    # body implicitly in the yeild....  so it is ambiguous. In the
+                    # second case 0 will be executed twice.
+                    self.prog_hook(self.count, length)
 
-            # GENERATE
-            yield item
+            if self.event_emitter is not None:
+                self.event_emitter.emit('end', self)
+            ended = True
+        finally:
+            if not ended and self.event_emitter is not None:
+                # the loop was broken out of or raised
+                self.event_emitter.emit('abort', self)
+        self.ensure_newline()
 
-            if self.prehack or (self.count) % freq == 0:
-                now_time          = default_timer()
-                between_time      = (now_time - last_time)
-                between_count     = self.count - last_count
-                total_seconds     = (now_time - start_time)
-                self.total_seconds = total_seconds
-                if FREQ_EST == 0:
-                    if USE_RECORD:
-                        measure_between_time.append(between_count / (float(between_time) + 1E-9))
-                        iters_per_second = sum(measure_between_time) / len(measure_between_time)
-                    else:
-                        iters_per_second = between_count / (float(between_time) + 1E-9)
-                elif FREQ_EST == 1:
-                    iters_per_second = (now_time - start_time) / self.count
-
-                self.iters_per_second = iters_per_second
-                # If the future is known
-                if length is None:
-                    est_seconds_left = -1
-                else:
-                    iters_left = length - self.count
-                    est_seconds_left = iters_left / (iters_per_second + 1E-9)
-                self.est_seconds_left = est_seconds_left
-
-                # /future
-                last_count        = self.count
-                last_time         = now_time
-                # ADJUST FREQ IF NEEDED
-                # Adjust frequency if printing too quickly
-                # so progress doesnt slow down actual function
-                # TODO: better adjust algorithm
-                time_thresh *= time_thresh_growth
-                if adjust and (between_time < time_thresh or between_time > time_thresh * 2.0):
-                    max_between_time = max(max(max_between_time, between_time),
-                                           1E-9)
-                    max_between_count = max(max_between_count, between_count)
-                    # If progress was uniform and all time estimates were
-                    # perfect this would be the new freq to achieve time_thresh
-                    new_freq = max(int(time_thresh * max_between_count /
-                                       max_between_time), 1)
-                    if DEBUG_FREQ_ADJUST:
-                        print('\n+---')
-                        print('[prog] between_count = %r' % between_count)
-                        print('[prog] between_time = %.8r' % between_time)
-                        print('[prog] time_thresh = %r' % time_thresh)
-                        print('[prog] max_between_count = %r' % max_between_count)
-                        print('[prog] max_between_time = %.8r' % max_between_time)
-                        print('[prog] Adusting frequency from: %r' % freq)
-                        print('[prog] Adusting frequency to: %r' % new_freq)
-                        print('L___')
-                    # But things are not perfect. So, don't make drastic changes
-                    max_freq_change_up = max(256, freq * 2)
-                    max_freq_change_down = freq // 2
-                    if (new_freq - freq) > max_freq_change_up:
-                        freq += max_freq_change_up
-                    elif (freq - new_freq) > max_freq_change_down:
-                        freq -= max_freq_change_down
-                    else:
-                        freq = new_freq
+    def iter_lowoverhead(self):
+        """
+        Alternative to iter_rate for tight loops over many cheap items.
 
-                if not self.prehack:
-                    self.display_message()
+        Items are passed through C-level itertools chunks of 2 ** k items, so
+        the per-item work is a single counter increment. Python bookkeeping
+        (reading the clock, adjusting k, displaying) only runs between chunks,
+        and k is adjusted so that happens about once per display interval
+        (time_thresh). The rate is averaged between displays.
+        """
+        return itertools.chain.from_iterable(self._iter_lowoverhead_chunks())
 
-                # DO PROGRESS INFO
-                if self.prog_hook is not None:
-                    # From the point of view of the progress iter, we are about
-                    # to enter the body of a for loop. (But we may have
-                    # executed the body implicitly in the yeild....  so it is
-                    # ambiguous. In the second case 0 will be executed twice.
-                    self.prog_hook(self.count, length)
+    def _iter_lowoverhead_chunks(self):
+        self._cursor_at_newline = not self.backspace
+        if self.stream is None:
+            self.write = util_logging._utool_write()
+            self.flush = util_logging._utool_flush()
+        else:
+            self.write = lambda msg: self.stream.write(msg)  # NOQA
+            self.flush = lambda: self.stream.flush()  # NOQA
 
-        if self.prehack:
-            self.set_extra('')
+        length = self.length * self.parent_length  # hack
+        time_thresh = (self._get_timethresh_heuristics()
+                       if self.time_thresh is None else
+                       self.time_thresh)
+        self.count = count = self.parent_offset
+        self.iters_per_second = float('nan')
+        self.est_seconds_left = 0
+        self.total_seconds = 0
+        self.msg_fmtstr = self.build_msg_fmtstr2(self.lbl, length,
+                                                 self.invert_rate,
+                                                 self.backspace)
+        if self.event_emitter is not None:
+            self.event_emitter.emit('start', self)
+        if self.backspace:
+            self.display_message()
+        elif self.verbose:
+            start_msg_fmt = ''.join(self.build_msg_fmtstr_head_cols(length,
+                                                                    self.lbl))
+            self.write(start_msg_fmt.format(count=count) + '\n')
+        self._cursor_at_newline = not self.backspace
 
-        # --- end of main loop
-        # cleanup
-        if (self.count) % freq != 0:
-            # If the final line of progress was not written in the loop, write
-            # it here
+        # Start by checking the clock every iteration and grow from there
+        k = 0
+        max_k = 30
+        start_time = default_timer()
+        last_check_time = start_time
+        last_display_time = start_time
+        last_display_count = count
+
+        ended = False
+        # counts the items of the chunk in flight
+        counter = None
+        try:
+            iterator = iter(self.iterable)
+            while True:
+                step = 1 << k
+                # compress pulls an item before advancing the always truthy
+                # counter, so the counter tells us how many items were yielded.
+                counter = itertools.count(1)
+                yield itertools.compress(itertools.islice(iterator, step), counter)
+                num_yielded = next(counter) - 1
+                counter = None
+                count += num_yielded
+                if num_yielded < step:
+                    break
+                # --- amortized bookkeeping (every 2 ** k iterations) ---
+                now_time = default_timer()
+                check_time = now_time - last_check_time
+                last_check_time = now_time
+                # Adjust k so the next check happens around time_thresh from now
+                if check_time < time_thresh / 2 and k < max_k:
+                    ratio = time_thresh / max(check_time, 1E-9)
+                    k = min(max_k, k + max(1, int(math.log(ratio, 2)) - 1))
+                elif check_time > time_thresh * 2 and k > 0:
+                    k -= 1
+                if (now_time - last_display_time >= time_thresh or
+                        last_display_count == self.parent_offset):
+                    between_time = now_time - last_display_time
+                    self.iters_per_second = ((count - last_display_count) /
+                                             (between_time + 1E-9))
+                    last_display_time = now_time
+                    last_display_count = count
+                    self.count = count
+                    self.total_seconds = now_time - start_time
+                    if length:
+                        self.est_seconds_left = ((length - count) /
+                                                 (self.iters_per_second + 1E-9))
+                    self.display_message()
+
+            # Always show the final state
+            now_time = default_timer()
+            self.count = count
+            self.total_seconds = now_time - start_time
+            if count > last_display_count:
+                self.iters_per_second = ((count - last_display_count) /
+                                         (now_time - last_display_time + 1E-9))
             self.est_seconds_left = 0
-            self.total_seconds = (default_timer() - start_time)
             self.display_message()
-            if self.prog_hook is not None:
-                # From the point of view of the progress iter, we are about to
-                # enter the body of a for loop. (But we may have executed the
-                # body implicitly in the yeild....  so it is ambiguous. In the
-                # second case 0 will be executed twice.
-                self.prog_hook(self.count, length)
-
+            if self.event_emitter is not None:
+                self.event_emitter.emit('end', self)
+            ended = True
+        finally:
+            if not ended and self.event_emitter is not None:
+                # the loop was broken out of or raised
+                if counter is not None:
+                    count += next(counter) - 1
+                self.count = count
+                self.event_emitter.emit('abort', self)
         self.ensure_newline()
 
     def display_message(self):
+        if self.event_emitter is not None:
+            self.event_emitter.emit('progress', self)
         # HACK to be more like sklearn.extrnals ProgIter version
         if self.verbose:
             instant_invert_rate = self.iters_per_second < 0.1
@@ -824,6 +1086,491 @@ class ProgressIter(object):
 progiter = ProgressIter
 
 
+# Per-process cache of memory mapped slot files used by ProgressReporter.
+# Least recently used files are closed beyond _REPORTER_MMAPS_MAXSIZE, so a
+# long lived worker that reports to many nodes does not leak file handles.
+_REPORTER_MMAPS = collections.OrderedDict()
+_REPORTER_MMAPS_MAXSIZE = 16
+
+
+def _map_reporter_slots(fpath):
+    """ Returns (file_, mm, slots) with slots an int64 view of the file """
+    import mmap
+    file_ = open(fpath, 'r+b')
+    try:
+        mm = mmap.mmap(file_.fileno(), 0)
+    except Exception:
+        file_.close()
+        raise
+    slots = memoryview(mm).cast('q')
+    return (file_, mm, slots)
+
+
+def _unmap_reporter_slots(mapping):
+    file_, mm, slots = mapping
+    slots.release()
+    mm.close()
+    file_.close()
+
+
+def _open_reporter_slots(fpath):
+    """ Returns a cached int64 memoryview over a reporter slot file """
+    try:
+        mapping = _REPORTER_MMAPS.pop(fpath)
+    except KeyError:
+        mapping = _map_reporter_slots(fpath)
+        while len(_REPORTER_MMAPS) >= _REPORTER_MMAPS_MAXSIZE:
+            # reporters holding an evicted view reopen it on their next step
+            _unmap_reporter_slots(_REPORTER_MMAPS.popitem(last=False)[1])
+    _REPORTER_MMAPS[fpath] = mapping
+    return mapping[2]
+
+
+def _close_reporter_slots(fpath):
+    if fpath in _REPORTER_MMAPS:
+        _unmap_reporter_slots(_REPORTER_MMAPS.pop(fpath))
+
+
+class ProgressReporter(object):
+    """
+    A picklable handle that lets a worker process report progress for one
+    task back to a ProgressNode. Each reporter owns a single int64 slot in a
+    memory mapped file, so updates need no locks and no messages.
+
+    Obtain reporters with :func:`ProgressNode.reporter` and pass them to
+    worker functions (e.g. as an argument to ``ut.generate2``). A worker
+    process caches the mapping of the last few slot files it reported to.
+    Call :func:`close` when a task is done to release it early.
+    """
+    def __init__(self, fpath, slot):
+        self.fpath = fpath
+        self.slot = slot
+        self.count = 0
+        self._slots = None
+
+    def __getstate__(self):
+        return {'fpath': self.fpath, 'slot': self.slot, 'count': self.count}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._slots = None
+
+    def step(self, inc=1):
+        self.count += inc
+        for _ in range(2):
+            if self._slots is None:
+                try:
+                    self._slots = _open_reporter_slots(self.fpath)
+                except (IOError, OSError):
+                    # The node is closed and removed its slot file. Progress
+                    # must never kill a job.
+                    return
+            try:
+                self._slots[self.slot] = self.count
+                return
+            except ValueError:
+                # The mapping was released in this process (the node was
+                # closed or the cache evicted it), so reopen it once
+                self._slots = None
+
+    def close(self):
+        """ Releases this process's mapping of the slot file """
+        self._slots = None
+        _close_reporter_slots(self.fpath)
+
+
+class ProgressNode(object):
+    """
+    One node in the tree owned by a ProgressManager. Steps are plain integer
+    increments; all timing and rendering is done by the manager.
+    """
+    def __init__(self, manager, lbl, total=None, parent=None, nslots=0):
+        self.manager = manager
+        self.lbl = lbl
+        self.total = total
+        self.parent = parent
+        self.children = []
+        self.count = 0
+        self.start_time = default_timer()
+        self.closed = False
+        self.is_leaf = True
+        self.slot_fpath = None
+        self._slots = None
+        self._mapping = None
+        # the render thread reads the slots while the owner may close them
+        self._slots_lock = threading.Lock()
+        if nslots:
+            import tempfile
+            fd, fpath = tempfile.mkstemp(prefix='utool_prog_', suffix='.slots')
+            with os.fdopen(fd, 'wb') as file_:
+                file_.truncate(nslots * 8)
+            self.slot_fpath = fpath
+            # the node keeps its own mapping, which the reporter cache of
+            # this process cannot evict
+            self._mapping = _map_reporter_slots(fpath)
+            self._slots = self._mapping[2]
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def child(self, lbl, total=None, nslots=0):
+        """ Adds a nested progress node """
+        return self.manager.add(lbl, total=total, parent=self, nslots=nslots)
+
+    def reporter(self, slot):
+        """ Returns a picklable reporter for worker task ``slot`` """
+        if self.slot_fpath is None:
+            raise ValueError('node %r was created without nslots' % (self.lbl,))
+        return ProgressReporter(self.slot_fpath, slot)
+
+    def step(self, inc=1):
+        self.count += inc
+
+    def iter(self, iterable):
+        """ Wraps an iterable and steps after each item """
+        for item in iterable:
+            yield item
+            self.count += 1
+        self.close()
+
+    def get_count(self):
+        """ Local steps plus everything reported by worker processes """
+        with self._slots_lock:
+            if self._slots is None:
+                return self.count
+            return self.count + sum(self._slots)
+
+    def fraction(self):
+        """
+        Fraction complete. Unfinished children count as partial steps, so
+        nested loops give a smooth overall fraction.
+        """
+        if not self.total:
+            return None
+        partial = 0.0
+        for child in list(self.children):
+            child_frac = child.fraction()
+            if child_frac is not None:
+                partial += child_frac
+        return min(1.0, (self.get_count() + partial) / self.total)
+
+    def close(self):
+        """ Marks the node done and removes it from the display """
+        if self.closed:
+            return
+        self.closed = True
+        if self._slots is not None:
+            with self._slots_lock:
+                # keep the worker counts, closed roots are still rendered
+                self.count += sum(self._slots)
+                self._slots = None
+                _unmap_reporter_slots(self._mapping)
+                self._mapping = None
+                _close_reporter_slots(self.slot_fpath)
+            try:
+                os.remove(self.slot_fpath)
+            except OSError:
+                pass
+        self.manager._on_close(self)
+
+
+class ProgressManager(object):
+    r"""
+    Owns a tree of progress nodes and renders all of them from a single
+    background thread, so nested loops and parallel workers do not interleave
+    their output and the overall rate and ETA describe the whole job.
+
+    Nodes are stepped from the main process with ``node.step()`` or
+    ``node.iter(iterable)``. Worker processes report through
+    ``node.reporter(slot)`` handles, one per task.
+
+    Args:
+        lbl (str): label of the summary line
+        interval (float): seconds between renders
+        stream (file): defaults to the utool write function
+        backspace (bool): redraw in place. Defaults to True when writing to a
+            tty.
+        verbose (bool): if False nothing is rendered
+
+    CommandLine:
+        python -m utool.util_progress ProgressManager
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_progress import *  # NOQA
+        >>> import io
+        >>> stream = io.StringIO()
+        >>> with ProgressManager('job', interval=1E-3, stream=stream) as mgr:
+        >>>     outer = mgr.add('outer', total=3)
+        >>>     for idx in outer.iter(range(3)):
+        >>>         inner = outer.child('inner', total=100)
+        >>>         for jdx in inner.iter(range(100)):
+        >>>             pass
+        >>> assert mgr.total_items() == 300
+        >>> assert outer.fraction() == 1.0
+        >>> assert 'job' in stream.getvalue()
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_progress import *  # NOQA
+        >>> from utool.util_progress import _demo_progress_worker
+        >>> import utool as ut
+        >>> import io
+        >>> stream = io.StringIO()
+        >>> chunks = [list(range(100))] * 8
+        >>> with ProgressManager('pjob', interval=1E-3, stream=stream) as mgr:
+        >>>     node = mgr.add('work', total=800, nslots=len(chunks))
+        >>>     args = [(chunk, node.reporter(idx))
+        >>>             for idx, chunk in enumerate(chunks)]
+        >>>     results = list(ut.generate2(_demo_progress_worker, args,
+        >>>                                 verbose=0))
+        >>>     assert node.get_count() == 800
+        >>>     node.close()
+        >>> assert sum(results) == 8 * sum(range(100))
+        >>> assert mgr.total_items() == 800
+        >>> # closed nodes keep the worker counts, late steps are dropped
+        >>> assert node.get_count() == 800
+        >>> node.reporter(0).step()
+        >>> assert 'work 800/800' in mgr.format_lines()[0]
+        >>> # workers keep a bounded number of slot files mapped
+        >>> from utool import util_progress
+        >>> with ProgressManager('many', verbose=False) as mgr2:
+        >>>     nodes = [mgr2.add('n%d' % idx, nslots=1) for idx in range(40)]
+        >>>     reporters = [n.reporter(0) for n in nodes]
+        >>>     for _ in range(2):
+        >>>         for reporter in reporters:
+        >>>             reporter.step()
+        >>>     assert len(util_progress._REPORTER_MMAPS) <= util_progress._REPORTER_MMAPS_MAXSIZE
+        >>>     assert [n.get_count() for n in nodes] == [2] * 40
+        >>>     for reporter in reporters:
+        >>>         reporter.close()
+        >>>     assert not any(n.slot_fpath in util_progress._REPORTER_MMAPS for n in nodes)
+    """
+    def __init__(self, lbl='Progress', interval=0.5, stream=None,
+                 backspace=None, verbose=True):
+        self.lbl = lbl
+        self.interval = interval
+        self.stream = stream
+        self.verbose = verbose
+        if backspace is None:
+            isatty = getattr(stream if stream is not None else sys.stdout,
+                             'isatty', None)
+            backspace = bool(isatty and isatty())
+        self.backspace = backspace
+        self.roots = []
+        self.start_time = default_timer()
+        self._closed_leaf_count = 0
+        self._num_lines = 0
+        self._thread = None
+        self._stop_event = None
+
+    def add(self, lbl, total=None, parent=None, nslots=0):
+        """
+        Adds a node to the tree
+
+        Args:
+            lbl (str): node label
+            total (int): expected number of steps
+            parent (ProgressNode): nest under this node
+            nslots (int): number of worker reporters this node will hand out
+
+        Returns:
+            ProgressNode: node
+        """
+        node = ProgressNode(self, lbl, total=total, parent=parent,
+                            nslots=nslots)
+        if parent is None:
+            self.roots.append(node)
+        else:
+            parent.children.append(node)
+            parent.is_leaf = False
+        return node
+
+    def _on_close(self, node):
+        if node.is_leaf:
+            self._closed_leaf_count += node.get_count()
+        if node.parent is not None:
+            try:
+                node.parent.children.remove(node)
+            except ValueError:
+                pass
+
+    def _walk(self):
+        stack = [(node, 0) for node in reversed(list(self.roots))]
+        while stack:
+            node, depth = stack.pop()
+            yield node, depth
+            stack.extend((child, depth + 1)
+                         for child in reversed(list(node.children)))
+
+    def total_items(self):
+        """ Number of steps taken by all leaf nodes, including closed ones """
+        active = sum(node.get_count() for node, _ in self._walk()
+                     if node.is_leaf and not node.closed)
+        return self._closed_leaf_count + active
+
+    def overall_fraction(self):
+        """ Mean fraction complete over root nodes with known totals """
+        fracs = [node.fraction() for node in self.roots]
+        fracs = [frac for frac in fracs if frac is not None]
+        if not fracs:
+            return None
+        return sum(fracs) / len(fracs)
+
+    def format_lines(self):
+        now = default_timer()
+        lines = []
+        for node, depth in self._walk():
+            if node.closed and node.parent is not None:
+                continue
+            count = node.get_count()
+            elapsed = now - node.start_time
+            total_str = '?' if not node.total else six.text_type(node.total)
+            lines.append('%s%s %d/%s rate=%.2f Hz' % (
+                '  ' * depth, node.lbl, count, total_str,
+                count / (elapsed + 1E-9)))
+        elapsed = now - self.start_time
+        frac = self.overall_fraction()
+        if frac:
+            etr = elapsed * (1.0 - frac) / frac
+            etr_str = six.text_type(datetime.timedelta(seconds=int(etr)))
+            frac_str = '%.1f%%' % (100 * frac,)
+        else:
+            etr_str = '?'
+            frac_str = '?'
+        lines.append('%s %s items/s=%.2f etr=%s ellapsed=%s' % (
+            self.lbl, frac_str, self.total_items() / (elapsed + 1E-9),
+            etr_str, datetime.timedelta(seconds=int(elapsed))))
+        return lines
+
+    def render(self):
+        """ Writes the current state of all nodes """
+        if not self.verbose:
+            return
+        if self.stream is None:
+            write = util_logging._utool_write()
+            flush = util_logging._utool_flush()
+        else:
+            write = self.stream.write
+            flush = self.stream.flush
+        lines = self.format_lines()
+        if self.backspace:
+            CLEARLINE_EL2 = '\33[2K'
+            prefix = '\r' + ('\033[%dA' % (self._num_lines,)
+                             if self._num_lines else '')
+            text = prefix + ''.join(CLEARLINE_EL2 + line + '\n'
+                                    for line in lines)
+        else:
+            text = '\n'.join(lines) + '\n'
+        self._num_lines = len(lines)
+        write(text)
+        try:
+            flush()
+        except IOError:
+            pass
+
+    def _render_loop(self):
+        while not self._stop_event.wait(self.interval):
+            self.render()
+
+    def start(self):
+        self.start_time = default_timer()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._render_loop)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stops the render thread and renders the final state """
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self.render()
+        for node, _ in list(self._walk()):
+            if node.slot_fpath is not None:
+                node.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.stop()
+
+
+def _demo_progress_worker(items, reporter):
+    total = 0
+    for item in items:
+        total += item
+        reporter.step()
+    reporter.close()
+    return total
+
+
+def benchmark_progiter_overhead(num=int(1E6), verbose=False, **kwargs):
+    r"""
+    Measures the per-item overhead of ProgIter compared to a bare loop.
+
+    Args:
+        num (int): number of items to iterate over
+        verbose (bool): print the per-item timings
+        **kwargs: extra arguments for ProgIter (which does not print)
+
+    Returns:
+        dict: seconds per item for each loop style, and the overhead of each
+            style relative to the bare loop.
+
+    CommandLine:
+        python -m utool.util_progress benchmark_progiter_overhead
+        python -c "import utool as ut; ut.benchmark_progiter_overhead(int(1E7), verbose=True)"
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_progress import *  # NOQA
+        >>> import io
+        >>> stream = io.StringIO()
+        >>> result = benchmark_progiter_overhead(1000, stream=stream)
+        >>> assert set(result) == {'bare', 'default', 'lowoverhead',
+        >>>                        'overhead_default', 'overhead_lowoverhead'}
+    """
+    kwargs = dict(kwargs)
+    kwargs['verbose'] = False
+
+    def bare_loop():
+        for _ in range(num):
+            pass
+
+    def default_loop():
+        for _ in ProgIter(range(num), lbl='default', **kwargs):
+            pass
+
+    def lowoverhead_loop():
+        for _ in ProgIter(range(num), lbl='lowoverhead', lowoverhead=True,
+                          **kwargs):
+            pass
+
+    loops = [('bare', bare_loop), ('default', default_loop),
+             ('lowoverhead', lowoverhead_loop)]
+    result = {}
+    for key, func in loops:
+        # Take the best of a few runs to reduce noise
+        best = float('inf')
+        for _ in range(3):
+            tstart = default_timer()
+            func()
+            best = min(best, default_timer() - tstart)
+        result[key] = best / num
+    for key in ['default', 'lowoverhead']:
+        result['overhead_' + key] = result[key] - result['bare']
+    if verbose:
+        for key in ['bare', 'default', 'lowoverhead']:
+            print('[benchmark_progiter] %12s: %.2f ns/item (overhead %.2f ns/item)' % (
+                key, result[key] * 1E9,
+                (result[key] - result['bare']) * 1E9))
+    return result
+
+
 class ProgIter(ProgressIter):
     """ Thin wrapper with better arg positions """
     def __init__(self, iterable, lbl='Prog', adjust=True, freq=1, bs=True,
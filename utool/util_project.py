@@ -7,7 +7,10 @@ from __future__ import absolute_import, division, print_function  # , unicode_li
 from six.moves import zip, filter, filterfalse, map, range  # NOQA
 import six  # NOQA
 #from os.path import split, dirname, join
-from os.path import dirname, join
+from os.path import basename, dirname, join, normpath
+import os
+import time
+import fnmatch
 from utool import util_class  # NOQA
 from utool import util_dev
 from utool import util_inject
@@ -604,13 +607,16 @@ def ensure_user_profile(user_profile=None):
 
 
 def grep_projects(tofind_list, user_profile=None, verbose=True, new=False,
-                  **kwargs):
+                  use_index=False, **kwargs):
     r"""
     Greps the projects defined in the current UserProfile
 
     Args:
         tofind_list (list):
         user_profile (None): (default = None)
+        use_index (bool): answer the query from each project's persistent
+            :class:`ProjectIndex`, which only re-reads changed files and
+            skips files that cannot match (default = False)
 
     Kwargs:
         user_profile
@@ -652,7 +658,10 @@ def grep_projects(tofind_list, user_profile=None, verbose=True, new=False,
     if verbose:
         print('\n'.join(msg_list1))
     #with ut.Timer('greping', verbose=True):
-    grep_result = ut.grep(tofind_list, **grepkw)
+    if use_index and set(grepkw).issubset(_INDEXED_GREP_KWARGS):
+        grep_result = _grep_project_indexes(tofind_list, **grepkw)
+    else:
+        grep_result = ut.grep(tofind_list, **grepkw)
     found_fpath_list, found_lines_list, found_lxs_list = grep_result
 
     # HACK, duplicate behavior. TODO: write grep print result function
@@ -708,8 +717,10 @@ def grep_projects(tofind_list, user_profile=None, verbose=True, new=False,
         return msg_list
 
 
-def glob_projects(pat, user_profile=None, recursive=True):
+def glob_projects(pat, user_profile=None, recursive=True, use_index=False):
     """
+    Globs the projects defined in the current UserProfile. With use_index
+    the cached directory listings of each :class:`ProjectIndex` are used.
 
     def testenv(modname, funcname):
         ut.import_modname(modname)
@@ -722,12 +733,593 @@ def glob_projects(pat, user_profile=None, recursive=True):
     """
     import utool as ut  # NOQA
     user_profile = ensure_user_profile(user_profile)
-    glob_results = ut.flatten([ut.glob(dpath, pat, recursive=recursive,
-                                       exclude_dirs=user_profile.project_exclude_dirs)
-                               for dpath in user_profile.project_dpaths])
+    exclude_dirs = user_profile.project_exclude_dirs
+    if not use_index:
+        glob_results = ut.flatten([ut.glob(dpath, pat, recursive=recursive,
+                                           exclude_dirs=exclude_dirs)
+                                   for dpath in user_profile.project_dpaths])
+        return glob_results
+    glob_results = []
+    for dpath in user_profile.project_dpaths:
+        index = ProjectIndex.load(dpath)
+        glob_results.extend(index.glob(pat, recursive=recursive,
+                                       exclude_dirs=exclude_dirs))
+        index.save()
     return glob_results
 
 
+#: seconds within which a modification time is too recent to be trusted
+#: (another write in the same timestamp tick would go unnoticed)
+_INDEX_RACY_SECONDS = 2.0
+#: bytes at the start of a file checked for nulls to detect binary files
+_INDEX_BINARY_CHECK_BYTES = 8192
+#: trigrams in more than this fraction of the indexed files (and in at least
+#: _INDEX_COMMON_MIN_FILES files) are too common to narrow a search, so their
+#: postings are dropped to bound the size of the index
+_INDEX_COMMON_FRACTION = 0.25
+_INDEX_COMMON_MIN_FILES = 256
+#: trigrams of newly indexed files are merged into the postings after this
+#: many accumulate
+_INDEX_MAX_PENDING = 2 ** 24
+#: grep keyword arguments that :func:`grep_projects` can answer from indexes
+_INDEXED_GREP_KWARGS = {
+    'dpath_list', 'include_patterns', 'exclude_dirs', 'greater_exclude_dirs',
+    'exclude_patterns', 'recursive', 'reflags', 'inverse', 'nprocs',
+    'verbose'}
+
+
+def _trigram_codes(data):
+    """
+    Returns the sorted unique byte trigrams of data encoded as uint32 codes
+    """
+    import numpy as np
+    buf = np.frombuffer(data, dtype=np.uint8).astype(np.uint32)
+    codes = (buf[:-2] << 16) | (buf[1:-1] << 8) | buf[2:]
+    return np.unique(codes)
+
+
+def _required_literals(regexpr, reflags=0):
+    r"""
+    Finds literal strings that every match of a regex must contain. The
+    answer is conservative: an empty list means nothing is known.
+
+    Args:
+        regexpr (str): regular expression
+        reflags (int): regex flags
+
+    Returns:
+        list: literal strings
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_project import *  # NOQA
+        >>> from utool.util_project import _required_literals
+        >>> print(_required_literals(r'def \w+_index\(self'))
+        ['def ', '_index(self']
+        >>> print(_required_literals(r'(foo|bar)baz+'))
+        ['ba', 'z']
+        >>> print(_required_literals(r'(?i)foo'))
+        []
+    """
+    try:
+        from re import _parser as sre_parse
+    except ImportError:  # nocover
+        import sre_parse
+    try:
+        parsed = sre_parse.parse(regexpr, reflags)
+    except Exception:
+        return []
+    state = getattr(parsed, 'state', None) or parsed.pattern
+    if state.flags & sre_parse.SRE_FLAG_IGNORECASE:
+        return []
+    repeat_ops = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+    repeat_ops.add(getattr(sre_parse, 'POSSESSIVE_REPEAT', None))
+    literals = []
+
+    def _collect(items):
+        run = []
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                run.append(six.unichr(av))
+                continue
+            if run:
+                literals.append(''.join(run))
+                run = []
+            if op is sre_parse.SUBPATTERN:
+                add_flags, sub = av[1], av[-1]
+                if not add_flags & sre_parse.SRE_FLAG_IGNORECASE:
+                    _collect(sub)
+            elif op in repeat_ops:
+                min_, max_, sub = av
+                if min_ >= 1:
+                    _collect(sub)
+            elif op is getattr(sre_parse, 'ATOMIC_GROUP', None):
+                _collect(av)
+        if run:
+            literals.append(''.join(run))
+    _collect(parsed)
+    return literals
+
+
+class ProjectIndex(util_dev.NiceRepr):
+    r"""
+    Persistent index of the files under one project directory used to speed
+    up repeated :func:`grep_projects` and :func:`glob_projects` calls.
+
+    Directory listings are cached and only re-listed when the directory
+    mtime changes. Text files are re-indexed when their mtime or size
+    changes, and the index stores postings that map each byte trigram to the
+    ids of the files containing it. Trigrams found in most files cannot
+    narrow a search and are not stored. A grep only reads the files that
+    contain every trigram some pattern requires; the results are the same
+    as :func:`utool.grep`.
+
+    Args:
+        dpath (str): project directory
+        cache_dpath (str): where the index is saved (defaults to the utool
+            app cache directory)
+
+    CommandLine:
+        python -m utool.util_project ProjectIndex
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_project import *  # NOQA
+        >>> import utool as ut
+        >>> dpath = ut.ensure_app_resource_dir('utool', 'test_project_index')
+        >>> ut.delete(dpath, verbose=False)
+        >>> ut.ensuredir(join(dpath, 'pkg'))
+        >>> ut.writeto(join(dpath, 'pkg', 'a.py'), 'def foo():\n    pass\n', verbose=False)
+        >>> ut.writeto(join(dpath, 'pkg', 'b.py'), 'def bar():\n    foo()\n', verbose=False)
+        >>> ut.writeto(join(dpath, 'notes.txt'), 'foo bar\n', verbose=False)
+        >>> cache_dpath = ut.ensuredir(join(dpath, '_cache'))
+        >>> index = ProjectIndex.load(join(dpath, 'pkg'), cache_dpath)
+        >>> def show(result):
+        >>>     print(sorted([(basename(fpath), lxs)
+        >>>                   for fpath, lxs in zip(result[0], result[2])]))
+        >>> show(index.grep([r'foo\('], include_patterns=['*.py']))
+        [('a.py', [0]), ('b.py', [1])]
+        >>> index.save()
+        >>> # Later queries only re-index files that changed
+        >>> ut.writeto(join(dpath, 'pkg', 'c.py'), 'x = 1\nfoo()\n', verbose=False)
+        >>> index = ProjectIndex.load(join(dpath, 'pkg'), cache_dpath)
+        >>> assert len(index.files) == 2
+        >>> result = index.grep([r'foo\('], include_patterns=['*.py'])
+        >>> show(result)
+        [('a.py', [0]), ('b.py', [1]), ('c.py', [1])]
+        >>> assert result == ut.grep([r'foo\('], dpath_list=[join(dpath, 'pkg')],
+        >>>                          include_patterns=['*.py'], verbose=False)
+        >>> # unicode-aware patterns give the same results as ut.grep
+        >>> ut.writeto(join(dpath, 'pkg', 'd.txt'), u'# caf\xe9 ok\n', verbose=False)
+        >>> for pat in [r'caf\w', u'caf\xe9 ok', r'(?i)CAF']:
+        >>>     assert index.grep([pat]) == ut.grep(
+        >>>         [pat], dpath_list=[join(dpath, 'pkg')], verbose=False)
+        >>> print([basename(p) for p in sorted(index.glob('*.py'))])
+        ['a.py', 'b.py', 'c.py']
+        >>> ut.delete(dpath, verbose=False)
+    """
+    version = 2
+
+    def __init__(self, dpath, cache_dpath=None):
+        from utool import util_path
+        self.dpath = dpath
+        self.cache_dpath = cache_dpath
+        self._truepath = util_path.truepath(dpath)
+        # reldir -> (mtime_ns, dnames, symlink dnames, fnames)
+        self.dirs = {}
+        # relpath -> (mtime_ns, size, is_binary, file id or None)
+        self.files = {}
+        self.next_id = 0
+        # postings in CSR form: the ids of the files containing trigrams[i]
+        # are fids[offsets[i]:offsets[i + 1]]. Trigrams in the sorted common
+        # array have no postings.
+        self.postings = None
+        self._pending = []
+        self._npending = 0
+        self._stale_postings = False
+        self._dirty = False
+
+    def __nice__(self):
+        return '%r, %d dirs, %d files' % (self.dpath, len(self.dirs),
+                                          len(self.files))
+
+    @property
+    def fpath(self):
+        """ path of the saved index """
+        import hashlib
+        from utool import util_cplat
+        cache_dpath = self.cache_dpath
+        if cache_dpath is None:
+            cache_dpath = util_cplat.ensure_app_cache_dir('utool',
+                                                          'project_index')
+        hashid = hashlib.sha1(self._truepath.encode('utf8')).hexdigest()[:16]
+        fname = '%s_%s.pkl' % (basename(self._truepath), hashid)
+        return join(cache_dpath, fname)
+
+    @classmethod
+    def load(cls, dpath, cache_dpath=None):
+        """
+        Loads the saved index of a directory or starts a new one
+        """
+        from utool import util_io
+        self = cls(dpath, cache_dpath)
+        fpath = self.fpath
+        if os.path.exists(fpath):
+            try:
+                data = util_io.load_data(fpath, verbose=False)
+            except Exception as ex:
+                print('[ProjectIndex] discarding unreadable index %r: %r' % (
+                    fpath, ex))
+            else:
+                if (data.get('version') == self.version and
+                        data.get('truepath') == self._truepath):
+                    self.dirs = data['dirs']
+                    self.files = data['files']
+                    self.next_id = data['next_id']
+                    self.postings = data['postings']
+        return self
+
+    def save(self):
+        """
+        Writes the index to disk if it changed
+        """
+        from utool import util_io
+        if self._dirty:
+            self._merge_postings()
+            data = {
+                'version': self.version,
+                'truepath': self._truepath,
+                'dirs': self.dirs,
+                'files': self.files,
+                'next_id': self.next_id,
+                'postings': self.postings,
+            }
+            util_io.save_data(self.fpath, data, verbose=False)
+            self._dirty = False
+
+    def _stamp(self, stat):
+        # Timestamps that may still change within the same tick are not
+        # trusted, so the entry is refreshed by the next query.
+        if stat.st_mtime >= time.time() - _INDEX_RACY_SECONDS:
+            return None
+        return stat.st_mtime_ns
+
+    def _forget(self, reldir, names):
+        # ids of removed files are dropped from the postings at the next merge
+        for name in names:
+            relpath_ = join(reldir, name) if reldir else name
+            if self.files.pop(relpath_, None) is not None:
+                self._stale_postings = True
+            if self.dirs.pop(relpath_, None) is not None:
+                prefix = relpath_ + os.sep
+                for key in [key for key in self.dirs if key.startswith(prefix)]:
+                    del self.dirs[key]
+                for key in [key for key in self.files if key.startswith(prefix)]:
+                    del self.files[key]
+                    self._stale_postings = True
+
+    def _listdir(self, reldir, root):
+        try:
+            stat = os.stat(root)
+        except OSError:
+            return None
+        entry = self.dirs.get(reldir, None)
+        if entry is not None and entry[0] is not None:
+            if entry[0] == stat.st_mtime_ns:
+                return entry[1:]
+        dnames, link_dnames, fnames = [], set(), []
+        try:
+            with os.scandir(root) as iter_:
+                for dir_entry in iter_:
+                    try:
+                        is_dir = dir_entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        dnames.append(dir_entry.name)
+                        if dir_entry.is_symlink():
+                            link_dnames.add(dir_entry.name)
+                    else:
+                        fnames.append(dir_entry.name)
+        except OSError:
+            return None
+        if entry is not None:
+            self._forget(reldir, set(entry[1]) - set(dnames))
+            self._forget(reldir, set(entry[3]) - set(fnames))
+        self.dirs[reldir] = (self._stamp(stat), dnames, link_dnames, fnames)
+        self._dirty = True
+        return dnames, link_dnames, fnames
+
+    def _walk(self, base, reldir=''):
+        root = join(base, reldir) if reldir else base
+        listing = self._listdir(reldir, root)
+        if listing is None:
+            return
+        dnames, link_dnames, fnames = listing
+        dnames = list(dnames)
+        yield reldir, root, dnames, list(fnames)
+        for dname in dnames:
+            # like os.walk, symlinked directories are listed but not entered
+            if dname not in link_dnames:
+                subdir = join(reldir, dname) if reldir else dname
+                for item in self._walk(base, subdir):
+                    yield item
+
+    def walk(self):
+        """
+        Cached equivalent of ``os.walk(self.dpath)``. Removing names from
+        the yielded directory list prunes the walk.
+
+        Yields:
+            tuple: (root, dnames, fnames)
+        """
+        for reldir, root, dnames, fnames in self._walk(self.dpath):
+            yield root, dnames, fnames
+
+    def _file_entry(self, relpath_, fpath):
+        try:
+            stat = os.stat(fpath)
+        except OSError:
+            return None
+        entry = self.files.get(relpath_, None)
+        if (entry is not None and entry[0] is not None and
+                entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size):
+            return entry
+        from utool import util_type
+        try:
+            with open(fpath, 'rb') as file_:
+                data = file_.read()
+        except (IOError, OSError):
+            return None
+        is_binary = b'\x00' in data[:_INDEX_BINARY_CHECK_BYTES]
+        fid = None
+        if not is_binary and util_type.HAVE_NUMPY:
+            # a changed file gets a new id, its old id is dropped when merged
+            fid = self.next_id
+            self.next_id += 1
+            codes = _trigram_codes(data)
+            self._pending.append((fid, codes))
+            self._npending += len(codes)
+        if entry is not None:
+            self._stale_postings = True
+        entry = (self._stamp(stat), stat.st_size, is_binary, fid)
+        self.files[relpath_] = entry
+        self._dirty = True
+        if self._npending > _INDEX_MAX_PENDING:
+            self._merge_postings()
+        return entry
+
+    def _merge_postings(self):
+        """
+        Merges the trigrams of newly indexed files into the postings, drops
+        the ids of removed files and the postings of common trigrams.
+        """
+        if len(self._pending) == 0 and not self._stale_postings:
+            return
+        import numpy as np
+        postings = self.postings
+        if postings is None:
+            postings = {
+                'trigrams': np.empty(0, dtype=np.uint32),
+                'offsets': np.zeros(1, dtype=np.int64),
+                'fids': np.empty(0, dtype=np.uint32),
+                'common': np.empty(0, dtype=np.uint32),
+            }
+        common = postings['common']
+        codes = np.concatenate(
+            [np.repeat(postings['trigrams'], np.diff(postings['offsets']))] +
+            [codes_ for fid, codes_ in self._pending])
+        fids = np.concatenate(
+            [postings['fids']] +
+            [np.full(len(codes_), fid, dtype=np.uint32)
+             for fid, codes_ in self._pending])
+        self._pending = []
+        self._npending = 0
+        self._stale_postings = False
+        live = np.array([entry[3] for entry in self.files.values()
+                         if entry[3] is not None], dtype=np.int64)
+        isalive = np.zeros(self.next_id, dtype=bool)
+        isalive[live] = True
+        keep = isalive[fids] & ~np.isin(codes, common)
+        codes, fids = codes[keep], fids[keep]
+        if self.next_id > 2 * len(live) + 1024:
+            # renumber the files so ids stay dense
+            new_ids = (np.cumsum(isalive) - 1).astype(np.uint32)
+            fids = new_ids[fids]
+            for relpath_, entry in self.files.items():
+                if entry[3] is not None:
+                    self.files[relpath_] = entry[:3] + (int(new_ids[entry[3]]),)
+            self.next_id = len(live)
+        order = np.lexsort((fids, codes))
+        codes, fids = codes[order], fids[order]
+        trigrams, counts = np.unique(codes, return_counts=True)
+        max_count = max(_INDEX_COMMON_MIN_FILES,
+                        _INDEX_COMMON_FRACTION * len(live))
+        iscommon = counts > max_count
+        if np.any(iscommon):
+            common = np.union1d(common, trigrams[iscommon])
+            fids = fids[~np.repeat(iscommon, counts)]
+            trigrams, counts = trigrams[~iscommon], counts[~iscommon]
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        self.postings = {
+            'trigrams': trigrams,
+            'offsets': offsets,
+            'fids': fids,
+            'common': common,
+        }
+        self._dirty = True
+
+    def _candidate_fids(self, required_list):
+        """
+        Returns the ids of the files that contain all required trigrams of
+        at least one pattern, or None if every file could match.
+        """
+        import numpy as np
+        self._merge_postings()
+        postings = self.postings
+        if postings is None:
+            return set()
+        trigrams = postings['trigrams']
+        offsets = postings['offsets']
+        candidates = set()
+        for required in required_list:
+            required = np.setdiff1d(required, postings['common'])
+            if len(required) == 0:
+                return None
+            idxs = np.searchsorted(trigrams, required)
+            idxs[idxs == len(trigrams)] = 0
+            if len(trigrams) == 0 or not np.all(trigrams[idxs] == required):
+                # some required trigram is in no file
+                continue
+            # intersect the shortest postings first
+            counts = offsets[idxs + 1] - offsets[idxs]
+            fids = None
+            for idx in idxs[np.argsort(counts)]:
+                post = postings['fids'][offsets[idx]:offsets[idx + 1]]
+                if fids is None:
+                    fids = post
+                else:
+                    fids = np.intersect1d(fids, post, assume_unique=True)
+                if len(fids) == 0:
+                    break
+            candidates.update(fids.tolist())
+        return candidates
+
+    def matching_fpaths(self, include_patterns, exclude_dirs=[],
+                        greater_exclude_dirs=[], exclude_patterns=[],
+                        recursive=True):
+        """
+        Cached equivalent of :func:`utool.matching_fpaths` for this project
+        """
+        from utool import util_path
+        include_match = util_path._compile_glob_patterns(include_patterns)
+        exclude_match = util_path._compile_glob_patterns(exclude_patterns)
+        greater_exclude_dirs = set(greater_exclude_dirs)
+        for reldir, root, dnames, fnames in self._walk(self.dpath):
+            if greater_exclude_dirs:
+                dnames[:] = [dname for dname in dnames
+                             if dname not in greater_exclude_dirs]
+            if basename(root) in exclude_dirs:
+                continue
+            for name in fnames:
+                if include_match(name) and not exclude_match(name):
+                    relpath_ = join(reldir, name) if reldir else name
+                    yield relpath_, join(root, name)
+            if not recursive:
+                break
+
+    def grep(self, regex_list, include_patterns=None, exclude_dirs=[],
+             greater_exclude_dirs=None, exclude_patterns=[], recursive=True,
+             reflags=0, inverse=False, nprocs=None, verbose=False):
+        r"""
+        Indexed equivalent of :func:`utool.grep` for this project. Files
+        that cannot match are skipped without being read.
+
+        Returns:
+            (list, list, list): (found_fpaths, found_lines_list, found_lxs_list)
+        """
+        from utool import util_path
+        from utool import util_regex
+        if isinstance(regex_list, six.string_types):
+            regex_list = [regex_list]
+        if include_patterns is None:
+            include_patterns = ['*']
+        if isinstance(include_patterns, six.string_types):
+            include_patterns = [include_patterns]
+        if greater_exclude_dirs is None:
+            greater_exclude_dirs = []
+        # trigram codes that must all be in a file for a pattern to match
+        from utool import util_type
+        if util_type.HAVE_NUMPY:
+            import numpy as np
+        required_list = []
+        for regexpr in regex_list if util_type.HAVE_NUMPY else []:
+            extended, flags = util_regex.extend_regex2(regexpr, reflags)
+            codes = set()
+            for literal in _required_literals(extended, flags):
+                # grep decodes invalid utf8 as U+FFFD, which is not in the
+                # raw bytes of the file
+                for part in literal.split(u'\ufffd'):
+                    part = part.encode('utf8')
+                    if len(part) >= 3:
+                        codes.update(_trigram_codes(part).tolist())
+            required_list.append(np.array(sorted(codes), dtype=np.uint32))
+        can_filter = (not inverse and len(required_list) > 0 and
+                      all(len(required) > 0 for required in required_list))
+        candidate_list = []
+        for relpath_, fpath in self.matching_fpaths(
+                include_patterns, exclude_dirs, greater_exclude_dirs,
+                exclude_patterns, recursive):
+            if can_filter:
+                entry = self._file_entry(relpath_, fpath)
+                if entry is None or entry[2]:
+                    continue
+            candidate_list.append((relpath_, fpath))
+        if can_filter:
+            candidate_fids = self._candidate_fids(required_list)
+            if candidate_fids is not None:
+                # file ids are looked up after the merge, which may renumber
+                candidate_list = [
+                    (relpath_, fpath) for relpath_, fpath in candidate_list
+                    if self.files[relpath_][3] is None or
+                    self.files[relpath_][3] in candidate_fids]
+        fpath_list = [fpath for relpath_, fpath in candidate_list]
+        return util_path.grep(regex_list, fpath_list=fpath_list,
+                              reflags=reflags, inverse=inverse, nprocs=nprocs,
+                              verbose=verbose)
+
+    def glob(self, pattern, recursive=False, with_files=True, with_dirs=True,
+             exclude_dirs=[]):
+        """
+        Cached equivalent of :func:`utool.glob` for this project
+        """
+        if isinstance(pattern, list):
+            return [path for pat in pattern
+                    for path in self.glob(pat, recursive, with_files,
+                                          with_dirs, exclude_dirs)]
+        dpath_ = self._truepath
+        path_list = []
+        for reldir, root, dnames, fnames in self._walk(dpath_):
+            if len(exclude_dirs) > 0:
+                rel_root = reldir if reldir else '.'
+                rel_root2 = join(basename(dpath_), reldir)
+                dnames[:] = [
+                    d for d in dnames
+                    if normpath(join(rel_root, d)) not in exclude_dirs and
+                    normpath(join(rel_root2, d)) not in exclude_dirs and
+                    normpath(join(root, d)) not in exclude_dirs]
+            if with_files:
+                for fname in fnmatch.filter(fnames, pattern):
+                    path_list.append(join(root, fname))
+            if with_dirs:
+                for dname in fnmatch.filter(dnames, pattern):
+                    path_list.append(join(root, dname))
+            if not recursive:
+                break
+        return path_list
+
+
+def _grep_project_indexes(regex_list, dpath_list=None, cache_dpath=None,
+                          **kwargs):
+    """
+    Greps several projects through their :class:`ProjectIndex`
+    """
+    if dpath_list is None:
+        dpath_list = [os.getcwd()]
+    found_fpath_list = []
+    found_lines_list = []
+    found_lxs_list = []
+    for dpath in dpath_list:
+        index = ProjectIndex.load(dpath, cache_dpath)
+        result = index.grep(regex_list, **kwargs)
+        index.save()
+        found_fpath_list.extend(result[0])
+        found_lines_list.extend(result[1])
+        found_lxs_list.extend(result[2])
+    return found_fpath_list, found_lines_list, found_lxs_list
+
+
 class GrepResult(util_dev.NiceRepr):
     def __init__(self, found_fpath_list, found_lines_list,
                  found_lxs_list, extended_regex_list, reflags):
@@ -899,11 +1491,13 @@ def sed_projects(regexpr, repl, force=False, recursive=True, user_profile=None,
     print(' * force: %r' % (force,))
 
     # Walk through each directory recursively
-    for fpath in ut.matching_fpaths(sedkw['dpath_list'],
-                                    sedkw['include_patterns'],
-                                    sedkw['exclude_dirs'],
-                                    recursive=recursive):
-        ut.sedfile(fpath, regexpr, repl, force)
+    fpath_list = list(ut.matching_fpaths(sedkw['dpath_list'],
+                                         sedkw['include_patterns'],
+                                         sedkw['exclude_dirs'],
+                                         recursive=recursive))
+    # All edits are computed first and written as one transaction. Like
+    # sedfile, regexpr is used as given (sed would extend it).
+    ut.util_path._sed_fpaths(fpath_list, regexpr, repl, force, verbose=True)
 
 
 #def extend_regex(regexpr):
@@ -9,11 +9,15 @@ References:
 
 """
 from __future__ import absolute_import, division, print_function
+import os
 import sys
 import six
 import time
+import functools
+import threading
 import calendar
 import datetime
+from collections import OrderedDict, deque
 from utool import util_inject
 from utool import util_cplat
 from utool import util_arg
@@ -153,6 +157,9 @@ class Timer(object):
     """
     Timer with-statment context object.
 
+    When the global :data:`SPAN_TRACER` is enabled the block is also recorded
+    as a span named by ``msg``.
+
     Example:
         >>> # ENABLE_DOCTEST
         >>> import utool as ut
@@ -167,6 +174,7 @@ class Timer(object):
         self.newline = newline
         self.tstart = -1
         self.ellapsed = -1
+        self._span = _NULL_SPAN
 
     def tic(self):
         if self.verbose:
@@ -188,11 +196,15 @@ class Timer(object):
     stop = toc
 
     def __enter__(self):
+        if SPAN_TRACER.enabled:
+            self._span = Span(SPAN_TRACER, str(self.msg)).__enter__()
         self.tic()
         return self
 
     def __exit__(self, type_, value, trace):
         self.ellapsed = self.toc()
+        self._span.__exit__(type_, value, trace)
+        self._span = _NULL_SPAN
         if trace is not None:
             return False  # return a falsey value on error
 
@@ -280,6 +292,314 @@ class Timerit(RealTimerit):
         self.print(verbose=verbose)
 
 
+class Span(object):
+    """
+    A single timed region recorded by a :class:`SpanTracer`.
+
+    Use :func:`SpanTracer.span` to create these. Like :class:`Timer` the
+    ellapsed time is available after the block exits.
+    """
+    __slots__ = ('tracer', 'name', 'path', 'tstart', 'ellapsed')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.path = None
+        self.tstart = None
+        self.ellapsed = -1
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        stack.append(self.name)
+        self.path = tuple(stack)
+        self.tstart = time.perf_counter()
+        return self
+
+    def __exit__(self, type_, value, trace):
+        tend = time.perf_counter()
+        self.ellapsed = tend - self.tstart
+        tracer = self.tracer
+        tracer._stack().pop()
+        tracer.records.append((self.path, self.tstart, tend,
+                               threading.get_ident(), os.getpid()))
+        return False
+
+
+class _NullSpan(object):
+    """ shared no-op span returned when tracing is disabled """
+    __slots__ = ()
+    ellapsed = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value, trace):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class SpanTracer(object):
+    """
+    Lightweight hierarchical wall-clock tracer.
+
+    Spans opened inside other spans on the same thread are nested under them.
+    Each finished span is recorded with its thread and process id. When the
+    tracer is disabled :func:`span` returns a shared no-op object and the
+    :func:`trace` decorator calls the function directly, so instrumentation
+    can stay in production code.
+
+    The module level :data:`SPAN_TRACER` is enabled with ``--trace-spans`` and
+    is used by :func:`span`, :func:`traced` and :class:`Timer`. Its
+    maxlen is set with ``--trace-spans-maxlen``.
+
+    Only the most recent ``maxlen`` spans are kept, so tracing a long running
+    process or a tight loop uses bounded memory. Older spans are dropped and
+    no longer count towards :func:`aggregate`. Export or :func:`clear` the
+    records periodically to keep everything.
+
+    Args:
+        enabled (bool): if False nothing is recorded
+        maxlen (int): number of spans to keep. None keeps all of them.
+
+    CommandLine:
+        python -m utool.util_time SpanTracer
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_time import *  # NOQA
+        >>> tracer = SpanTracer()
+        >>> @tracer.trace('inner')
+        >>> def inner():
+        >>>     time.sleep(0.001)
+        >>> with tracer.span('outer'):
+        >>>     inner()
+        >>>     inner()
+        >>> agg = tracer.aggregate()
+        >>> print(list(agg.keys()))
+        [('outer',), ('outer', 'inner')]
+        >>> print(agg[('outer', 'inner')]['count'])
+        2
+        >>> outer = agg[('outer',)]
+        >>> assert outer['self'] < outer['total']
+        >>> print(tracer.to_folded().splitlines()[1].split(' ')[0])
+        outer;inner
+        >>> events = tracer.to_chrome_trace()['traceEvents']
+        >>> print(sorted(ev['name'] for ev in events))
+        ['inner', 'inner', 'outer']
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_time import *  # NOQA
+        >>> tracer = SpanTracer(enabled=False)
+        >>> with tracer.span('noop') as sp:
+        >>>     pass
+        >>> assert len(tracer.records) == 0 and sp.ellapsed == -1
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_time import *  # NOQA
+        >>> tracer = SpanTracer(maxlen=3)
+        >>> for idx in range(5):
+        >>>     with tracer.span('loop%d' % idx):
+        >>>         pass
+        >>> print([path for path, *_ in tracer.records])
+        [('loop2',), ('loop3',), ('loop4',)]
+    """
+    def __init__(self, enabled=True, maxlen=int(1E6)):
+        self.enabled = enabled
+        self.maxlen = maxlen
+        self.records = deque(maxlen=maxlen)
+        self._local = threading.local()
+
+    def _stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+            return stack
+
+    def span(self, name):
+        """
+        Returns a context manager timing the enclosed block as ``name``.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name)
+
+    def trace(self, name=None):
+        """
+        Decorator recording each call of the function as a span.
+
+        Args:
+            name (str): defaults to the function's qualified name
+        """
+        def _decor(func):
+            spanname = func.__qualname__ if name is None else name
+
+            @functools.wraps(func)
+            def _traced(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, spanname):
+                    return func(*args, **kwargs)
+            return _traced
+        if callable(name):
+            func, name = name, None
+            return _decor(func)
+        return _decor
+
+    def clear(self):
+        """ forgets all recorded spans """
+        self.records = deque(maxlen=self.maxlen)
+
+    def aggregate(self):
+        """
+        Aggregates recorded spans by their path.
+
+        Returns:
+            OrderedDict: maps a path tuple to a dict with ``total`` (seconds
+                spent in the span), ``self`` (total minus time spent in
+                direct children) and ``count``. Paths are in sorted order.
+        """
+        agg = {}
+        for path, tstart, tend, tid, pid in self.records:
+            dur = tend - tstart
+            try:
+                entry = agg[path]
+            except KeyError:
+                entry = agg[path] = {'total': 0.0, 'self': 0.0, 'count': 0}
+            entry['total'] += dur
+            entry['self'] += dur
+            entry['count'] += 1
+        for path, entry in agg.items():
+            parent = agg.get(path[:-1], None)
+            if parent is not None:
+                parent['self'] -= entry['total']
+        return OrderedDict(sorted(agg.items()))
+
+    def to_folded(self, unit='us'):
+        """
+        Returns the aggregated self times in the folded stack format used by
+        flamegraph.pl and speedscope (one ``a;b;c <value>`` line per path).
+
+        Args:
+            unit (str): one of 's', 'ms', 'us', 'ns'
+        """
+        mult = {'s': 1, 'ms': 1E3, 'us': 1E6, 'ns': 1E9}[unit]
+        lines = ['%s %d' % (';'.join(path), int(round(entry['self'] * mult)))
+                 for path, entry in self.aggregate().items()]
+        return '\n'.join(lines)
+
+    def to_chrome_trace(self):
+        """
+        Returns the recorded spans as Chrome trace event JSON data, which can
+        be opened in chrome://tracing or Perfetto.
+        """
+        events = [{
+            'name': path[-1],
+            'cat': ';'.join(path[:-1]),
+            'ph': 'X',
+            'ts': tstart * 1E6,
+            'dur': (tend - tstart) * 1E6,
+            'pid': pid,
+            'tid': tid,
+        } for path, tstart, tend, tid, pid in self.records]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump_folded(self, fpath, unit='us'):
+        """ writes :func:`to_folded` to a file """
+        from utool import util_io
+        util_io.write_to(fpath, self.to_folded(unit=unit) + '\n')
+
+    def dump_chrome_trace(self, fpath):
+        """ writes :func:`to_chrome_trace` to a json file """
+        import json
+        from utool import util_io
+        util_io.write_to(fpath, json.dumps(self.to_chrome_trace()))
+
+
+#: Global tracer, enable with --trace-spans or ``SPAN_TRACER.enabled = True``
+SPAN_TRACER = SpanTracer(
+    enabled=util_arg.get_argflag('--trace-spans'),
+    maxlen=util_arg.get_argval('--trace-spans-maxlen', type_=int,
+                               default=int(1E6)))
+
+
+def span(name):
+    """
+    Times the enclosed block as ``name`` in the global :data:`SPAN_TRACER`.
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> import utool as ut
+        >>> with ut.span('work'):
+        >>>     pass
+    """
+    if not SPAN_TRACER.enabled:
+        return _NULL_SPAN
+    return Span(SPAN_TRACER, name)
+
+
+def traced(name=None):
+    """
+    Decorator recording calls in the global :data:`SPAN_TRACER`.
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> import utool as ut
+        >>> @ut.traced
+        >>> def work():
+        >>>     return 1
+        >>> assert work() == 1
+    """
+    return SPAN_TRACER.trace(name)
+
+
+def _build_timestamp_format_regexes():
+    year_regex  = r'(\d\d)?\d\d'
+    month_regex = '[0-1]?[0-9]'
+    day_regex   = '[0-3]?[0-9]'
+
+    time_regex = r'[0-6]?[0-9]:[0-6]?[0-9]:[0-6]?[0-9]'
+
+    #odd_time_regex = r'[0-6]?[0-9]:[0-6]?[0-9]:[0-6 ]?[0-9]'
+
+    date_regex1 = '/'.join([year_regex, month_regex, day_regex])
+    date_regex2 = ':'.join([year_regex, month_regex, day_regex])
+    date_regex3 = '-'.join([year_regex, month_regex, day_regex])
+    datetime_regex1 = date_regex1 + ' ' + time_regex
+    datetime_regex2 = date_regex2 + ' ' + time_regex
+    datetime_regex3 = date_regex3 + 'T' + time_regex  # + r'\+[0-2]?[0-9]?[0-6]?[0-9]'
+    datetime_regex4 = time_regex + ' ' + date_regex2 + ' 1'
+    return [
+        (datetime_regex1, '%Y/%m/%d %H:%M:%S'),
+        (datetime_regex2, '%Y:%m:%d %H:%M:%S'),
+        # timefmt = '%Y-%m-%dT%H:%M:%S%z'
+        (datetime_regex3, '%Y-%m-%dT%H:%M:%S'),
+        (datetime_regex4, '%H:%M:%S %Y:%m:%d 1'),
+    ]
+
+
+#: (regex, strptime format) pairs tried in order by determine_timestamp_format
+_TIMESTAMP_FORMAT_REGEXES = _build_timestamp_format_regexes()
+
+
+def _clean_timestamp_str(datetime_str, warn=True):
+    clean_datetime_str = datetime_str.replace('\x00', ' ').strip(';').strip()
+    if len(clean_datetime_str) == 25 and 'T' in clean_datetime_str:
+        # Delete last colon from ISO 8601 format
+        # clean_datetime_str = clean_datetime_str[:-3] + clean_datetime_str[-2:]
+        if True or six.PY2:
+            if warn:
+                print('WARNING: Python 2.7 does not support %z directive '
+                      'in strptime, ignoring timezone in parsing: ' +
+                      clean_datetime_str)
+            clean_datetime_str = clean_datetime_str[:-6]
+    return clean_datetime_str
+
+
 def determine_timestamp_format(datetime_str, warn=True):
     r"""
     Args:
@@ -313,49 +633,17 @@ def determine_timestamp_format(datetime_str, warn=True):
     """
     import re
     # try to determine the format
-    clean_datetime_str = datetime_str.replace('\x00', ' ').strip(';').strip()
-    if len(clean_datetime_str) == 25 and 'T' in clean_datetime_str:
-        # Delete last colon from ISO 8601 format
-        # clean_datetime_str = clean_datetime_str[:-3] + clean_datetime_str[-2:]
-        if True or six.PY2:
-            if warn:
-                print('WARNING: Python 2.7 does not support %z directive '
-                      'in strptime, ignoring timezone in parsing: ' +
-                      clean_datetime_str)
-            clean_datetime_str = clean_datetime_str[:-6]
-
-    year_regex  = r'(\d\d)?\d\d'
-    month_regex = '[0-1]?[0-9]'
-    day_regex   = '[0-3]?[0-9]'
-
-    time_regex = r'[0-6]?[0-9]:[0-6]?[0-9]:[0-6]?[0-9]'
-
-    #odd_time_regex = r'[0-6]?[0-9]:[0-6]?[0-9]:[0-6 ]?[0-9]'
-
-    date_regex1 = '/'.join([year_regex, month_regex, day_regex])
-    date_regex2 = ':'.join([year_regex, month_regex, day_regex])
-    date_regex3 = '-'.join([year_regex, month_regex, day_regex])
-    datetime_regex1 = date_regex1 + ' ' + time_regex
-    datetime_regex2 = date_regex2 + ' ' + time_regex
-    datetime_regex3 = date_regex3 + 'T' + time_regex  # + r'\+[0-2]?[0-9]?[0-6]?[0-9]'
-    datetime_regex4 = time_regex + ' ' + date_regex2 + ' 1'
+    clean_datetime_str = _clean_timestamp_str(datetime_str, warn=warn)
 
     timefmt = None
-
-    if re.match(datetime_regex1, clean_datetime_str):
-        timefmt = '%Y/%m/%d %H:%M:%S'
-    elif re.match(datetime_regex2, clean_datetime_str):
-        timefmt = '%Y:%m:%d %H:%M:%S'
-    elif re.match(datetime_regex3, clean_datetime_str):
-        # timefmt = '%Y-%m-%dT%H:%M:%S%z'
-        timefmt = '%Y-%m-%dT%H:%M:%S'
-    elif re.match(datetime_regex4, clean_datetime_str):
-        # timefmt = '%Y-%m-%dT%H:%M:%S%z'
-        timefmt = '%H:%M:%S %Y:%m:%d 1'
+    for datetime_regex, candidate_fmt in _TIMESTAMP_FORMAT_REGEXES:
+        if re.match(datetime_regex, clean_datetime_str):
+            timefmt = candidate_fmt
+            break
     # Just dont accept this bad format
     #elif re.match(datetime_regex3, clean_datetime_str):
     #    timefmt = '%Y:%m:%d %H:%M: %S'
-    else:
+    if timefmt is None:
         if isinstance(clean_datetime_str, six.string_types):
             if len(clean_datetime_str.strip()) == 0:
                 return None
@@ -665,6 +953,260 @@ def exiftime_to_unixtime(datetime_str, timestamp_format=None, strict=None):
             return invalid_value
 
 
+_DIGIT_TO_ONE = {ord(c): '1' for c in '0123456789'}
+
+_STRPTIME_FIELD_WIDTH = {'Y': r'(\d{4})', 'm': r'(\d{1,2})', 'd': r'(\d{1,2})',
+                         'H': r'(\d{1,2})', 'M': r'(\d{1,2})', 'S': r'(\d{1,2})'}
+
+
+def _exiftime_clean_bounds(datetime_str):
+    """
+    Returns (lo, hi, cleaned) where cleaned is the string that
+    :func:`exiftime_to_unixtime` passes to strptime and ``datetime_str[lo:hi]``
+    is the same string before nulls are replaced (which only happens for 20
+    character strings).
+    """
+    lo, hi = 0, len(datetime_str)
+    if hi == 20 and '\x00' in datetime_str:
+        text = datetime_str.replace('\x00', ' ')
+    elif hi > 19:
+        text, hi = datetime_str, 19
+    else:
+        return lo, hi, datetime_str
+    while lo < hi and text[lo] == ';':
+        lo += 1
+    while hi > lo and text[hi - 1] == ';':
+        hi -= 1
+    while lo < hi and text[lo].isspace():
+        lo += 1
+    while hi > lo and text[hi - 1].isspace():
+        hi -= 1
+    return lo, hi, text[lo:hi]
+
+
+def _matching_timestamp_formats(datetime_str):
+    """
+    Returns every format whose determine_timestamp_format regex matches
+    datetime_str, in order of precedence.
+    """
+    import re
+    clean_datetime_str = _clean_timestamp_str(datetime_str, warn=False)
+    return [timefmt for datetime_regex, timefmt in _TIMESTAMP_FORMAT_REGEXES
+            if re.match(datetime_regex, clean_datetime_str)]
+
+
+def _exiftime_layout_spans(signature, timefmt):
+    """
+    Finds the position of each date field in strings with the given layout.
+
+    Args:
+        signature (str): a string of the layout with all digits set to '1'
+        timefmt (str): strptime format
+
+    Returns:
+        dict or None: maps each directive in YmdHMS to a (start, stop) span,
+            or None if the layout cannot be parsed positionally.
+    """
+    import re
+    lo, hi, cleaned = _exiftime_clean_bounds(signature)
+    parts = re.split('(%.)', timefmt)
+    pattern = []
+    directives = []
+    prev_is_field = False
+    for part in parts:
+        if part.startswith('%') and len(part) == 2:
+            code = part[1]
+            if code not in _STRPTIME_FIELD_WIDTH or prev_is_field:
+                # Unsupported directive or ambiguous adjacent fields
+                return None
+            pattern.append(_STRPTIME_FIELD_WIDTH[code])
+            directives.append(code)
+            prev_is_field = True
+        elif part:
+            # strptime treats any whitespace in the format as \s+
+            literal = re.sub(r'\\\s+|\s+', r'\\s+', re.escape(part))
+            pattern.append(literal)
+            prev_is_field = False
+    if sorted(directives) != sorted('YmdHMS'):
+        return None
+    match = re.match(''.join(pattern) + r'\Z', cleaned, flags=re.IGNORECASE)
+    if match is None:
+        return None
+    spans = {code: (lo + match.start(idx + 1), lo + match.end(idx + 1))
+             for idx, code in enumerate(directives)}
+    return spans
+
+
+def _exiftime_parse_group(str_list, spans):
+    """
+    Positionally parses equal layout strings into unixtimes, -1 if invalid.
+    """
+    import numpy as np
+    width = len(str_list[0])
+    buf = ''.join(str_list).encode('ascii')
+    mat = np.frombuffer(buf, dtype=np.uint8).reshape(len(str_list), width)
+
+    def _field(code):
+        start, stop = spans[code]
+        digits = mat[:, start:stop].astype(np.int64) - 48
+        value = digits[:, 0]
+        for col in range(1, stop - start):
+            value = value * 10 + digits[:, col]
+        return value
+
+    Y, m, d = _field('Y'), _field('m'), _field('d')
+    H, M, S = _field('H'), _field('M'), _field('S')
+    # Days from the civil calendar (proleptic Gregorian)
+    leap = ((Y % 4 == 0) & (Y % 100 != 0)) | (Y % 400 == 0)
+    month_days = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    m_ = np.clip(m, 0, 12)
+    dim = month_days[m_] + (leap & (m_ == 2))
+    valid = ((Y >= 1) & (m >= 1) & (m <= 12) & (d >= 1) & (d <= dim) &
+             (H <= 23) & (M <= 59) & (S <= 59))
+    y = Y - (m <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (m + np.where(m > 2, -3, 9)) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    days = era * 146097 + doe - 719468
+    unixtime = (days * 86400 + H * 3600 + M * 60 + S).astype(np.float64)
+    unixtime[~valid] = -1
+    return unixtime, valid
+
+
+def exiftimes_to_unixtimes(datetime_strs, timestamp_format=None, strict=None):
+    r"""
+    Batch version of :func:`exiftime_to_unixtime`.
+
+    Strings are grouped by their layout (the string with every digit
+    replaced), the format is determined once per layout, and each group is
+    parsed positionally with integer arithmetic in numpy. Layouts that
+    cannot be parsed positionally fall back to the scalar function, so the
+    results are the same as calling :func:`exiftime_to_unixtime` on each
+    item.
+
+    Args:
+        datetime_strs (list): datetime strings, None or -1
+        timestamp_format (int or str): same as :func:`exiftime_to_unixtime`
+        strict (bool): if True raises on unparsable non-sentinel values
+
+    Returns:
+        ndarray: float64 unixtimes. Invalid values are -1 and None is nan.
+
+    CommandLine:
+        python -m utool.util_time exiftimes_to_unixtimes
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_time import *  # NOQA
+        >>> datetime_strs = [
+        >>>     '2015:04:01 00:00:00', '0000:00:00 00:00:00',
+        >>>     '2005-10-27T14:35:20+02:00', '6:35:01\x002006:03:19 1',
+        >>>     '2016/05/03 16:34:57 EST', None, '', 'No EXIF Data',
+        >>>     '2015:02:29 00:00:00', '2016:02:29 23:59:59', -1]
+        >>> result = exiftimes_to_unixtimes(datetime_strs, strict=False)
+        >>> print(result.tolist())
+        [1427846400.0, -1.0, 1130423720.0, 1142750101.0, 1462293297.0, nan, -1.0, -1.0, -1.0, 1456790399.0, -1.0]
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_time import *  # NOQA
+        >>> import numpy as np
+        >>> import random
+        >>> rng = random.Random(0)
+        >>> datetime_strs = ['%04d:%02d:%02d %02d:%02d:%02d' % (
+        >>>     rng.randint(1900, 2100), rng.randint(1, 12), rng.randint(1, 31),
+        >>>     rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59))
+        >>>     for _ in range(1000)]
+        >>> result = exiftimes_to_unixtimes(datetime_strs, strict=False)
+        >>> import contextlib, io
+        >>> with contextlib.redirect_stdout(io.StringIO()):
+        >>>     # the scalar version reports each invalid day
+        >>>     expected = [exiftime_to_unixtime(s, strict=False)
+        >>>                 for s in datetime_strs]
+        >>> assert np.all(result == np.array(expected, dtype=np.float64))
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_time import *  # NOQA
+        >>> import contextlib, io
+        >>> # formats are detected from the digits as well as the layout
+        >>> datetime_strs = ['6:35:01\x002006:03:19 4',
+        >>>                  '2016/05/03\x0016:34:57 EST',
+        >>>                  '6:35:01\x002006:03:19 1']
+        >>> with contextlib.redirect_stdout(io.StringIO()):
+        >>>     result = exiftimes_to_unixtimes(datetime_strs, strict=False)
+        >>>     expected = [exiftime_to_unixtime(s, strict=False)
+        >>>                 for s in datetime_strs]
+        >>> print(result.tolist(), expected)
+        [-1.0, -1.0, 1142750101.0] [-1, -1, 1142750101]
+    """
+    import re
+    from utool import util_type
+    datetime_strs = list(datetime_strs)
+    if not util_type.HAVE_NUMPY:
+        return [exiftime_to_unixtime(s, timestamp_format, strict)
+                for s in datetime_strs]
+    import numpy as np
+    if strict is None:
+        strict = util_arg.SUPER_STRICT
+    if timestamp_format == 2:
+        fixed_fmt = '%m/%d/%Y %H:%M:%S'
+    elif timestamp_format == 1:
+        fixed_fmt = '%Y:%m:%d %H:%M:%S'
+    else:
+        fixed_fmt = timestamp_format
+
+    result = np.full(len(datetime_strs), np.nan, dtype=np.float64)
+    layout_to_idxs = {}
+    for idx, datetime_str in enumerate(datetime_strs):
+        if isinstance(datetime_str, six.string_types):
+            layout = datetime_str.translate(_DIGIT_TO_ONE)
+            try:
+                layout_to_idxs[layout].append(idx)
+            except KeyError:
+                layout_to_idxs[layout] = [idx]
+        elif datetime_str is None:
+            continue
+        else:
+            result[idx] = exiftime_to_unixtime(datetime_str, timestamp_format,
+                                               strict)
+
+    for layout, idxs in layout_to_idxs.items():
+        if fixed_fmt is None:
+            # Every digit class in the detection regexes contains 1, so a
+            # member can only match the regexes that its layout matches.
+            layout_fmts = _matching_timestamp_formats(layout)
+            if len(layout_fmts) == 0:
+                result[idxs] = -1
+                continue
+            timefmt = determine_timestamp_format(datetime_strs[idxs[0]])
+            # If the layout matches only this format, the digits of another
+            # member can at most make it unparsable (-1), which the
+            # positional parse detects as well.
+            digit_safe = layout_fmts == [timefmt]
+        else:
+            timefmt = fixed_fmt
+            digit_safe = True
+        spans = None
+        if (digit_safe and layout.isascii() and
+              not any(c.isdigit() for c in re.sub('%.', '', timefmt))):
+            spans = _exiftime_layout_spans(layout, timefmt)
+        if spans is None:
+            for idx in idxs:
+                result[idx] = exiftime_to_unixtime(
+                    datetime_strs[idx], timestamp_format, strict)
+            continue
+        group = [datetime_strs[idx] for idx in idxs]
+        unixtimes, valid = _exiftime_parse_group(group, spans)
+        result[idxs] = unixtimes
+        if strict and not np.all(valid):
+            # Let the scalar function raise (or accept a sentinel)
+            for pos in np.where(~valid)[0]:
+                exiftime_to_unixtime(group[pos], timestamp_format, strict)
+    return result
+
+
 def parse_timedelta_str(str_):
     r"""
     Args:
@@ -1014,8 +1556,29 @@ def get_timestats_str(unixtime_list, newlines=1, full=True, isutc=True):
 
 
 def get_timestats_dict(unixtime_list, full=True, isutc=True):
+    """
+    Args:
+        unixtime_list (list or StatsAccumulator): unixtimes, or an
+            accumulator (created with use_nan=True) that was fed a stream of
+            unixtimes too large to hold in memory.
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from utool.util_time import *  # NOQA
+        >>> import utool as ut
+        >>> unixtimes = [1427846400.0, 1427846460.0, float('nan')]
+        >>> acc = ut.StatsAccumulator(use_nan=True)
+        >>> acc.update(unixtimes)
+        >>> stats1 = get_timestats_dict(unixtimes)
+        >>> stats2 = get_timestats_dict(acc)
+        >>> assert stats1['range'] == stats2['range'] == '0:01:00'
+        >>> assert stats1['num_nan'] == stats2['num_nan'] == 1
+    """
     import utool as ut
-    unixtime_stats = ut.get_stats(unixtime_list, use_nan=True)
+    if isinstance(unixtime_list, ut.StatsAccumulator):
+        unixtime_stats = unixtime_list.get_stats()
+    else:
+        unixtime_stats = ut.get_stats(unixtime_list, use_nan=True)
     datetime_stats = {}
     if unixtime_stats.get('empty_list', False):
         datetime_stats = unixtime_stats